@@ -28,6 +28,10 @@ from services.db_init import init_db  # <-- este archivo debe existir
 conn = get_connection()
 init_db(conn)  # <-- crea TODAS las tablas antes de importar Excel
 
+# Copia de solo lectura para las páginas de análisis (se refresca sola)
+from utils.snapshot_analitico import iniciar_snapshotter
+iniciar_snapshotter()
+
 
 
 # -------------------------------------------------
@@ -0,0 +1,287 @@
+# benchmarks/datos_sinteticos.py
+#
+# Generador determinístico de una flota sintética en una base SQLite
+# descartable (nunca la base real). Misma semilla + mismos volúmenes
+# = misma base, para comparar benchmarks entre commits.
+#
+#   python -m benchmarks.datos_sinteticos --salida /tmp/bench.sqlite \
+#       --choferes 500 --tractores 450 --dias 1095
+
+import argparse
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils.db import cerrar_conexiones, get_connection  # noqa: E402
+
+TIPOS_DEMORA = ("DEMORA_CARGA", "DEMORA_DESCARGA", "DEMORA_CHOFER")
+LOTE = 10_000
+
+
+@dataclass
+class Volumenes:
+    choferes: int = 500
+    tractores: int = 450
+    clientes: int = 40
+    origenes: int = 20
+    destinos: int = 30
+    desde: date = date(2023, 1, 2)
+    dias: int = 3 * 365
+    densidad_lineas: float = 0.85       # prob. de que un chofer tenga línea un día
+    proporcion_viajes: float = 0.90     # líneas confirmadas que generan viaje
+    francos_por_mes: float = 1.0        # francos por chofer y mes (3 a 7 días)
+    talleres_por_anio: float = 2.0      # mantenimientos por tractor y año
+    demoras_por_viaje: float = 0.4
+    semilla: int = 42
+
+
+# =================================================
+# HELPERS
+# =================================================
+def _insertar(cur, sql, filas):
+    for i in range(0, len(filas), LOTE):
+        cur.executemany(sql, filas[i:i + LOTE])
+
+
+def _maestros(cur, v: Volumenes, rnd: random.Random):
+    choferes = [f"CH_{i:04d}" for i in range(1, v.choferes + 1)]
+    tractores = [f"TR_{i:04d}" for i in range(1, v.tractores + 1)]
+
+    _insertar(cur, """
+        INSERT INTO tractores (id_tractor, patente, activo, tipo_flota, estado)
+        VALUES (?, ?, 1, ?, 'OPERATIVO')
+    """, [
+        (t, f"AA{i:03d}ZZ", "PROPIA" if rnd.random() < 0.8 else "TERCERO")
+        for i, t in enumerate(tractores, 1)
+    ])
+
+    _insertar(cur, """
+        INSERT INTO choferes (id_chofer, nombre, id_tractor, activo, transporte, tipo_flota)
+        VALUES (?, ?, ?, 1, 'BCA', 'PROPIA')
+    """, [
+        (c, f"CHOFER {i:04d}", tractores[i - 1] if i <= len(tractores) else None)
+        for i, c in enumerate(choferes, 1)
+    ])
+
+    cur.executemany(
+        "INSERT INTO materiales (id_material, material, activo) VALUES (?, ?, 1)",
+        [("M_01", "Arena"), ("M_02", "Piedra")],
+    )
+    for tabla, col, prefijo, n in (
+        ("clientes", "cliente", "CL", v.clientes),
+        ("origenes", "origen", "O", v.origenes),
+        ("destinos", "destino", "D", v.destinos),
+    ):
+        _insertar(cur, f"""
+            INSERT INTO {tabla} (id_{col}, {col}, activo) VALUES (?, ?, 1)
+        """, [(f"{prefijo}_{i:02d}", f"{col.upper()} {i:02d}") for i in range(1, n + 1)])
+
+    return choferes, tractores
+
+
+def _francos(v: Volumenes, rnd: random.Random, choferes):
+    """
+    chofer -> set de días de franco, y filas de eventos.
+    """
+    dias_franco = {c: set() for c in choferes}
+    filas = []
+    meses = max(1, v.dias // 30)
+    for c in choferes:
+        for _ in range(int(meses * v.francos_por_mes)):
+            inicio = v.desde + timedelta(days=rnd.randrange(v.dias))
+            fin = inicio + timedelta(days=rnd.randint(2, 6))
+            filas.append(("FRANCO", "CHOFER", c, inicio.isoformat(), fin.isoformat(), "bench"))
+            d = inicio
+            while d <= fin:
+                dias_franco[c].add(d)
+                d += timedelta(days=1)
+    return dias_franco, filas
+
+
+def _talleres(v: Volumenes, rnd: random.Random, tractores):
+    filas = []
+    anios = max(1, v.dias // 365)
+    for t in tractores:
+        for _ in range(int(anios * v.talleres_por_anio)):
+            inicio = v.desde + timedelta(days=rnd.randrange(v.dias))
+            fin = inicio + timedelta(days=rnd.randint(1, 10))
+            filas.append((
+                "MANTENIMIENTO_CORRECTIVO", t,
+                inicio.isoformat(), fin.isoformat(), "bench",
+            ))
+    return filas
+
+
+# =================================================
+# GENERADOR
+# =================================================
+def generar(ruta, v: Volumenes = Volumenes()) -> dict:
+    """
+    Crea (o pisa) la base en `ruta` con el esquema canónico y los volúmenes
+    pedidos. Devuelve la cantidad de filas por tabla.
+    """
+    ruta = Path(ruta)
+    if ruta.resolve().parent == (ROOT / "data").resolve():
+        raise ValueError("La base sintética no puede ir en data/")
+
+    cerrar_conexiones()
+    for sufijo in ("", "-wal", "-shm"):
+        Path(f"{ruta}{sufijo}").unlink(missing_ok=True)
+
+    rnd = random.Random(v.semilla)
+    conn = get_connection(db_path=ruta)
+    cur = conn.cursor()
+    cur.execute("BEGIN")
+
+    choferes, tractores = _maestros(cur, v, rnd)
+    asignado = dict(zip(choferes, tractores))
+    clientes = [f"CL_{i:02d}" for i in range(1, v.clientes + 1)]
+    origenes = [f"O_{i:02d}" for i in range(1, v.origenes + 1)]
+    destinos = [f"D_{i:02d}" for i in range(1, v.destinos + 1)]
+
+    dias_franco, eventos = _francos(v, rnd, choferes)
+    _insertar(cur, """
+        INSERT INTO eventos (tipo, recurso_tipo, recurso_id, fecha_inicio, fecha_fin, creado_por)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, eventos)
+
+    _insertar(cur, """
+        INSERT INTO eventos_recursos (tipo, id_tractor, fecha_inicio, fecha_fin, creado_por)
+        VALUES (?, ?, ?, ?, ?)
+    """, _talleres(v, rnd, tractores))
+
+    hoy = v.desde + timedelta(days=v.dias)
+    id_linea = 0
+    id_viaje = 0
+    lineas, viajes, demoras = [], [], []
+
+    for n in range(v.dias):
+        dia = v.desde + timedelta(days=n)
+        fecha = dia.isoformat()
+        for c in choferes:
+            if dia in dias_franco[c] or rnd.random() > v.densidad_lineas:
+                continue
+
+            id_linea += 1
+            material = "M_01" if rnd.random() < 0.6 else "M_02"
+            origen_linea = "PROGRAMACION" if rnd.random() < 0.9 else "FUERA_DE_PLAN"
+            r = rnd.random()
+            if r < 0.05:
+                estado = "CANCELADO"
+            elif dia >= hoy - timedelta(days=2):
+                estado = "PENDIENTE"
+            elif r < v.proporcion_viajes:
+                estado = "GENERADO"
+            else:
+                estado = "CONFIRMADO"
+            lineas.append((
+                id_linea, fecha, c, asignado.get(c), material,
+                origen_linea, estado, "bench",
+            ))
+
+            if estado != "GENERADO":
+                continue
+
+            id_viaje += 1
+            viajes.append((
+                id_viaje, id_linea, fecha, c, asignado.get(c), material,
+                rnd.choice(clientes), rnd.choice(origenes), rnd.choice(destinos),
+                origen_linea,
+                "FINALIZADO" if dia < hoy - timedelta(days=7) else "CONFIRMADO",
+                "bench",
+            ))
+
+            while rnd.random() < v.demoras_por_viaje:
+                inicio = rnd.randint(6 * 60, 18 * 60)
+                fin = inicio + rnd.randint(10, 240)
+                demoras.append((
+                    id_viaje, rnd.choice(TIPOS_DEMORA),
+                    f"{fecha} {inicio // 60:02d}:{inicio % 60:02d}:00",
+                    f"{fecha} {min(fin, 1439) // 60:02d}:{min(fin, 1439) % 60:02d}:00",
+                    "bench", f"{fecha} 20:00:00",
+                ))
+
+        if len(lineas) >= LOTE:
+            _volcar(cur, lineas, viajes, demoras)
+            lineas, viajes, demoras = [], [], []
+
+    _volcar(cur, lineas, viajes, demoras)
+    cur.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('bench_volumenes', ?)", (
+        str({k: str(val) for k, val in asdict(v).items()}),
+    ))
+    conn.commit()
+    cur.execute("ANALYZE")
+
+    conteos = {
+        t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+        for t in ("choferes", "tractores", "lineas_dia", "viajes",
+                  "eventos", "eventos_recursos", "eventos_viaje")
+    }
+    cerrar_conexiones()
+    return conteos
+
+
+def _volcar(cur, lineas, viajes, demoras):
+    _insertar(cur, """
+        INSERT INTO lineas_dia (
+            id, fecha, id_chofer, id_tractor, id_material,
+            origen_linea, estado, creado_por
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, lineas)
+    _insertar(cur, """
+        INSERT INTO viajes (
+            id, linea_id, fecha, id_chofer, id_tractor, id_material,
+            id_cliente, id_origen, id_destino, origen_viaje, estado, creado_por
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, viajes)
+    _insertar(cur, """
+        INSERT INTO eventos_viaje (
+            viaje_id, tipo, inicio_ts, fin_ts, creado_por, creado_en
+        ) VALUES (?, ?, ?, ?, ?, ?)
+    """, demoras)
+
+
+# =================================================
+# CLI
+# =================================================
+def main(argv=None):
+    base = Volumenes()
+    p = argparse.ArgumentParser(description="Genera una base sintética para benchmarks")
+    p.add_argument("--salida", required=True, help="archivo .sqlite a crear (se pisa)")
+    p.add_argument("--choferes", type=int, default=base.choferes)
+    p.add_argument("--tractores", type=int, default=base.tractores)
+    p.add_argument("--dias", type=int, default=base.dias)
+    p.add_argument("--desde", type=date.fromisoformat, default=base.desde)
+    p.add_argument("--densidad-lineas", type=float, default=base.densidad_lineas)
+    p.add_argument("--francos-por-mes", type=float, default=base.francos_por_mes)
+    p.add_argument("--demoras-por-viaje", type=float, default=base.demoras_por_viaje)
+    p.add_argument("--semilla", type=int, default=base.semilla)
+    a = p.parse_args(argv)
+
+    v = Volumenes(
+        choferes=a.choferes,
+        tractores=a.tractores,
+        dias=a.dias,
+        desde=a.desde,
+        densidad_lineas=a.densidad_lineas,
+        francos_por_mes=a.francos_por_mes,
+        demoras_por_viaje=a.demoras_por_viaje,
+        semilla=a.semilla,
+    )
+
+    t0 = time.perf_counter()
+    conteos = generar(a.salida, v)
+    print(f"Base sintética: {a.salida} ({time.perf_counter() - t0:.1f} s)")
+    for tabla, n in conteos.items():
+        print(f"  {tabla:<18} {n:>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+# benchmarks/servicios.py
+#
+# Mide las funciones públicas de lectura de services/ y modules/ contra
+# una base sintética (benchmarks/datos_sinteticos.py) y guarda el
+# resultado en JSON. Con --comparar marca regresiones contra una corrida
+# anterior y sale con código 1 si alguna supera el umbral.
+#
+#   python -m benchmarks.servicios --base /tmp/bench.sqlite --salida bench.json
+#   python -m benchmarks.servicios --base /tmp/bench.sqlite --comparar bench.json
+
+import argparse
+import importlib
+import inspect
+import json
+import pkgutil
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils.db import get_connection  # noqa: E402
+
+PAQUETES = ("services", "modules")
+
+# Funciones que escriben: no se miden (cambiarían la base entre corridas).
+# "reconstruir" sin guion bajo cubre también disponibilidad_diaria.reconstruir;
+# exportar_ escribe el caché en disco, precargar_ lanza threads e
+# invalidar vacía el índice en memoria que miden las demás.
+PREFIJOS_ESCRITURA = (
+    "crear_", "iniciar_", "finalizar_", "eliminar_", "confirmar_",
+    "cancelar_", "generar_", "desactivar_", "derivar_", "importar_",
+    "actualizar_", "asignar_", "volver_", "reconstruir", "exportar_",
+    "aplicar_", "precargar_", "invalidar",
+)
+
+UMBRAL = 0.25        # +25 % sobre la mediana anterior
+PISO_MS = 1.0        # diferencias menores no cuentan como regresión
+
+
+# =================================================
+# DESCUBRIMIENTO
+# =================================================
+def _modulos():
+    for paquete in PAQUETES:
+        raiz = importlib.import_module(paquete)
+        for info in pkgutil.walk_packages(raiz.__path__, f"{paquete}."):
+            try:
+                yield importlib.import_module(info.name)
+            except Exception as e:  # dependencias opcionales / módulos legacy
+                print(f"  (omitido {info.name}: {type(e).__name__}: {e})")
+
+
+def funciones_publicas():
+    """
+    (nombre, función) de lectura: públicas, definidas en el módulo y
+    con `conn` como primer parámetro.
+    """
+    vistas = set()
+    for mod in _modulos():
+        for nombre, f in inspect.getmembers(mod, inspect.isfunction):
+            if f.__module__ != mod.__name__ or nombre.startswith("_"):
+                continue
+            if nombre.startswith(PREFIJOS_ESCRITURA):
+                continue
+            params = list(inspect.signature(f).parameters)
+            if not params or params[0] != "conn":
+                continue
+            clave = f"{mod.__name__}.{nombre}"
+            if clave not in vistas:
+                vistas.add(clave)
+                yield clave, f
+
+
+# =================================================
+# ARGUMENTOS
+# =================================================
+def _muestras(conn) -> dict:
+    """
+    Valores reales de la base para armar los argumentos.
+    """
+    cur = conn.cursor()
+    cur.execute("SELECT MAX(fecha) FROM lineas_dia")
+    ultima = date.fromisoformat(cur.fetchone()[0])
+    fecha = ultima - timedelta(days=ultima.weekday() + 14)   # lunes, hace dos semanas
+
+    cur.execute("SELECT recurso_id FROM eventos WHERE tipo = 'FRANCO' ORDER BY id LIMIT 1")
+    chofer = cur.fetchone()[0]
+    cur.execute("SELECT id_tractor FROM eventos_recursos ORDER BY id LIMIT 1")
+    tractor = cur.fetchone()[0]
+    cur.execute("SELECT viaje_id FROM eventos_viaje ORDER BY id_evento DESC LIMIT 1")
+    viaje = cur.fetchone()[0]
+
+    desde = fecha - timedelta(days=27)
+    return {
+        "fecha": fecha,
+        "fecha_base": fecha,
+        "desde": desde,
+        "hasta": fecha + timedelta(days=6),
+        "fecha_desde": desde,
+        "fecha_hasta": fecha + timedelta(days=6),
+        "year": fecha.year,
+        "month": fecha.month,
+        "semana": fecha.strftime("%Y-W%W"),
+        "chofer_id": chofer,
+        "id_chofer": chofer,
+        "tractor_id": tractor,
+        "id_tractor": tractor,
+        "viaje_id": viaje,
+        "id_plantilla": 1,
+    }
+
+
+def _argumentos(f, muestras):
+    kwargs = {}
+    for nombre, p in list(inspect.signature(f).parameters.items())[1:]:
+        if nombre in muestras:
+            kwargs[nombre] = muestras[nombre]
+        elif p.default is inspect.Parameter.empty:
+            return None
+    return kwargs
+
+
+def _filas(resultado):
+    try:
+        return len(resultado)
+    except TypeError:
+        return 1 if resultado is not None else 0
+
+
+# =================================================
+# CORRIDA
+# =================================================
+def medir(ruta_base, repeticiones: int = 5, filtro: str | None = None) -> dict:
+    conn = get_connection(db_path=ruta_base)
+    muestras = _muestras(conn)
+    resultados = {}
+
+    for clave, f in funciones_publicas():
+        if filtro and filtro not in clave:
+            continue
+        kwargs = _argumentos(f, muestras)
+        if kwargs is None:
+            resultados[clave] = {"omitido": "sin argumentos de muestra"}
+            continue
+
+        tiempos = []
+        try:
+            f(conn, **kwargs)   # calentamiento (page cache)
+            for _ in range(repeticiones):
+                t0 = time.perf_counter()
+                r = f(conn, **kwargs)
+                tiempos.append((time.perf_counter() - t0) * 1000)
+        except (sqlite3.Error, ValueError, KeyError, TypeError) as e:
+            conn.rollback()
+            resultados[clave] = {"error": f"{type(e).__name__}: {e}"}
+            continue
+
+        resultados[clave] = {
+            "mediana_ms": round(statistics.median(tiempos), 3),
+            "min_ms": round(min(tiempos), 3),
+            "max_ms": round(max(tiempos), 3),
+            "filas": _filas(r),
+        }
+        print(f"  {resultados[clave]['mediana_ms']:>10.2f} ms  {clave}")
+
+    return resultados
+
+
+def _commit_actual() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _volumenes(ruta_base) -> dict:
+    conn = get_connection(solo_lectura=True, db_path=ruta_base)
+    return {
+        t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+        for t in ("choferes", "lineas_dia", "viajes", "eventos", "eventos_viaje")
+    }
+
+
+# =================================================
+# COMPARACIÓN
+# =================================================
+def comparar(actual: dict, anterior: dict, umbral: float = UMBRAL) -> list:
+    """
+    Funciones cuya mediana empeoró más que `umbral` (y más que PISO_MS).
+    """
+    regresiones = []
+    for clave, r in actual["funciones"].items():
+        previo = anterior.get("funciones", {}).get(clave, {})
+        if "mediana_ms" not in r or "mediana_ms" not in previo:
+            continue
+        antes, ahora = previo["mediana_ms"], r["mediana_ms"]
+        if ahora - antes > PISO_MS and ahora > antes * (1 + umbral):
+            regresiones.append({
+                "funcion": clave,
+                "antes_ms": antes,
+                "ahora_ms": ahora,
+                "factor": round(ahora / antes, 2) if antes else None,
+            })
+    return regresiones
+
+
+# =================================================
+# CLI
+# =================================================
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark de services/ y modules/")
+    p.add_argument("--base", required=True, help="base sintética (datos_sinteticos.py)")
+    p.add_argument("--salida", help="JSON de resultados")
+    p.add_argument("--comparar", help="JSON de una corrida anterior")
+    p.add_argument("--umbral", type=float, default=UMBRAL)
+    p.add_argument("--repeticiones", type=int, default=5)
+    p.add_argument("--filtro", help="solo funciones cuyo nombre contenga este texto")
+    a = p.parse_args(argv)
+
+    print(f"Midiendo contra {a.base}")
+    resultado = {
+        "commit": _commit_actual(),
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "volumenes": _volumenes(a.base),
+        "repeticiones": a.repeticiones,
+        "funciones": medir(a.base, a.repeticiones, a.filtro),
+    }
+
+    if a.salida:
+        Path(a.salida).write_text(json.dumps(resultado, indent=2, ensure_ascii=False))
+        print(f"\nResultados en {a.salida}")
+
+    if a.comparar:
+        anterior = json.loads(Path(a.comparar).read_text())
+        regresiones = comparar(resultado, anterior, a.umbral)
+        if regresiones:
+            print(f"\n{len(regresiones)} regresión(es) sobre {a.umbral:.0%}:")
+            for r in regresiones:
+                print(f"  ✗ {r['funcion']}: {r['antes_ms']} -> {r['ahora_ms']} ms (x{r['factor']})")
+            return 1
+        print(f"\nSin regresiones contra {a.comparar} (commit {anterior.get('commit')})")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+# conftest.py
+#
+# Los tests nunca escriben la base real (data/programacion_bca.sqlite, que
+# está versionada) ni el caché de exportaciones: antes de importar
+# cualquier test se apuntan DB_PATH y CACHE_DIR a un directorio temporal,
+# y cada test que necesita base usa el fixture `conn`, una base nueva
+# migrada al esquema actual.
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from services import exportacion
+from utils import db, secuencias
+
+_TMP = Path(tempfile.mkdtemp(prefix="bca_tests_"))
+db.DB_PATH = _TMP / "programacion_bca.sqlite"
+exportacion.CACHE_DIR = _TMP / "cache_exportaciones"
+
+# Scripts sueltos que abren la base operativa al importarse.
+collect_ignore = ["bootstrap_test.py"]
+
+
+def pytest_unconfigure(config):
+    db.cerrar_conexiones()
+    shutil.rmtree(_TMP, ignore_errors=True)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    """
+    Conexión a una base temporal vacía con todas las migraciones aplicadas.
+    """
+    c = db.get_connection(db_path=tmp_path / "test.sqlite")
+    yield c
+    secuencias.descartar_bloques()
+    db.cerrar_conexiones()
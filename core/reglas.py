@@ -9,6 +9,8 @@
 ESTADOS_VIAJE = [
     "PROGRAMADO",
     "CONFIRMADO",
+    "OPERATIVO",
+    "FINALIZADO",
     "CANCELADO"
 ]
 
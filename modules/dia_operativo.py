@@ -1,6 +1,9 @@
 from __future__ import annotations
 from datetime import date
 
+from utils.db import confirmar, transaccion
+from utils.fechas import a_fecha_iso
+
 # -------------------------------------------------
 # Obtener líneas del día
 # -------------------------------------------------
@@ -24,9 +27,9 @@ def obtener_lineas_del_dia(conn, fecha: date):
         FROM lineas_dia l
         LEFT JOIN choferes  ch ON ch.id_chofer  = l.id_chofer
         LEFT JOIN tractores t  ON t.id_tractor = l.id_tractor
-        WHERE DATE(l.fecha) = DATE(?)
+        WHERE l.fecha = ?
         ORDER BY ch.nombre IS NULL, ch.nombre
-    """, (fecha.isoformat(),))
+    """, (a_fecha_iso(fecha),))
 
     return [dict(r) for r in cur.fetchall()]
 
@@ -45,8 +48,8 @@ def kpis_dia(conn, fecha: date):
             SUM(CASE WHEN estado = 'PENDIENTE'  THEN 1 ELSE 0 END) AS pendientes,
             SUM(CASE WHEN origen_linea = 'FUERA_DE_PLAN' THEN 1 ELSE 0 END) AS fuera_plan
         FROM lineas_dia
-        WHERE DATE(fecha) = DATE(?)
-    """, (fecha.isoformat(),))
+        WHERE fecha = ?
+    """, (a_fecha_iso(fecha),))
 
     r = cur.fetchone()
 
@@ -70,14 +73,20 @@ def kpis_dia(conn, fecha: date):
 # -------------------------------------------------
 # Acciones sobre líneas
 # -------------------------------------------------
-def confirmar_linea(conn, id_linea: int, usuario: str):
+def confirmar_linea(conn, id_linea: int, usuario: str) -> int:
+    """
+    Como confirmar_lineas: solo pasa si sigue PENDIENTE.
+    Devuelve 1 si se confirmó, 0 si no.
+    """
     cur = conn.cursor()
     cur.execute("""
         UPDATE lineas_dia
         SET estado = 'CONFIRMADO'
         WHERE id = ?
+          AND estado = 'PENDIENTE'
     """, (id_linea,))
-    conn.commit()
+    confirmar(conn)
+    return cur.rowcount
 
 
 def cancelar_linea(conn, id_linea: int, usuario: str):
@@ -87,7 +96,40 @@ def cancelar_linea(conn, id_linea: int, usuario: str):
         SET estado = 'CANCELADO'
         WHERE id = ?
     """, (id_linea,))
-    conn.commit()
+    confirmar(conn)
+
+
+# -------------------------------------------------
+# Acciones masivas (una sola transacción)
+# -------------------------------------------------
+def _cambiar_estado_lineas(conn, ids_lineas, estado: str) -> int:
+    """
+    Solo pasan las líneas que siguen PENDIENTE: una ya confirmada,
+    cancelada o generada no se toca aunque venga en la lista.
+    """
+    ids = [(estado, i) for i in dict.fromkeys(ids_lineas)]
+    if not ids:
+        return 0
+    with transaccion(conn):
+        cur = conn.cursor()
+        cur.executemany("""
+            UPDATE lineas_dia
+            SET estado = ?
+            WHERE id = ?
+              AND estado = 'PENDIENTE'
+        """, ids)
+        return cur.rowcount
+
+
+def confirmar_lineas(conn, ids_lineas, usuario: str) -> int:
+    """
+    Confirma todas las líneas juntas. Devuelve cuántas se actualizaron.
+    """
+    return _cambiar_estado_lineas(conn, ids_lineas, "CONFIRMADO")
+
+
+def cancelar_lineas(conn, ids_lineas, usuario: str) -> int:
+    return _cambiar_estado_lineas(conn, ids_lineas, "CANCELADO")
 
 
 # -------------------------------------------------
@@ -114,10 +156,10 @@ def crear_fuera_de_programacion(
         )
         VALUES (?, ?, ?, ?, 'PENDIENTE', 'FUERA_DE_PLAN', ?)
     """, (
-        fecha.isoformat(),
+        a_fecha_iso(fecha),
         id_chofer,
         id_tractor,
         id_material,
         usuario,
     ))
-    conn.commit()
+    confirmar(conn)
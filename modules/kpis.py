@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import date, timedelta
 
 
 # =========================
@@ -45,8 +45,22 @@ def kpis_dia(conn, fecha: date):
 # =========================
 # KPIs SEMANALES
 # =========================
+def _rango_semana(semana: str):
+    """
+    'YYYY-Www' (semana de strftime %W, empieza el lunes) -> (desde, hasta)
+    """
+    anio, nro = semana.split("-W")
+    primero = date(int(anio), 1, 1)
+    primer_lunes = primero + timedelta(days=(7 - primero.weekday()) % 7)
+    if int(nro) == 0:
+        return primero, primer_lunes - timedelta(days=1)
+    desde = primer_lunes + timedelta(weeks=int(nro) - 1)
+    return desde, min(desde + timedelta(days=6), date(int(anio), 12, 31))
+
+
 def kpis_semana(conn, semana: str):
     cur = conn.cursor()
+    desde, hasta = _rango_semana(semana)
 
     cur.execute("""
         SELECT
@@ -54,8 +68,8 @@ def kpis_semana(conn, semana: str):
             SUM(CASE WHEN estado = 'CONFIRMADO' THEN 1 ELSE 0 END) AS confirmados,
             SUM(CASE WHEN estado = 'CANCELADO' THEN 1 ELSE 0 END) AS cancelados
         FROM lineas_dia
-        WHERE strftime('%Y-W%W', fecha) = ?
-    """, (semana,))
+        WHERE fecha BETWEEN ? AND ?
+    """, (desde.isoformat(), hasta.isoformat()))
 
     row = cur.fetchone()
     return dict(row) if row else {
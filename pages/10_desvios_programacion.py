@@ -2,7 +2,8 @@ import streamlit as st
 import pandas as pd
 from datetime import date, timedelta
 
-from utils.db import get_connection
+from utils.snapshot_analitico import get_connection_analitica
+from utils.panel_consultas import cerrar_panel_consultas, detener, panel_consultas
 from services.desvios import (
     calcular_desvios_dia,
     calcular_resumen_semana
@@ -32,7 +33,8 @@ if "user" not in st.session_state or st.session_state.user is None:
 # =================================================
 # Conexión
 # =================================================
-conn = get_connection()
+panel_consultas()
+conn = get_connection_analitica()
 
 
 
@@ -52,7 +54,7 @@ with st.form("selector_fecha_desvios"):
     aplicar = st.form_submit_button("Aplicar")
 
 if not aplicar:
-    st.stop()
+    detener()
 
 
 # Calcular semana
@@ -110,7 +112,7 @@ detalles = calcular_desvios_dia(conn, fecha_sel)
 
 if not detalles:
     st.info("No hay programación confirmada para ese día.")
-    st.stop()
+    detener()
 
 df = pd.DataFrame(detalles)
 
@@ -170,3 +172,5 @@ Criterios:
 - Programación **CONFIRMADA**
 - Asociación por **fecha + chofer**
 """)
+
+cerrar_panel_consultas()
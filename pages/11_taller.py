@@ -3,6 +3,7 @@ from datetime import date
 import pandas as pd
 
 from utils.db import get_connection
+from utils.panel_consultas import cerrar_panel_consultas, panel_consultas, recargar
 from services.taller import (
     iniciar_mantenimiento_correctivo,
     listar_tractores_en_mantenimiento
@@ -33,6 +34,7 @@ if "user" not in st.session_state or st.session_state.user is None:
 # =================================================
 # Conexión
 # =================================================
+panel_consultas()
 conn = get_connection()
 
 st.title("🔧 Taller – Gestión de Mantenimiento")
@@ -153,7 +155,7 @@ else:
                     ):
                         pasar_a_mantenimiento_manual(conn, row["id_tractor"])
                         st.success(f"{row['patente']} enviado a mantenimiento.")
-                        st.rerun()
+                        recargar()
 
 # =================================================
 # INICIAR MANTENIMIENTO CORRECTIVO
@@ -202,7 +204,7 @@ else:
             observacion=observacion
         )
         st.success("Tractor enviado a mantenimiento correctivo.")
-        st.rerun()
+        recargar()
 
 # =================================================
 # TRACTORES EN MANTENIMIENTO → VOLVER A OPERATIVO
@@ -228,4 +230,6 @@ else:
             if st.button("✅ Volver a operativo", key=f"op_{row['id_tractor']}"):
                 volver_a_operativo(conn, row["id_tractor"])
                 st.success(f"{row['patente']} volvió a OPERATIVO.")
-                st.rerun()
+                recargar()
+
+cerrar_panel_consultas()
@@ -1,9 +1,9 @@
 import streamlit as st
-from datetime import date, timedelta, datetime
+from datetime import date, timedelta
 
-from utils.db import get_connection
-from services.agenda import listar_viajes_agenda
-from services.maestros.choferes import listar_choferes
+from utils.snapshot_analitico import get_connection_analitica
+from utils.panel_consultas import cerrar_panel_consultas, panel_consultas
+from services.agenda import agenda_por_dia, agenda_semana, precargar_semanas
 
 # =================================================
 # Configuración página
@@ -27,17 +27,6 @@ def lunes_de_semana(d: date) -> date:
 def domingo_de_semana(d: date) -> date:
     return lunes_de_semana(d) + timedelta(days=6)
 
-def parse_fecha(x):
-    if isinstance(x, date):
-        return x
-    x = str(x).strip()
-    for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%d-%m-%Y"):
-        try:
-            return datetime.strptime(x, fmt).date()
-        except ValueError:
-            pass
-    return date.fromisoformat(x)
-
 # =================================================
 # Inicialización estado
 # =================================================
@@ -90,46 +79,32 @@ with st.expander("🗓️ Filtro de fechas", expanded=False):
         fecha_hasta = domingo
 
 # =================================================
-# DB y maestros
+# DB
 # =================================================
-conn = get_connection()
-
-choferes = listar_choferes(conn)
-MAP_CHOFER = {c["id_chofer"]: c["nombre"] for c in choferes}
+panel_consultas()
+conn = get_connection_analitica()
 
 # =================================================
 # Helpers dominio
 # =================================================
-MAP_MATERIAL = {"M_01": "Arena", "M_02": "Piedra"}
-
 def material_nombre(v):
-    if not v:
-        return "-"
-    v = str(v).strip().lower()
-    if v == "arena":
-        return "Arena"
-    if v == "piedra":
-        return "Piedra"
-    return MAP_MATERIAL.get(v.upper(), "-")
+    return (v.get("material") or "-").strip()
 
-def es_viaje_valido(v):
-    return v["tipo"] == "VIAJE" and material_nombre(v["material"]) in ("Arena", "Piedra")
+def viajes_de_material(items, material):
+    return sum(
+        1 for v in items
+        if v["tipo"] == "VIAJE" and material_nombre(v).lower() == material.lower()
+    )
 
 # =================================================
-# Datos
+# Datos (ya filtrados por rango, con nombres y agrupados por día)
 # =================================================
-items_raw = listar_viajes_agenda(conn, fecha_desde, fecha_hasta)
-
-items = []
-for v in items_raw:
-    f = parse_fecha(v.get("fecha"))
-    v["_fecha"] = f
-
-    ch = v.get("chofer")
-    if ch in MAP_CHOFER:
-        v["chofer"] = MAP_CHOFER[ch]
-
-    items.append(v)
+if usar_filtro_fechas:
+    items_por_dia = agenda_por_dia(conn, fecha_desde, fecha_hasta)
+else:
+    # semana cacheada; la anterior y la siguiente se cargan de fondo
+    items_por_dia = agenda_semana(conn, lunes)
+    precargar_semanas(conn, [lunes - timedelta(days=7), lunes + timedelta(days=7)])
 
 # =================================================
 # Filtros tipo
@@ -139,23 +114,18 @@ with st.expander("🔎 Filtros", expanded=True):
     ver_lineas = f1.checkbox("Programados (líneas)", True)
     ver_viajes = f2.checkbox("Viajes generados", True)
 
-items = [
-    v for v in items
-    if (v["tipo"] == "LINEA" and ver_lineas)
-    or (v["tipo"] == "VIAJE" and ver_viajes)
-]
+tipos_visibles = {t for t, ver in (("LINEA", ver_lineas), ("VIAJE", ver_viajes)) if ver}
+for dia in list(items_por_dia):
+    items_por_dia[dia] = [v for v in items_por_dia[dia] if v["tipo"] in tipos_visibles]
+    if not items_por_dia[dia]:
+        del items_por_dia[dia]
+items = [v for items_dia in items_por_dia.values() for v in items_dia]
 
 # =================================================
 # KPIs
 # =================================================
-arena = sum(
-    1 for v in items
-    if es_viaje_valido(v) and material_nombre(v["material"]) == "Arena"
-)
-piedra = sum(
-    1 for v in items
-    if es_viaje_valido(v) and material_nombre(v["material"]) == "Piedra"
-)
+arena = viajes_de_material(items, "Arena")
+piedra = viajes_de_material(items, "Piedra")
 
 st.markdown(
     f"""
@@ -171,13 +141,6 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# =================================================
-# Agrupar por día (fecha real)
-# =================================================
-items_por_dia = {}
-for v in items:
-    items_por_dia.setdefault(v["_fecha"], []).append(v)
-
 dias_operativos = sorted(items_por_dia.keys())
 
 # =================================================
@@ -201,16 +164,16 @@ else:
                 continue
 
             choferes_con_viaje = {
-                v.get("chofer")
+                v.get("id_chofer")
                 for v in items_dia
-                if v.get("tipo") == "VIAJE" and v.get("chofer")
+                if v.get("tipo") == "VIAJE" and v.get("id_chofer")
             }
 
             items_visibles = [
                 v for v in items_dia
                 if not (
                     v.get("tipo") == "LINEA"
-                    and v.get("chofer") in choferes_con_viaje
+                    and v.get("id_chofer") in choferes_con_viaje
                 )
             ]
 
@@ -219,6 +182,8 @@ else:
                 st.write(
                     f"{icono} {v.get('tipo')} | "
                     f"{v.get('chofer','-')} | "
-                    f"{material_nombre(v.get('material'))} | "
-                    f"{v.get('estado','-')}"
+                    f"{material_nombre(v)} | "
+                    f"{v.get('estado') or '-'}"
                 )
+
+cerrar_panel_consultas()
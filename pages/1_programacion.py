@@ -2,8 +2,8 @@ import sys
 from pathlib import Path
 from datetime import date, timedelta
 import streamlit as st
+import numpy as np
 import pandas as pd
-from io import BytesIO
 
 # -------------------------
 # Configuración página
@@ -37,17 +37,36 @@ if str(ROOT) not in sys.path:
 # Imports
 # -------------------------
 from utils.db import get_connection
+from utils.descargas import boton_descarga
+from utils.panel_consultas import cerrar_panel_consultas, detener, panel_consultas, recargar
+from services.exportacion import exportar_programacion_semana
 from services.programacion.semanal import (
     generar_programacion_semanal,
     contadores_semana,
     listar_programacion_semana,
     eliminar_linea_programacion,
+    aplicar_plan_semanas,
+    patron_de_semana,
+    repetir_patron,
+)
+from services.programacion.optimizador import (
+    MAX_DIAS_POR_CHOFER,
+    aplicar_propuesta,
+    optimizar_semana,
 )
 from services.programacion.disponibilidad import (
     contadores_choferes,
     contadores_tractores,
     listar_tractores_sueltos,
 )
+from services.matriz_disponibilidad import (
+    MOTIVO_DISPONIBLE,
+    MOTIVO_FRANCO,
+    MOTIVO_SIN_TRACTOR,
+    MOTIVO_TALLER,
+    matriz_choferes_con_tractor,
+    totales_diarios,
+)
 from services.maestros.choferes import listar_choferes
 from services.maestros.materiales import listar_materiales
 
@@ -55,8 +74,16 @@ from services.maestros.materiales import listar_materiales
 # UI
 # -------------------------
 st.title("📆 Programación Semanal")
+panel_consultas()
 conn = get_connection()
 
+# Ícono por código de motivo (se indexa con la matriz int8)
+ICONOS_MOTIVO = np.empty(4, dtype=object)
+ICONOS_MOTIVO[MOTIVO_DISPONIBLE] = "🟢"
+ICONOS_MOTIVO[MOTIVO_FRANCO] = "🟥"
+ICONOS_MOTIVO[MOTIVO_TALLER] = "🔧"
+ICONOS_MOTIVO[MOTIVO_SIN_TRACTOR] = "⚪"
+
 # =================================================
 # Semana
 # =================================================
@@ -121,6 +148,25 @@ with st.expander("ℹ️ Disponibilidad de recursos"):
     d5.metric("Tractores no disponibles", stats_tr["no_disponibles"])
     d6.metric("🚛 Operativos sin chofer", len(tractores_sueltos))
 
+    # Chofer disponible y con su tractor operativo, día por día
+    matriz = matriz_choferes_con_tractor(conn, lunes_semana, domingo_semana)
+    nombres = {c["id_chofer"]: c["nombre"] for c in listar_choferes(conn)}
+    df_matriz = pd.DataFrame(
+        ICONOS_MOTIVO[matriz.motivo],
+        columns=[f.strftime("%a %d/%m") for f in matriz.fechas],
+    )
+    df_matriz.insert(0, "Chofer", [nombres.get(cid, cid) for cid in matriz.recursos])
+
+    st.caption("🟢 Disponible | 🟥 Franco | 🔧 Tractor en taller | ⚪ Sin tractor")
+    st.dataframe(df_matriz, use_container_width=True, hide_index=True)
+    st.caption(
+        "Disponibles por día: "
+        + " · ".join(
+            f"{f.strftime('%a')} {n}"
+            for f, n in zip(matriz.fechas, totales_diarios(matriz))
+        )
+    )
+
 # =================================================
 # Generar programación
 # =================================================
@@ -172,7 +218,129 @@ if not semana_confirmada:
                     f"Programación creada: {res['creadas']} "
                     f"(omitidas: {res['omitidas']})"
                 )
-                st.rerun()
+                recargar()
+
+    # -------------------------------------------------
+    # Propuesta automática
+    # -------------------------------------------------
+    with st.expander("🤖 Propuesta automática (objetivos por día)"):
+        objetivos_df = st.data_editor(
+            pd.DataFrame(
+                0,
+                index=DIAS_SEMANA,
+                columns=[m["material"] for m in materiales],
+            ),
+            use_container_width=True,
+            key=f"objetivos_{lunes_semana}",
+        )
+        max_dias = st.number_input(
+            "Máximo de días por chofer",
+            min_value=1,
+            max_value=7,
+            value=MAX_DIAS_POR_CHOFER,
+        )
+
+        id_por_material = {m["material"]: m["id_material"] for m in materiales}
+        # Celdas borradas llegan como NaN
+        objetivos_df = objetivos_df.fillna(0).clip(lower=0)
+        objetivos = {
+            dia: {
+                id_por_material[mat]: int(n)
+                for mat, n in fila.items()
+                if n
+            }
+            for dia, fila in objetivos_df.iterrows()
+        }
+
+        # El optimizador corre solo al pedirlo; la propuesta queda en
+        # sesión junto con los objetivos que la generaron.
+        clave_propuesta = (lunes_semana, repr(objetivos), max_dias)
+        if st.button("🔎 Calcular propuesta"):
+            st.session_state.propuesta_semana = {
+                "clave": clave_propuesta,
+                "propuesta": optimizar_semana(
+                    conn,
+                    lunes_semana,
+                    objetivos,
+                    max_dias_por_chofer=max_dias,
+                ),
+            }
+
+        guardada = st.session_state.get("propuesta_semana")
+        propuesta = None
+        if guardada and guardada["clave"] == clave_propuesta:
+            propuesta = guardada["propuesta"]
+        elif guardada and guardada["clave"][0] == lunes_semana:
+            st.info("Los objetivos cambiaron: volvé a calcular la propuesta.")
+
+        mensaje = st.session_state.pop("propuesta_mensaje", None)
+        if mensaje:
+            st.success(mensaje)
+
+        if propuesta is not None:
+            nombres = {c["id_chofer"]: c["nombre"] for c in choferes}
+            materiales_nombre = {v: k for k, v in id_por_material.items()}
+            st.caption(f"{len(propuesta['asignaciones'])} líneas propuestas")
+            if propuesta["asignaciones"]:
+                st.dataframe(
+                    pd.DataFrame(propuesta["asignaciones"]).assign(
+                        chofer=lambda d: d["id_chofer"].map(nombres),
+                        material=lambda d: d["id_material"].map(materiales_nombre),
+                    )[["fecha", "chofer", "id_tractor", "material"]],
+                    use_container_width=True,
+                    hide_index=True,
+                )
+            for fecha_f, por_material in propuesta["faltantes"].items():
+                st.warning(
+                    f"{fecha_f}: faltan "
+                    + ", ".join(f"{n} {materiales_nombre.get(m, m)}" for m, n in por_material.items())
+                )
+
+            if st.button("✅ Aplicar propuesta", disabled=not propuesta["asignaciones"]):
+                creadas = aplicar_propuesta(conn, propuesta, st.session_state.user["email"])
+                del st.session_state["propuesta_semana"]
+                st.session_state.propuesta_mensaje = f"Programación creada: {creadas}"
+                recargar()
+
+# =================================================
+# Repetir la semana
+# =================================================
+with st.expander("🔁 Repetir esta programación en las semanas siguientes"):
+    semanas_rep = st.number_input("Semanas", min_value=1, max_value=12, value=4)
+    desde_rep = lunes_semana + timedelta(weeks=1)
+    patron = patron_de_semana(conn, lunes_semana)
+    plan = repetir_patron(desde_rep, semanas_rep, patron)
+
+    previa = aplicar_plan_semanas(
+        conn, desde_rep, semanas_rep, plan,
+        usuario=st.session_state.user["email"],
+        simular=True,
+    )
+    st.caption(
+        f"Del {previa['desde']} al {previa['hasta']}: "
+        f"{previa['insertadas']} nuevas, {previa['actualizadas']} con otro material, "
+        f"{previa['eliminadas']} a eliminar, {previa['sin_cambios']} sin cambios, "
+        f"{previa['omitidas']} omitidas"
+    )
+    for m in previa["mensajes"][:20]:
+        st.write(f"• {m}")
+
+    # Sin patrón, aplicar vaciaría las semanas siguientes: solo con confirmación
+    vaciar = False
+    if not patron:
+        st.warning("Esta semana no tiene programación: aplicar borra la pendiente de las semanas siguientes.")
+        vaciar = st.checkbox("Sí, vaciar las semanas siguientes")
+
+    if st.button("🔁 Aplicar a las semanas siguientes", disabled=not patron and not vaciar):
+        res = aplicar_plan_semanas(
+            conn, desde_rep, semanas_rep, plan,
+            usuario=st.session_state.user["email"],
+            vaciar=vaciar,
+        )
+        st.success(
+            f"{res['insertadas']} creadas, {res['actualizadas']} actualizadas, "
+            f"{res['eliminadas']} eliminadas"
+        )
 
 # =================================================
 # Líneas Programadas
@@ -183,9 +351,7 @@ rows = listar_programacion_semana(conn, lunes_semana)
 
 if not rows:
     st.info("No hay programación para esta semana")
-    st.stop()
-
-df = pd.DataFrame(rows)
+    detener()
 
 vista = st.radio(
     "Vista",
@@ -196,15 +362,11 @@ vista = st.radio(
 # =================================================
 # EXPORTAR
 # =================================================
-buffer = BytesIO()
-df.to_excel(buffer, index=False)
-buffer.seek(0)
-
-st.download_button(
+boton_descarga(
     "📤 Exportar líneas a Excel",
-    data=buffer,
-    file_name=f"lineas_programadas_{lunes_semana}.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    clave=f"programacion_{lunes_semana}",
+    generar=lambda: exportar_programacion_semana(conn, lunes_semana, domingo_semana),
+    nombre_archivo=f"lineas_programadas_{lunes_semana}.xlsx",
 )
 
 # =================================================
@@ -223,7 +385,7 @@ if vista.startswith("📋"):
         if modo_edicion and not semana_confirmada:
             if c5.button("🗑️", key=f"del_{r['id']}"):
                 eliminar_linea_programacion(conn, r["id"])
-                st.rerun()
+                recargar()
 
 # =================================================
 # VISTA AGENDA
@@ -251,7 +413,7 @@ st.divider()
 
 if semana_confirmada:
     st.success("📸 Programación semanal CONFIRMADA")
-    st.stop()
+    detener()
 
 st.warning("⚠️ Programación en BORRADOR")
 
@@ -264,4 +426,6 @@ if st.button("📸 Confirmar programación semanal"):
           AND origen_linea = 'PROGRAMACION'
     """, (lunes_semana.isoformat(), domingo_semana.isoformat()))
     conn.commit()
-    st.rerun()
+    recargar()
+
+cerrar_panel_consultas()
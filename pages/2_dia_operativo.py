@@ -32,10 +32,13 @@ if "user" not in st.session_state or st.session_state.user is None:
 # Imports
 # -------------------------
 from utils.db import get_connection
+from utils.panel_consultas import cerrar_panel_consultas, panel_consultas, recargar
 from modules.dia_operativo import (
     obtener_lineas_del_dia,
     kpis_dia,
-    crear_fuera_de_programacion
+    crear_fuera_de_programacion,
+    confirmar_lineas,
+    cancelar_lineas,
 )
 from services.maestros.choferes import listar_choferes
 from services.maestros.tractores import listar_tractores
@@ -60,6 +63,7 @@ def parse_fecha(x):
 # -------------------------
 st.title("🟨 Día Operativo")
 
+panel_consultas()
 conn = get_connection()
 
 # -------------------------
@@ -79,6 +83,11 @@ if hasattr(fecha, "date"):
 
 st.caption(f"Día operativo: **{fecha.strftime('%d/%m/%Y')}**")
 
+# resultado de la última acción (se guarda antes del rerun para que se vea)
+mensaje = st.session_state.pop("dia_operativo_mensaje", None)
+if mensaje:
+    st.success(mensaje)
+
 # -------------------------
 # Pool disponibilidad
 # -------------------------
@@ -146,6 +155,41 @@ else:
             st.write(f"**Estado:** {l.get('estado', '—')}")
             st.write(f"**Origen:** {l.get('origen_linea', '—')}")
 
+    # -------------------------
+    # Confirmación masiva
+    # -------------------------
+    pendientes = [l for l in lineas if l.get("estado") == "PENDIENTE"]
+    if pendientes:
+        st.markdown("#### ✅ Pendientes del día")
+        seleccion = st.multiselect(
+            "Líneas",
+            [l["id_linea"] for l in pendientes],
+            default=[],
+            format_func=lambda i: next(
+                f"{l.get('chofer', 'SIN CHOFER')} | {l.get('tractor', 'SIN TRACTOR')}"
+                for l in pendientes if l["id_linea"] == i
+            ),
+        )
+        usuario = st.session_state.user.get("email", "ui")
+        b1, b2 = st.columns(2)
+        if b1.button(f"Confirmar seleccionadas ({len(seleccion)})", disabled=not seleccion):
+            n = confirmar_lineas(conn, seleccion, usuario)
+            st.session_state["dia_operativo_mensaje"] = f"{n} líneas confirmadas"
+            recargar()
+        seguro = b2.checkbox(
+            f"Sí, cancelar {len(seleccion)} línea(s)",
+            # la clave cambia con la selección: hay que volver a tildar
+            key="dia_operativo_seguro_" + "_".join(map(str, sorted(seleccion))),
+            disabled=not seleccion,
+        )
+        if b2.button(
+            f"Cancelar seleccionadas ({len(seleccion)})",
+            disabled=not (seleccion and seguro),
+        ):
+            n = cancelar_lineas(conn, seleccion, usuario)
+            st.session_state["dia_operativo_mensaje"] = f"{n} líneas canceladas"
+            recargar()
+
 # -------------------------
 # Fuera de programación
 # -------------------------
@@ -189,5 +233,7 @@ else:
                 material_id,
                 "ui"
             )
-            st.success("Viaje agregado")
-            st.rerun()
+            st.session_state["dia_operativo_mensaje"] = "Viaje agregado"
+            recargar()
+
+cerrar_panel_consultas()
@@ -1,19 +1,23 @@
 import streamlit as st
-import pandas as pd
 from datetime import date, timedelta
-from io import BytesIO
 
 from services.eventos_viaje import (
-    listar_demoras_viaje,
-    duracion_demoras_viaje
+    listar_demoras_viajes,
+    duracion_demoras_viajes,
 )
 from services.viajes import (
-    listar_lineas_para_viajes,
-    listar_viajes,
+    pagina_lineas_para_viajes,
+    pagina_viajes,
     confirmar_linea_y_generar_viaje,
-    finalizar_viaje
+    finalizar_viaje,
+    generar_viajes_lote,
 )
+from core.reglas import ESTADOS_VIAJE
 from utils.db import get_connection
+from utils.descargas import boton_descarga
+from utils.paginas import cursor_actual, navegacion
+from utils.panel_consultas import cerrar_panel_consultas, panel_consultas, recargar
+from services.exportacion import exportar_viajes
 from services.plantillas import listar_plantillas
 
 # =================================================
@@ -31,6 +35,7 @@ if "user" not in st.session_state or st.session_state.user is None:
 # =================================================
 # Conexión
 # =================================================
+panel_consultas()
 conn = get_connection()
 st.title("🚛 Viajes Operativos")
 
@@ -99,14 +104,54 @@ with tab_pend:
     with c2:
         hasta_pend = st.date_input("Hasta", date.today() + timedelta(days=3))
 
-    lineas = [
-        l for l in listar_lineas_para_viajes(conn)
-        if desde_pend <= date.fromisoformat(l["fecha"]) <= hasta_pend
-    ]
+    pagina_pend = pagina_lineas_para_viajes(
+        conn,
+        desde=desde_pend,
+        hasta=hasta_pend,
+        cursor=cursor_actual("pag_pend", (desde_pend, hasta_pend)),
+    )
+    lineas = pagina_pend["filas"]
 
     if not lineas:
         st.info("No hay líneas pendientes.")
     else:
+        # -------------------------------------------------
+        # Generación en lote
+        # -------------------------------------------------
+        with st.form("generar_lote"):
+            st.markdown("### ⚡ Generar viajes en lote")
+            lineas_map = {l["id_linea"]: l for l in lineas}
+            ids_lote = st.multiselect(
+                "Líneas",
+                options=list(lineas_map),
+                format_func=lambda i: (
+                    f"#{i} | {lineas_map[i]['fecha']} | "
+                    f"{choferes_map.get(_get_chofer_id(lineas_map[i]), 'SIN CHOFER')}"
+                ),
+            )
+            plantilla_lote = st.selectbox(
+                "Plantilla",
+                options=list(plantillas_map),
+                format_func=lambda pid: plantillas_map[pid]["nombre"],
+            )
+            if st.form_submit_button("⚡ Generar viajes seleccionados"):
+                if not ids_lote or plantilla_lote is None:
+                    st.warning("Seleccioná líneas y una plantilla")
+                else:
+                    res = generar_viajes_lote(
+                        conn,
+                        [{"id_linea": i, "id_plantilla": plantilla_lote} for i in ids_lote],
+                        usuario=st.session_state.user.get("email", "ui"),
+                    )
+                    st.session_state["resultado_lote"] = res
+                    recargar()
+
+        res_lote = st.session_state.pop("resultado_lote", None)
+        if res_lote:
+            st.success(f"Viajes generados: {len(res_lote['generados'])}")
+            for e in res_lote["errores"]:
+                st.error(f"Línea #{e['id_linea']}: {e['error']}")
+
         for l in lineas:
             uid = f"linea_{l['id_linea']}"
             chofer_id = _get_chofer_id(l)
@@ -183,10 +228,12 @@ with tab_pend:
                             usuario=st.session_state.user.get("email", "ui"),
                         )
                         st.success("Viaje generado")
-                        st.rerun()
+                        recargar()
                     except ValueError as e:
                         st.error(str(e))
 
+    navegacion("pag_pend", pagina_pend["siguiente"])
+
 # =================================================
 # TAB 2 - VIAJES GENERADOS
 # =================================================
@@ -199,36 +246,53 @@ with tab_hist:
     with c2:
         hasta = st.date_input("Hasta", date.today(), key="hist_hasta")
 
-    viajes = listar_viajes(conn, desde=str(desde), hasta=str(hasta))
+    c3, c4 = st.columns(2)
+    with c3:
+        estado_filtro = st.selectbox(
+            "Estado",
+            options=[""] + ESTADOS_VIAJE,
+            format_func=lambda e: e or "Todos",
+            key="hist_estado",
+        )
+    with c4:
+        chofer_filtro = st.selectbox(
+            "Chofer",
+            options=[""] + sorted(choferes_map, key=choferes_map.get),
+            format_func=lambda c: choferes_map.get(c, "Todos"),
+            key="hist_chofer",
+        )
+
+    filtros_hist = (desde, hasta, estado_filtro, chofer_filtro)
+    pagina_hist = pagina_viajes(
+        conn,
+        desde=desde,
+        hasta=hasta,
+        estado=estado_filtro or None,
+        id_chofer=chofer_filtro or None,
+        cursor=cursor_actual("pag_hist", filtros_hist),
+    )
+    viajes = pagina_hist["filas"]
 
     if viajes:
-        df_export = pd.DataFrame([
-            {
-                "Fecha": v.get("fecha"),
-                "Chofer": v.get("chofer"),
-                "Patente": v.get("tractor"),
-                "Cliente": v.get("cliente"),
-                "Origen": v.get("origen"),
-                "Destino": v.get("destino"),
-                "Material": v.get("material"),
-            }
-            for v in viajes
-        ])
-
-        buffer = BytesIO()
-        df_export.to_excel(buffer, index=False)
-        buffer.seek(0)
-
-        st.download_button(
+        boton_descarga(
             "📤 Exportar viajes a Excel",
-            data=buffer,
-            file_name="viajes_generados.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            clave="viajes_" + "_".join(map(str, filtros_hist)),
+            generar=lambda: exportar_viajes(
+                conn, desde, hasta,
+                estado=estado_filtro or None,
+                id_chofer=chofer_filtro or None,
+            ),
+            nombre_archivo="viajes_generados.xlsx",
         )
 
     if not viajes:
         st.info("No hay viajes en el rango.")
     else:
+        # Demoras de toda la página: dos consultas en total
+        ids_pagina = [v["id"] for v in viajes]
+        demoras_pagina = listar_demoras_viajes(conn, ids_pagina)
+        totales_pagina = duracion_demoras_viajes(conn, ids_pagina)
+
         for v in viajes:
             viaje_id = v.get("id") or v.get("id_viaje")
             if not viaje_id:
@@ -261,11 +325,11 @@ with tab_hist:
                 st.divider()
                 st.markdown("### ⏱️ Demoras del viaje")
 
-                demoras = listar_demoras_viaje(conn, viaje_id)
+                demoras = demoras_pagina.get(viaje_id, [])
                 if demoras:
                     for d in demoras:
                         st.write(f"• **{d['tipo']}** | {d['inicio_ts']} → {d['fin_ts']}")
-                    totales = duracion_demoras_viaje(conn, viaje_id)
+                    totales = totales_pagina.get(viaje_id, {})
                     st.caption(" | ".join(f"{k}: {v}" for k, v in totales.items()))
                 else:
                     st.info("No hay demoras.")
@@ -275,6 +339,10 @@ with tab_hist:
                     if st.button("✅ Finalizar viaje", key=f"fin_{viaje_id}"):
                         finalizar_viaje(conn, viaje_id, st.session_state.user.get("email", "ui"))
                         st.success("Viaje finalizado")
-                        st.rerun()
+                        recargar()
                 else:
                     st.info("Viaje finalizado")
+
+    navegacion("pag_hist", pagina_hist["siguiente"])
+
+cerrar_panel_consultas()
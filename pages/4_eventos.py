@@ -41,6 +41,7 @@ if str(ROOT) not in sys.path:
 # Imports backend
 # =================================================
 from utils.db import get_connection
+from utils.panel_consultas import cerrar_panel_consultas, detener, panel_consultas, recargar
 from services.viajes import listar_viajes_activos
 from services.eventos_viaje import (
     crear_evento_viaje,
@@ -52,6 +53,7 @@ from services.eventos_viaje import (
 # =================================================
 st.title("🔧 Eventos de Viaje")
 
+panel_consultas()
 conn = get_connection()
 
 # =================================================
@@ -61,7 +63,7 @@ viajes = listar_viajes_activos(conn)
 
 if not viajes:
     st.info("No hay viajes activos.")
-    st.stop()
+    detener()
 
 viaje_id = st.selectbox(
     "Viaje",
@@ -127,7 +129,7 @@ with st.form("nuevo_evento"):
 
         if fin_dt <= inicio_dt:
             st.error("La fecha/hora de fin debe ser posterior al inicio.")
-            st.stop()
+            detener()
 
         try:
             crear_evento_viaje(
@@ -141,7 +143,9 @@ with st.form("nuevo_evento"):
             )
 
             st.success("Evento registrado correctamente.")
-            st.rerun()
+            recargar()
 
         except Exception as e:
             st.error(str(e))
+
+cerrar_panel_consultas()
@@ -1,6 +1,7 @@
 import streamlit as st
 
 from utils.db import get_connection
+from utils.panel_consultas import cerrar_panel_consultas, panel_consultas, recargar
 from services.plantillas import listar_plantillas, crear_plantilla
 
 # -------------------------
@@ -26,6 +27,7 @@ if "user" not in st.session_state or st.session_state.user is None:
 
 st.title("📄 Plantillas de Viaje")
 
+panel_consultas()
 conn = get_connection()
 
 # -------------------------
@@ -100,7 +102,7 @@ with st.form("form_plantilla"):
                 observacion=observacion,
             )
             st.success("Plantilla creada")
-            st.rerun()
+            recargar()
 
 # -------------------------
 # Listado
@@ -121,5 +123,4 @@ else:
             st.write(f"**Destino:** {destinos_map.get(p['id_destino'], '—')}")
             st.write(f"**Observación:** {p['observacion'] or '—'}")
 
-
-
+cerrar_panel_consultas()
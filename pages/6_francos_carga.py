@@ -30,6 +30,7 @@ if "user" not in st.session_state or st.session_state.user is None:
 # Imports
 # =================================================
 from utils.db import get_connection
+from utils.panel_consultas import cerrar_panel_consultas, detener, panel_consultas, recargar
 from services.maestros.choferes import listar_choferes
 from services.eventos_recursos import iniciar_franco, finalizar_franco
 
@@ -38,6 +39,7 @@ from services.eventos_recursos import iniciar_franco, finalizar_franco
 # =================================================
 st.title("🟦 Francos – Flota Propia")
 
+panel_consultas()
 conn = get_connection()
 conn.row_factory = sqlite3.Row
 
@@ -48,7 +50,7 @@ choferes = listar_choferes(conn)
 
 if not choferes:
     st.info("No hay choferes activos cargados.")
-    st.stop()
+    detener()
 
 chofer_map = {c["id_chofer"]: c["nombre"] for c in choferes}
 
@@ -82,7 +84,7 @@ else:
             usuario=st.session_state.user.get("email", "ui")
         )
         st.success("Franco registrado.")
-        st.rerun()
+        recargar()
 
 # =================================================
 # Francos del chofer (LISTADO REAL)
@@ -130,6 +132,8 @@ else:
                     evento_id=f["id"],
                     fecha_fin=date.today()
                 )
-                st.rerun()
+                recargar()
 
     st.markdown(f"### 🧮 Total días de franco: **{total_dias}**")
+
+cerrar_panel_consultas()
@@ -2,11 +2,14 @@ import streamlit as st
 import pandas as pd
 from datetime import date, datetime
 
-from utils.db import get_connection
-from services.eventos_globales import listar_eventos_globales
+from utils.snapshot_analitico import get_connection_analitica
+from utils.panel_consultas import cerrar_panel_consultas, detener, panel_consultas
+from services.eventos_globales import horas_por_tipo, pagina_eventos_globales
 from services.maestros.choferes import listar_choferes
 from services.maestros.tractores import listar_tractores
-from io import BytesIO
+from services.exportacion import exportar_eventos_globales
+from utils.descargas import boton_descarga
+from utils.paginas import cursor_actual, navegacion
 
 
 # =================================================
@@ -26,7 +29,8 @@ if "user" not in st.session_state or st.session_state.user is None:
 
 st.title("📋 Eventos – Vista Global")
 
-conn = get_connection()
+panel_consultas()
+conn = get_connection_analitica()
 
 
 
@@ -64,13 +68,14 @@ with st.form("filtros_eventos_globales"):
         )
 
     with c4:
-        st.selectbox(
-        "Tractor",
-        options=["Pendiente de asignación en viajes"],
-        disabled=True
+        tractor_sel = st.selectbox(
+            "Tractor",
+            options=[None] + [t["id_tractor"] for t in tractores],
+            format_func=lambda x: "Todos" if x is None else next(
+                t["patente"] or x for t in tractores if t["id_tractor"] == x
+            )
         )
 
-        
 
     tipos = st.multiselect(
          "Tipo de evento",
@@ -89,27 +94,39 @@ with st.form("filtros_eventos_globales"):
 
     aplicar = st.form_submit_button("Aplicar filtros")
 
-if not aplicar:
-    st.stop()
+# los filtros aplicados quedan en sesión: la paginación hace rerun
+if aplicar:
+    st.session_state["eventos_globales_filtros"] = (
+        desde, hasta, tuple(tipos), chofer_sel, tractor_sel
+    )
 
+if "eventos_globales_filtros" not in st.session_state:
+    detener()
 
-# =================================================
-# Cargar eventos
-# =================================================
-eventos = listar_eventos_globales(
-    conn,
+desde, hasta, tipos, chofer_sel, tractor_sel = st.session_state["eventos_globales_filtros"]
+filtros = dict(
     desde=desde,
     hasta=hasta,
-    tipo=tipos[0] if tipos else None,
+    tipos=list(tipos),
     chofer_id=chofer_sel,
-    tractor_id=None
+    tractor_id=tractor_sel,
 )
 
 
+# =================================================
+# Cargar eventos (una página, filtrada en SQL)
+# =================================================
+clave_filtros = st.session_state["eventos_globales_filtros"]
+pagina = pagina_eventos_globales(
+    conn,
+    **filtros,
+    cursor=cursor_actual("pag_eventos_globales", clave_filtros),
+)
+eventos = pagina["filas"]
 
 if not eventos:
     st.info("No hay eventos con esos filtros.")
-    st.stop()
+    detener()
 
 
 # =================================================
@@ -121,10 +138,8 @@ for e in eventos:
     inicio_dt = datetime.fromisoformat(e["inicio_ts"])
     fin_dt = datetime.fromisoformat(e["fin_ts"]) if e["fin_ts"] else None
 
-    if fin_dt:
-        delta = fin_dt - inicio_dt
-        horas, rem = divmod(int(delta.total_seconds()), 3600)
-        minutos = rem // 60
+    if e["duracion_min"] is not None:
+        horas, minutos = divmod(e["duracion_min"], 60)
         duracion = f"{horas:02}:{minutos:02} h"
     else:
         duracion = "En curso"
@@ -134,30 +149,25 @@ for e in eventos:
         "Fin": fin_dt.strftime("%Y-%m-%d %H:%M") if fin_dt else "—",
         "Duración": duracion,
         "Tipo": e["tipo"],
-        "Chofer": e.get("chofer_nombre") or e.get("chofer_id") or "—",
+        "Chofer": e.get("chofer_nombre") or e.get("id_chofer") or "—",
         "Tractor": e.get("tractor_id") or "—",
         "Observación": e.get("observacion") or ""
     })
 
 df = pd.DataFrame(rows)
 
-df = pd.DataFrame(rows)
-
 # =================================================
-# Exportar (según filtros aplicados)
+# Exportar (todas las páginas, según filtros aplicados)
 # =================================================
-buffer = BytesIO()
-df.to_excel(buffer, index=False)
-buffer.seek(0)
-
-st.download_button(
-    label="📤 Exportar eventos (según filtros)",
-    data=buffer,
-    file_name=f"eventos_globales_{desde}_{hasta}.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+boton_descarga(
+    "📤 Exportar eventos (según filtros)",
+    clave=f"eventos_globales_{clave_filtros}",
+    generar=lambda: exportar_eventos_globales(conn, **filtros),
+    nombre_archivo=f"eventos_globales_{desde}_{hasta}.xlsx",
 )
 
 st.dataframe(df, use_container_width=True)
+navegacion("pag_eventos_globales", pagina["siguiente"])
 
 
 
@@ -166,28 +176,16 @@ st.dataframe(df, use_container_width=True)
 # =================================================
 st.subheader("📊 KPI – Horas por tipo de evento")
 
-kpi = {}
-
-for e in eventos:
-    if not e["fin_ts"]:
-        continue
-
-    inicio = datetime.fromisoformat(e["inicio_ts"])
-    fin = datetime.fromisoformat(e["fin_ts"])
-    horas = (fin - inicio).total_seconds() / 3600
-
-    kpi[e["tipo"]] = kpi.get(e["tipo"], 0) + horas
+kpi = horas_por_tipo(conn, **filtros)
 
 if not kpi:
-    st.info("No hay eventos cerrados para calcular KPIs.")
+    st.info("No hay eventos para calcular KPIs.")
 else:
-    df_kpi = (
-        pd.DataFrame([
-            {"Tipo de evento": k, "Horas totales": round(v, 2)}
-            for k, v in kpi.items()
-        ])
-        .sort_values("Horas totales", ascending=False)
-        .reset_index(drop=True)
-    )
+    df_kpi = pd.DataFrame([
+        {"Tipo de evento": k["tipo"], "Horas totales": round(k["horas"], 2)}
+        for k in kpi
+    ])
 
     st.dataframe(df_kpi, use_container_width=True)
+
+cerrar_panel_consultas()
@@ -2,8 +2,6 @@
 import sys
 from pathlib import Path
 import streamlit as st
-import pandas as pd
-from io import BytesIO
 
 
 # -------------------------
@@ -41,7 +39,11 @@ if str(ROOT) not in sys.path:
 # Imports
 # -------------------------
 from utils.db import get_connection
+from utils.panel_consultas import cerrar_panel_consultas, detener, panel_consultas, recargar
+from utils.descargas import boton_descarga
+from services.exportacion import exportar_chofer_tractor
 
+panel_consultas()
 conn = get_connection()
 cur = conn.cursor()
 
@@ -81,7 +83,7 @@ tractores = [dict(r) for r in cur.fetchall()]
 
 if not choferes:
     st.info("No hay choferes activos.")
-    st.stop()
+    detener()
 
 # -------------------------
 # Buscador
@@ -120,7 +122,7 @@ if edit_key not in st.session_state:
 if not st.session_state[edit_key]:
     if st.button("✏️ Asignar / Modificar tractor"):
         st.session_state[edit_key] = True
-        st.rerun()
+        recargar()
 
 # -------------------------
 # Modo edición
@@ -160,38 +162,20 @@ if st.session_state[edit_key]:
 
             st.session_state[edit_key] = False
             st.success("Asignación guardada")
-            st.rerun()
+            recargar()
 
     with c2:
         if st.button("❌ Cancelar"):
             st.session_state[edit_key] = False
-            st.rerun()
+            recargar()
 # -------------------------
 # Exportación
 # -------------------------
-cur.execute("""
-    SELECT
-        ch.nombre AS chofer,
-        COALESCE(t.id_tractor, '—') AS tractor,
-        COALESCE(t.patente, '—') AS patente,
-        COALESCE(t.estado, '—') AS estado_tractor
-    FROM choferes ch
-    LEFT JOIN tractores t ON t.id_tractor = ch.id_tractor
-    WHERE ch.activo = 1
-    ORDER BY ch.nombre
-""")
-
-export_rows = [dict(r) for r in cur.fetchall()]
-
-df_export = pd.DataFrame(export_rows)
-
-buffer = BytesIO()
-df_export.to_excel(buffer, index=False)
-buffer.seek(0)
-
-st.download_button(
-    label="📤 Exportar asignaciones Chofer–Tractor",
-    data=buffer,
-    file_name="chofer_tractor_asignaciones.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+boton_descarga(
+    "📤 Exportar asignaciones Chofer–Tractor",
+    clave="chofer_tractor",
+    generar=lambda: exportar_chofer_tractor(conn),
+    nombre_archivo="chofer_tractor_asignaciones.xlsx",
 )
+
+cerrar_panel_consultas()
@@ -1,11 +1,14 @@
 from pathlib import Path
-from utils.db import get_db_path, get_connection
+from utils.db import get_db_path, get_connection, cerrar_conexiones
 
 db_path = get_db_path()
 
-if db_path.exists():
-    db_path.unlink()
-    print("DB eliminada:", db_path)
+cerrar_conexiones()
+
+for p in (db_path, Path(f"{db_path}-wal"), Path(f"{db_path}-shm")):
+    if p.exists():
+        p.unlink()
+        print("DB eliminada:", p)
 
 conn = get_connection()
 conn.close()
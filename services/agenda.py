@@ -1,25 +1,60 @@
-from datetime import datetime, date
-from typing import List, Dict
+import logging
 import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, List
+
+from utils.db import get_connection
+from utils.fechas import a_fecha_iso
+from utils.schema import version_semana, versiones_datos
+
+SEMANAS_CACHE = 32
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_cache_semanas = OrderedDict()   # (ruta, lunes) -> (versión, items por día)
+_precargando = set()             # (ruta, lunes) con un thread en curso
+
 
 # -------------------------------------------------
-# Helper: SOLO ISO (YYYY-MM-DD)
+# Consulta: líneas + viajes del rango, con nombres
 # -------------------------------------------------
-def _parse_fecha(valor) -> date | None:
-    if not valor:
-        return None
+# Cada rama filtra por fecha sobre su índice (idx_lineas_dia_fecha_origen /
+# idx_viajes_fecha_id): la semana cuesta lo que tienen sus filas, no lo
+# que tiene la base.
+_SQL_AGENDA = """
+    SELECT
+        'LINEA' AS tipo,
+        l.fecha,
+        UPPER(TRIM(COALESCE(l.estado, ''))) AS estado,
+        l.id_chofer,
+        COALESCE(ch.nombre, l.id_chofer) AS chofer,
+        l.id_material,
+        COALESCE(m.material, l.id_material) AS material
+    FROM lineas_dia l
+    LEFT JOIN choferes   ch ON ch.id_chofer  = l.id_chofer
+    LEFT JOIN materiales m  ON m.id_material = l.id_material
+    WHERE l.fecha BETWEEN ? AND ?
 
-    if isinstance(valor, datetime):
-        return valor.date()
+    UNION ALL
 
-    if isinstance(valor, date):
-        return valor
+    SELECT
+        'VIAJE' AS tipo,
+        v.fecha,
+        UPPER(TRIM(COALESCE(v.estado, ''))) AS estado,
+        v.id_chofer,
+        COALESCE(ch.nombre, v.id_chofer) AS chofer,
+        v.id_material,
+        COALESCE(m.material, v.id_material) AS material
+    FROM viajes v
+    LEFT JOIN choferes   ch ON ch.id_chofer  = v.id_chofer
+    LEFT JOIN materiales m  ON m.id_material = v.id_material
+    WHERE v.fecha BETWEEN ? AND ?
 
-    s = str(valor).strip()
-    try:
-        return datetime.strptime(s, "%Y-%m-%d").date()
-    except ValueError:
-        return None
+    ORDER BY fecha, tipo, chofer
+"""
 
 
 # -------------------------------------------------
@@ -27,68 +62,108 @@ def _parse_fecha(valor) -> date | None:
 # -------------------------------------------------
 def listar_viajes_agenda(conn, fecha_desde: date, fecha_hasta: date) -> List[Dict]:
     """
-    Devuelve items unificados para la Agenda:
+    Devuelve items unificados para la Agenda, ordenados por fecha:
     - LINEA  -> programación diaria (lineas_dia)
     - VIAJE  -> operación (viajes)
+    Cada item trae fecha (date), estado, id_chofer / chofer (nombre) e
+    id_material / material (nombre).
     """
-    conn.row_factory = sqlite3.Row
+    desde = a_fecha_iso(fecha_desde)
+    hasta = a_fecha_iso(fecha_hasta)
+
     cur = conn.cursor()
-    items: List[Dict] = []
-
-    # =========================
-    # LÍNEAS (programación)
-    # =========================
-    cur.execute("""
-        SELECT
-            fecha,
-            id_chofer,
-            id_material,
-            estado
-        FROM lineas_dia
-        WHERE fecha IS NOT NULL
-        ORDER BY fecha
-    """)
-    for r in cur.fetchall():
-        fecha = _parse_fecha(r["fecha"])
-        if not fecha:
-            continue
-        if not (fecha_desde <= fecha <= fecha_hasta):
-            continue
-
-        items.append({
-            "tipo": "LINEA",
-            "fecha": fecha,
-            "estado": (r["estado"] or "").strip().upper(),
-            "chofer": r["id_chofer"],
-            "material": r["id_material"],
-        })
-
-    # =========================
-    # VIAJES (ejecución)
-    # =========================
-    cur.execute("""
-        SELECT
-            fecha,
-            id_chofer,
-            id_material,
-            estado
-        FROM viajes
-        WHERE fecha IS NOT NULL
-        ORDER BY fecha
-    """)
-    for r in cur.fetchall():
-        fecha = _parse_fecha(r["fecha"])
-        if not fecha:
-            continue
-        if not (fecha_desde <= fecha <= fecha_hasta):
-            continue
-
-        items.append({
-            "tipo": "VIAJE",
-            "fecha": fecha,
-            "estado": (r["estado"] or "").strip().upper(),
-            "chofer": r["id_chofer"],
-            "material": r["id_material"],
-        })
+    cur.execute(_SQL_AGENDA, (desde, hasta, desde, hasta))
 
+    items = []
+    for r in cur.fetchall():
+        item = dict(r)
+        item["fecha"] = date.fromisoformat(item["fecha"])
+        items.append(item)
     return items
+
+
+def agenda_por_dia(conn, fecha_desde: date, fecha_hasta: date) -> Dict[date, List[Dict]]:
+    """
+    Items de listar_viajes_agenda agrupados por día (solo días con
+    actividad, en orden).
+    """
+    por_dia: Dict[date, List[Dict]] = {}
+    for item in listar_viajes_agenda(conn, fecha_desde, fecha_hasta):
+        por_dia.setdefault(item["fecha"], []).append(item)
+    return por_dia
+
+
+# -------------------------------------------------
+# Caché por semana
+# -------------------------------------------------
+# Los planificadores van y vienen con ◀ / ▶: cada semana queda cacheada
+# con su versión (versiones_semana, que los triggers de lineas_dia y
+# viajes incrementan solo para la semana tocada) más la de choferes y
+# materiales por los nombres. Una escritura en otra semana no la invalida.
+def _version_agenda(conn, lunes: date) -> tuple:
+    return (
+        version_semana(conn, lunes.isoformat()),
+        versiones_datos(conn, ("choferes", "materiales")),
+    )
+
+
+def agenda_semana(conn, lunes: date) -> Dict[date, List[Dict]]:
+    """
+    agenda_por_dia de la semana lunes..domingo, desde el caché si la
+    semana no cambió.
+    """
+    clave = (getattr(conn, "ruta", None), lunes)
+    # la versión se lee antes que los datos: si alguien escribe en el
+    # medio, lo cacheado queda con la versión vieja y se vuelve a leer
+    version = _version_agenda(conn, lunes)
+
+    with _lock:
+        guardado = _cache_semanas.get(clave)
+        if guardado and guardado[0] == version:
+            _cache_semanas.move_to_end(clave)
+            return {dia: list(items) for dia, items in guardado[1].items()}
+
+    por_dia = agenda_por_dia(conn, lunes, lunes + timedelta(days=6))
+
+    with _lock:
+        _cache_semanas[clave] = (version, por_dia)
+        _cache_semanas.move_to_end(clave)
+        while len(_cache_semanas) > SEMANAS_CACHE:
+            _cache_semanas.popitem(last=False)
+    return {dia: list(items) for dia, items in por_dia.items()}
+
+
+def _precargar(ruta: str, lunes_lista):
+    conn = None
+    try:
+        conn = get_connection(solo_lectura=True, db_path=ruta)
+        for lunes in lunes_lista:
+            agenda_semana(conn, lunes)
+    except sqlite3.Error:
+        log.exception("no se pudo precargar la agenda")
+    finally:
+        if conn is not None:
+            conn.close()        # vuelve al pool
+        with _lock:
+            _precargando.difference_update((ruta, l) for l in lunes_lista)
+
+
+def precargar_semanas(conn, lunes_lista) -> None:
+    """
+    Carga en segundo plano las semanas pedidas (p. ej. la anterior y la
+    siguiente a la que se está viendo) para que navegar sea instantáneo.
+    """
+    ruta = getattr(conn, "ruta", None)
+    if not ruta or ruta == ":memory:":
+        return
+    with _lock:
+        pendientes = [l for l in lunes_lista if (ruta, l) not in _precargando]
+        _precargando.update((ruta, l) for l in pendientes)
+    if not pendientes:
+        return
+    threading.Thread(
+        target=_precargar,
+        args=(ruta, pendientes),
+        name="agenda-precarga",
+        daemon=True,
+    ).start()
@@ -1,37 +1,90 @@
 from datetime import date, timedelta
 
-from services.eventos import (
-    chofer_disponible,
-    tractor_disponible,
-    motivo_chofer_no_disponible,
-    motivo_tractor_no_disponible,
-)
+from services.disponibilidad_diaria import bloqueos_en_rango
+from utils.fechas import a_fecha_iso
+
 
 # =================================================
-# CONTADORES DE CHOFERES (SEMANALES)
+# MOTOR DE DISPONIBILIDAD (RANGO DE FECHAS)
 # =================================================
 
-def contadores_choferes(conn, fecha):
+def disponibilidad_flota(conn, desde, hasta=None) -> dict:
+    """
+    Quién está disponible y por qué no, para toda la flota activa y todos
+    los días de [desde, hasta]. Tres consultas (maestros activos y un
+    rango de disponibilidad_diaria), sin importar el tamaño de la flota
+    ni del rango.
+
+    Devuelve:
+      choferes / tractores:        ids activos
+      motivos_chofer[fecha_iso]:   {id_chofer: "FRANCO"}
+      motivos_tractor[fecha_iso]:  {id_tractor: "TALLER"}
+    (los que no aparecen en motivos_* están disponibles ese día)
+    """
+    desde = date.fromisoformat(a_fecha_iso(desde))
+    hasta = date.fromisoformat(a_fecha_iso(hasta)) if hasta else desde
     cur = conn.cursor()
+
     cur.execute("SELECT id_chofer FROM choferes WHERE activo = 1")
     choferes = [r["id_chofer"] for r in cur.fetchall()]
 
-    disponibles = set()
-    no_disponibles = 0
-    motivos = {}
+    cur.execute("SELECT id_tractor FROM tractores WHERE activo = 1")
+    tractores = [r["id_tractor"] for r in cur.fetchall()]
+
+    motivos = {"CHOFER": {}, "TRACTOR": {}}
+    for b in bloqueos_en_rango(conn, desde, hasta):
+        motivos[b["recurso_tipo"]].setdefault(b["fecha"], {})[b["recurso_id"]] = b["motivo"]
+
+    return {
+        "desde": desde,
+        "hasta": hasta,
+        "choferes": choferes,
+        "tractores": tractores,
+        "motivos_chofer": motivos["CHOFER"],
+        "motivos_tractor": motivos["TRACTOR"],
+    }
+
+
+def choferes_disponibles(flota: dict, fecha) -> list:
+    fuera = flota["motivos_chofer"].get(a_fecha_iso(fecha), {})
+    return [c for c in flota["choferes"] if c not in fuera]
+
+
+def tractores_disponibles(flota: dict, fecha) -> list:
+    fuera = flota["motivos_tractor"].get(a_fecha_iso(fecha), {})
+    return [t for t in flota["tractores"] if t not in fuera]
+
+
+def motivos_choferes(flota: dict, fecha) -> dict:
+    """
+    {id_chofer: motivo} de los choferes activos no disponibles ese día.
+    """
+    fuera = flota["motivos_chofer"].get(a_fecha_iso(fecha), {})
+    return {c: fuera[c] for c in flota["choferes"] if c in fuera}
+
+
+def motivos_tractores(flota: dict, fecha) -> dict:
+    fuera = flota["motivos_tractor"].get(a_fecha_iso(fecha), {})
+    return {t: fuera[t] for t in flota["tractores"] if t in fuera}
+
+
+# =================================================
+# CONTADORES DE CHOFERES (SEMANALES)
+# =================================================
 
-    for cid in choferes:
-        if chofer_disponible(conn, cid, fecha):
-            disponibles.add(cid)
-        else:
-            no_disponibles += 1
-            motivo = motivo_chofer_no_disponible(conn, cid, fecha)
-            if motivo:
-                motivos[motivo] = motivos.get(motivo, 0) + 1
+def contadores_choferes(conn, fecha):
+    flota = disponibilidad_flota(conn, fecha)
+    choferes = flota["choferes"]
+    disponibles = set(choferes_disponibles(flota, fecha))
+
+    motivos = {}
+    for motivo in motivos_choferes(flota, fecha).values():
+        motivos[motivo] = motivos.get(motivo, 0) + 1
 
     lunes = fecha
     domingo = fecha + timedelta(days=6)
 
+    cur = conn.cursor()
     cur.execute(
         "SELECT DISTINCT id_chofer "
         "FROM lineas_dia "
@@ -47,7 +100,7 @@ def contadores_choferes(conn, fecha):
     return {
         "total": len(choferes),
         "disponibles": len(disponibles),
-        "no_disponibles": no_disponibles,
+        "no_disponibles": len(choferes) - len(disponibles),
         "pendientes_programar": len(pendientes),
         "motivos": motivos,
     }
@@ -58,24 +111,14 @@ def contadores_choferes(conn, fecha):
 # =================================================
 
 def contadores_tractores(conn, fecha):
-    cur = conn.cursor()
-    cur.execute("SELECT id_tractor FROM tractores WHERE activo = 1")
-    tractores = cur.fetchall()
-
-    disponibles = 0
-    no_disponibles = 0
-
-    for t in tractores:
-        tid = t["id_tractor"]
-        if tractor_disponible(conn, tid, fecha):
-            disponibles += 1
-        else:
-            no_disponibles += 1
+    flota = disponibilidad_flota(conn, fecha)
+    total = len(flota["tractores"])
+    disponibles = len(tractores_disponibles(flota, fecha))
 
     return {
-        "total": len(tractores),
+        "total": total,
         "disponibles": disponibles,
-        "no_disponibles": no_disponibles,
+        "no_disponibles": total - disponibles,
     }
 
 
@@ -101,44 +144,23 @@ def listar_tractores_sueltos(conn):
 # =================================================
 
 def pool_disponibilidad_diaria(conn, fecha: date):
-    cur = conn.cursor()
-
-    # Choferes
-    cur.execute("SELECT id_chofer FROM choferes WHERE activo = 1")
-    choferes = [r["id_chofer"] for r in cur.fetchall()]
-
-    choferes_disponibles = [
-        cid for cid in choferes
-        if chofer_disponible(conn, cid, fecha)
-    ]
+    flota = disponibilidad_flota(conn, fecha)
 
-    # Tractores
-    cur.execute("SELECT id_tractor FROM tractores WHERE activo = 1")
-    tractores = [r["id_tractor"] for r in cur.fetchall()]
-
-    tractores_disponibles = []
-    tractores_mantenimiento = []
-
-    for tid in tractores:
-        if tractor_disponible(conn, tid, fecha):
-            tractores_disponibles.append(tid)
-        else:
-            tractores_mantenimiento.append(tid)
+    choferes_ok = choferes_disponibles(flota, fecha)
+    tractores_ok = tractores_disponibles(flota, fecha)
+    tractores_mantenimiento = list(motivos_tractores(flota, fecha))
 
     # Pool disponible = mínimo operativo real
-    pool_disponible = min(
-        len(choferes_disponibles),
-        len(tractores_disponibles)
-    )
+    pool_disponible = min(len(choferes_ok), len(tractores_ok))
 
     return {
         # métricas usadas por pages/2_dia_operativo.py
-        "tractores_total": len(tractores),
+        "tractores_total": len(flota["tractores"]),
         "tractores_mantenimiento": len(tractores_mantenimiento),
-        "choferes_disponibles": len(choferes_disponibles),
+        "choferes_disponibles": len(choferes_ok),
         "pool_disponible": pool_disponible,
 
         # listas por si se usan en otro lado
-        "choferes_disponibles_list": choferes_disponibles,
-        "tractores_disponibles_list": tractores_disponibles,
+        "choferes_disponibles_list": choferes_ok,
+        "tractores_disponibles_list": tractores_ok,
     }
@@ -0,0 +1,194 @@
+"""
+services/disponibilidad_diaria.py
+Tabla disponibilidad_diaria: una fila por recurso y día NO_DISPONIBLE,
+con el motivo (FRANCO / TALLER). La mantienen los triggers sobre
+`eventos` y `eventos_recursos` (ver utils/schema.py); acá están la
+lectura agregada, la reconstrucción completa y el verificador contra los
+eventos crudos.
+
+    python -m services.disponibilidad_diaria --verificar
+    python -m services.disponibilidad_diaria --reconstruir
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+
+from utils import schema
+from utils.db import get_connection, transaccion
+from utils.fechas import a_fecha_iso
+
+
+# =================================================
+# LECTURA
+# =================================================
+def bloqueos_en_rango(conn, desde, hasta) -> list:
+    """
+    (fecha, recurso_tipo, recurso_id, motivo) de [desde, hasta].
+    Una consulta por rango de la clave primaria.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT DISTINCT fecha, recurso_tipo, recurso_id, motivo
+        FROM disponibilidad_diaria
+        WHERE fecha BETWEEN ? AND ?
+    """, (a_fecha_iso(desde), a_fecha_iso(hasta)))
+    return [dict(r) for r in cur.fetchall()]
+
+
+def resumen_disponibilidad(conn, desde, hasta=None) -> list:
+    """
+    Por día: total de choferes/tractores activos y cuántos están
+    no disponibles. Un solo agregado sobre calendario + disponibilidad_diaria.
+    """
+    desde = a_fecha_iso(desde)
+    hasta = a_fecha_iso(hasta) if hasta else desde
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT
+            c.fecha,
+            (SELECT COUNT(*) FROM choferes WHERE activo = 1)  AS choferes_total,
+            (SELECT COUNT(*) FROM tractores WHERE activo = 1) AS tractores_total,
+            COUNT(DISTINCT CASE WHEN d.recurso_tipo = 'CHOFER'
+                                THEN d.recurso_id END)        AS choferes_no_disponibles,
+            COUNT(DISTINCT CASE WHEN d.recurso_tipo = 'TRACTOR'
+                                THEN d.recurso_id END)        AS tractores_no_disponibles
+        FROM calendario c
+        LEFT JOIN disponibilidad_diaria d
+               ON d.fecha = c.fecha
+              AND (
+                    (d.recurso_tipo = 'CHOFER' AND d.recurso_id IN
+                        (SELECT id_chofer FROM choferes WHERE activo = 1))
+                 OR (d.recurso_tipo = 'TRACTOR' AND d.recurso_id IN
+                        (SELECT id_tractor FROM tractores WHERE activo = 1))
+              )
+        WHERE c.fecha BETWEEN ? AND ?
+        GROUP BY c.fecha
+        ORDER BY c.fecha
+    """, (desde, hasta))
+
+    salida = []
+    for r in cur.fetchall():
+        fila = dict(r)
+        fila["choferes_disponibles"] = fila["choferes_total"] - fila["choferes_no_disponibles"]
+        fila["tractores_disponibles"] = fila["tractores_total"] - fila["tractores_no_disponibles"]
+        salida.append(fila)
+    return salida
+
+
+# =================================================
+# MANTENIMIENTO
+# =================================================
+def reconstruir(conn) -> int:
+    """
+    Recalcula la tabla completa desde `eventos` y `eventos_recursos`.
+    Devuelve las filas generadas.
+    """
+    with transaccion(conn):
+        cur = conn.cursor()
+        schema.reconstruir_disponibilidad_diaria(cur)
+        cur.execute("SELECT COUNT(*) FROM disponibilidad_diaria")
+        return cur.fetchone()[0]
+
+
+def _esperado(conn) -> tuple:
+    """
+    Filas que debería tener la tabla, expandiendo los eventos en Python
+    (sin pasar por calendario ni por los triggers).
+    """
+    cur = conn.cursor()
+    marcas = ",".join("?" for _ in schema.TIPOS_TALLER)
+    cur.execute(f"""
+        SELECT
+            'eventos' AS tabla_evento,
+            id, tipo, recurso_tipo, recurso_id, fecha_inicio, fecha_fin
+        FROM eventos
+        WHERE (tipo = 'FRANCO' AND recurso_tipo = 'CHOFER')
+           OR (tipo IN ({marcas}) AND recurso_tipo = 'TRACTOR')
+        UNION ALL
+        SELECT
+            'eventos_recursos',
+            id, tipo, 'TRACTOR', id_tractor, fecha_inicio, fecha_fin
+        FROM eventos_recursos
+        WHERE tipo IN ({marcas})
+          AND id_tractor IS NOT NULL
+          AND fecha_inicio IS NOT NULL
+    """, schema.TIPOS_TALLER * 2)
+
+    esperado = set()
+    fuera_de_calendario = []
+    for r in cur.fetchall():
+        # Mantenimiento abierto: bloquea hasta el final del calendario
+        fecha_fin = r["fecha_fin"] or schema.CALENDARIO_HASTA
+        if r["fecha_inicio"] < schema.CALENDARIO_DESDE or fecha_fin > schema.CALENDARIO_HASTA:
+            fuera_de_calendario.append((r["tabla_evento"], r["id"]))
+        motivo = "FRANCO" if r["tipo"] == "FRANCO" else "TALLER"
+        d = date.fromisoformat(max(r["fecha_inicio"], schema.CALENDARIO_DESDE))
+        fin = date.fromisoformat(min(fecha_fin, schema.CALENDARIO_HASTA))
+        while d <= fin:
+            esperado.add((
+                d.isoformat(), r["recurso_tipo"], r["recurso_id"],
+                r["tabla_evento"], r["id"], motivo,
+            ))
+            d += timedelta(days=1)
+    return esperado, fuera_de_calendario
+
+
+def verificar(conn) -> dict:
+    """
+    Compara disponibilidad_diaria contra los eventos crudos (`eventos` y
+    el taller de `eventos_recursos`).
+    faltantes: filas que deberían estar y no están.
+    sobrantes: filas que están y no corresponden a ningún evento.
+    fuera_de_calendario: (tabla, id) de los eventos que exceden la tabla
+    calendario (esos días no se materializan).
+    """
+    esperado, fuera = _esperado(conn)
+
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT fecha, recurso_tipo, recurso_id, tabla_evento, evento_id, motivo
+        FROM disponibilidad_diaria
+    """)
+    actual = {tuple(r) for r in cur.fetchall()}
+
+    faltantes = sorted(esperado - actual)
+    sobrantes = sorted(actual - esperado)
+    return {
+        "ok": not faltantes and not sobrantes,
+        "filas": len(actual),
+        "faltantes": faltantes,
+        "sobrantes": sobrantes,
+        "fuera_de_calendario": fuera,
+    }
+
+
+# =================================================
+# CLI
+# =================================================
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Mantenimiento de disponibilidad_diaria")
+    p.add_argument("--db", help="ruta de la base (por defecto la operativa)")
+    p.add_argument("--reconstruir", action="store_true")
+    p.add_argument("--verificar", action="store_true")
+    a = p.parse_args(argv)
+
+    conn = get_connection(db_path=a.db)
+
+    if a.reconstruir:
+        print(f"disponibilidad_diaria reconstruida: {reconstruir(conn)} filas")
+
+    if a.verificar or not a.reconstruir:
+        r = verificar(conn)
+        print(f"filas: {r['filas']}  faltantes: {len(r['faltantes'])}  sobrantes: {len(r['sobrantes'])}")
+        for fila in (r["faltantes"] + r["sobrantes"])[:20]:
+            print(f"  {fila}")
+        if r["fuera_de_calendario"]:
+            print(f"eventos fuera del calendario: {r['fuera_de_calendario']}")
+        return 0 if r["ok"] else 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,7 @@ y expone una API limpia para Programación.
 """
 
 from datetime import date
+from utils.fechas import a_fecha_iso
 from services.eventos_recursos import (
     chofer_en_franco,
     tractor_en_taller,
@@ -79,11 +80,11 @@ def listar_eventos(
 
     if desde:
         where.append("fecha_inicio >= ?")
-        params.append(desde)
+        params.append(a_fecha_iso(desde))
 
     if hasta:
         where.append("fecha_fin <= ?")
-        params.append(hasta)
+        params.append(a_fecha_iso(hasta))
 
     if recurso_tipo:
         where.append("recurso_tipo = ?")
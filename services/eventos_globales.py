@@ -1,4 +1,71 @@
-from datetime import datetime, date
+from utils.fechas import a_fecha_iso
+from utils.paginacion import (
+    TAMANO_PAGINA,
+    armar_pagina,
+    decodificar_cursor,
+    limitar_tamano,
+)
+
+# Todos los filtros van al WHERE: el rango de inicio_ts usa
+# idx_eventos_viaje_inicio (o idx_eventos_viaje_tipo si hay tipos) y la
+# duración se calcula en SQL, así un mes sobre una tabla de varios años
+# lee solo las filas del mes.
+_SELECT_EVENTOS = """
+    SELECT
+        e.id_evento,
+        e.tipo,
+        e.inicio_ts,
+        e.fin_ts,
+        e.observacion,
+        e.creado_por,
+        e.creado_en,
+        v.fecha,
+        v.id_chofer,
+        v.id_tractor AS tractor_id,
+        c.nombre AS chofer_nombre,
+        (CAST(strftime('%s', e.fin_ts) AS INTEGER)
+         - CAST(strftime('%s', e.inicio_ts) AS INTEGER)) / 60 AS duracion_min
+    FROM eventos_viaje e
+    JOIN viajes v ON v.id = e.viaje_id
+    LEFT JOIN choferes c ON c.id_chofer = v.id_chofer
+"""
+
+
+def tipo_db(tipo: str) -> str:
+    """
+    Etiqueta de la pantalla ("Demora carga") -> valor guardado ("DEMORA_CARGA").
+    """
+    return tipo.upper().replace(" ", "_")
+
+
+def filtros_eventos(desde=None, hasta=None, tipos=None, chofer_id=None, tractor_id=None):
+    """
+    (condiciones, parámetros) para eventos_viaje e / viajes v.
+    """
+    where, params = [], []
+
+    if desde:
+        where.append("e.inicio_ts >= ?")
+        params.append(a_fecha_iso(desde))
+    if hasta:
+        where.append("e.inicio_ts < date(?, '+1 day')")
+        params.append(a_fecha_iso(hasta))
+    if tipos:
+        tipos = sorted({tipo_db(t) for t in tipos})
+        where.append(f"e.tipo IN ({','.join('?' for _ in tipos)})")
+        params.extend(tipos)
+    if chofer_id is not None:
+        where.append("v.id_chofer = ?")
+        params.append(chofer_id)
+    if tractor_id is not None:
+        where.append("v.id_tractor = ?")
+        params.append(tractor_id)
+
+    return where, params
+
+
+def _where_sql(where) -> str:
+    return f"WHERE {' AND '.join(where)}" if where else ""
 
 
 def listar_eventos_globales(
@@ -7,61 +74,123 @@ def listar_eventos_globales(
     hasta,
     tipo=None,
     chofer_id=None,
-    tractor_id=None  # reservado para milestone futuro
+    tractor_id=None,
+    tipos=None,
 ):
     """
-    Lista eventos globales de viajes.
-    Incluye nombre de chofer (JOIN con maestros).
+    Lista eventos globales de viajes, por inicio.
+    Incluye nombre de chofer (JOIN con maestros) y duracion_min.
+    `tipo` (uno) se mantiene por compatibilidad; `tipos` acepta varios.
     """
+    if tipo:
+        tipos = list(tipos or []) + [tipo]
+    where, params = filtros_eventos(desde, hasta, tipos, chofer_id, tractor_id)
 
-    if desde is None:
-        desde = date(1900, 1, 1)
-    if hasta is None:
-        hasta = date(2100, 12, 31)
+    cur = conn.cursor()
+    cur.execute(f"""
+        {_SELECT_EVENTOS}
+        {_where_sql(where)}
+        ORDER BY e.inicio_ts, e.id_evento
+    """, params)
+    return [dict(r) for r in cur.fetchall()]
 
+
+def pagina_eventos_globales(
+    conn,
+    desde,
+    hasta,
+    tipos=None,
+    chofer_id=None,
+    tractor_id=None,
+    cursor=None,
+    tamano=TAMANO_PAGINA,
+) -> dict:
+    """
+    Una página de listar_eventos_globales, por (inicio_ts, id_evento).
+    Devuelve {"filas": [...], "siguiente": token | None}.
+    """
+    tamano = limitar_tamano(tamano)
+    where, params = filtros_eventos(desde, hasta, tipos, chofer_id, tractor_id)
+    if cursor:
+        where.append("(e.inicio_ts, e.id_evento) > (?, ?)")
+        params.extend(decodificar_cursor(cursor))
+
+    cur = conn.cursor()
+    cur.execute(f"""
+        {_SELECT_EVENTOS}
+        {_where_sql(where)}
+        ORDER BY e.inicio_ts, e.id_evento
+        LIMIT ?
+    """, params + [tamano + 1])
+
+    return armar_pagina(
+        [dict(r) for r in cur.fetchall()],
+        tamano,
+        lambda r: (r["inicio_ts"], r["id_evento"]),
+    )
+
+
+# -------------------------------------------------
+# Horas por día (cubo eventos_horas_dia)
+# -------------------------------------------------
+# eventos_horas_dia la mantienen los triggers (utils/schema.py): los KPIs
+# suman filas ya agregadas por día en vez de recorrer los eventos.
+DIMENSIONES_HORAS = ("fecha", "tipo", "id_chofer", "id_tractor", "id_cliente")
+
+
+def pivot_eventos_horas(
+    conn,
+    desde,
+    hasta,
+    dimensiones=("tipo",),
+    tipos=None,
+    chofer_id=None,
+    tractor_id=None,
+    cliente_id=None,
+):
+    """
+    Eventos y horas agrupados por `dimensiones` (de DIMENSIONES_HORAS).
+    [{<dimensiones>..., eventos, horas}] de más a menos horas.
+    """
+    invalidas = set(dimensiones) - set(DIMENSIONES_HORAS)
+    if invalidas:
+        raise ValueError(f"Dimensiones inválidas: {sorted(invalidas)}")
+
+    where = ["fecha BETWEEN ? AND ?"]
+    params = [a_fecha_iso(desde), a_fecha_iso(hasta)]
+    if tipos:
+        tipos = sorted({tipo_db(t) for t in tipos})
+        where.append(f"tipo IN ({','.join('?' for _ in tipos)})")
+        params.extend(tipos)
+    for columna, valor in (
+        ("id_chofer", chofer_id),
+        ("id_tractor", tractor_id),
+        ("id_cliente", cliente_id),
+    ):
+        if valor is not None:
+            where.append(f"{columna} = ?")
+            params.append(valor)
+
+    columnas = ", ".join(dimensiones)
     cur = conn.cursor()
-    cur.execute("""
+    cur.execute(f"""
         SELECT
-            e.id_evento,
-            e.tipo,
-            e.inicio_ts,
-            e.fin_ts,
-            e.observacion,
-            e.creado_por,
-            e.creado_en,
-            v.fecha,
-            v.id_chofer,
-            c.nombre AS chofer_nombre
-        FROM eventos_viaje e
-        JOIN viajes v ON v.id = e.viaje_id
-        LEFT JOIN choferes c ON c.id_chofer = v.id_chofer
-    """)
-
-    rows = [dict(r) for r in cur.fetchall()]
-    eventos = []
-
-    for r in rows:
-        inicio = datetime.fromisoformat(r["inicio_ts"])
-        fin = datetime.fromisoformat(r["fin_ts"]) if r["fin_ts"] else None
-
-        # filtro fechas
-        if not (desde <= inicio.date() <= hasta):
-            continue
-
-        # filtro tipo
-        if tipo:
-            tipo_db = tipo.upper().replace(" ", "_")
-            if r["tipo"] != tipo_db:
-                continue
-
-        # filtro chofer
-        if chofer_id is not None and r["id_chofer"] != chofer_id:
-            continue
-
-        r["duracion_min"] = (
-            int((fin - inicio).total_seconds() // 60) if fin else None
-        )
-
-        eventos.append(r)
-
-    return eventos
+            {columnas + "," if columnas else ""}
+            SUM(eventos)        AS eventos,
+            SUM(minutos) / 60.0 AS horas
+        FROM eventos_horas_dia
+        WHERE {' AND '.join(where)}
+        {"GROUP BY " + columnas if columnas else ""}
+        ORDER BY horas DESC
+    """, params)
+    return [dict(r) for r in cur.fetchall()]
+
+
+def horas_por_tipo(conn, desde, hasta, tipos=None, chofer_id=None, tractor_id=None):
+    """
+    Horas totales de eventos por tipo, con los mismos filtros.
+    [{tipo, eventos, horas}] de mayor a menor.
+    """
+    return pivot_eventos_horas(
+        conn, desde, hasta, ("tipo",), tipos, chofer_id, tractor_id,
+    )
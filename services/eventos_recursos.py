@@ -4,48 +4,25 @@ from datetime import date, timedelta
 from calendar import monthrange
 from collections import defaultdict
 
+from services import intervalos
+from utils.fechas import a_fecha_iso
+
 # =================================================
 # Helpers
 # =================================================
 def _to_iso(d):
-    return d.isoformat() if hasattr(d, "isoformat") else d
+    return a_fecha_iso(d)
 
 
 # =================================================
 # DISPONIBILIDAD
 # =================================================
 def chofer_en_franco(conn, chofer_id: int, fecha: date) -> bool:
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT 1
-        FROM eventos
-        WHERE tipo = 'FRANCO'
-          AND recurso_tipo = 'CHOFER'
-          AND recurso_id = ?
-          AND date(?) BETWEEN date(fecha_inicio) AND date(fecha_fin)
-        LIMIT 1
-        """,
-        (chofer_id, _to_iso(fecha)),
-    )
-    return cur.fetchone() is not None
+    return intervalos.ocupado(conn, intervalos.FRANCO, chofer_id, fecha)
 
 
 def tractor_en_taller(conn, tractor_id: int, fecha: date) -> bool:
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT 1
-        FROM eventos
-        WHERE tipo IN ('MANTENIMIENTO', 'TALLER', 'MANTENIMIENTO_CORRECTIVO')
-          AND recurso_tipo = 'TRACTOR'
-          AND recurso_id = ?
-          AND date(?) BETWEEN date(fecha_inicio) AND date(fecha_fin)
-        LIMIT 1
-        """,
-        (tractor_id, _to_iso(fecha)),
-    )
-    return cur.fetchone() is not None
+    return intervalos.ocupado(conn, intervalos.TALLER, tractor_id, fecha)
 
 
 # =================================================
@@ -127,6 +104,7 @@ def iniciar_franco(
 
 
     conn.commit()
+    intervalos.invalidar(conn)
 
 def finalizar_franco(
     conn,
@@ -150,6 +128,7 @@ def finalizar_franco(
     )
 
     conn.commit()
+    intervalos.invalidar(conn)
 
 # =================================================
 # CONSULTAS
@@ -3,6 +3,9 @@
 from __future__ import annotations
 from datetime import datetime
 
+from utils.db import confirmar, transaccion
+from utils.fechas import a_ts_iso
+
 # =================================================
 # VALIDACIÓN CENTRAL
 # =================================================
@@ -29,6 +32,22 @@ def duracion_evento_min(inicio_ts, fin_ts) -> int:
     return int((fin_ts - inicio_ts).total_seconds() // 60)
 
 
+def _con_duracion(r) -> dict:
+    d = dict(r)
+
+    inicio = d.get("inicio_ts")
+    fin = d.get("fin_ts")
+
+    inicio_dt = datetime.fromisoformat(inicio) if isinstance(inicio, str) else inicio
+    fin_dt = datetime.fromisoformat(fin) if isinstance(fin, str) else fin
+
+    d["duracion_min"] = (
+        duracion_evento_min(inicio_dt, fin_dt)
+        if inicio_dt and fin_dt else 0
+    )
+    return d
+
+
 # =================================================
 # EVENTOS GENÉRICOS DE VIAJE
 # =================================================
@@ -44,6 +63,7 @@ def crear_evento_viaje(
 ):
     _validar_viaje_no_finalizado(conn, viaje_id)
 
+    inicio_ts, fin_ts = a_ts_iso(inicio_ts), a_ts_iso(fin_ts)
     if fin_ts <= inicio_ts:
         raise ValueError("La fecha/hora fin debe ser posterior al inicio")
 
@@ -66,7 +86,7 @@ def crear_evento_viaje(
         usuario
     ))
 
-    conn.commit()
+    confirmar(conn)
     return cur.lastrowid
 
 
@@ -131,6 +151,7 @@ def crear_evento_demora(
     if tipo not in TIPOS_DEMORA:
         raise ValueError("Tipo de demora inválido")
 
+    inicio_ts, fin_ts = a_ts_iso(inicio_ts), a_ts_iso(fin_ts)
     if fin_ts <= inicio_ts:
         raise ValueError("La fecha/hora fin debe ser posterior al inicio")
 
@@ -152,10 +173,62 @@ def crear_evento_demora(
         observacion,
         usuario
     ))
-    conn.commit()
+    confirmar(conn)
     return cur.lastrowid
 
 
+def crear_eventos_demora(conn, demoras, usuario) -> int:
+    """
+    Carga varias demoras en una sola transacción.
+    demoras: dicts con viaje_id, tipo, inicio_ts, fin_ts y observacion (opcional).
+    Si alguna es inválida no se carga ninguna.
+    """
+    filas = []
+    for d in demoras:
+        if d["tipo"] not in TIPOS_DEMORA:
+            raise ValueError(f"Tipo de demora inválido: {d['tipo']}")
+        # Se compara ya normalizado: un datetime contra un texto no se
+        # puede comparar y dos textos en formatos distintos comparan mal.
+        inicio, fin = a_ts_iso(d["inicio_ts"]), a_ts_iso(d["fin_ts"])
+        if fin <= inicio:
+            raise ValueError("La fecha/hora fin debe ser posterior al inicio")
+        filas.append((
+            d["viaje_id"],
+            d["tipo"],
+            inicio,
+            fin,
+            d.get("observacion"),
+            usuario,
+        ))
+    if not filas:
+        return 0
+
+    with transaccion(conn):
+        cur = conn.cursor()
+        viajes_ids = list({f[0] for f in filas})
+        marcas = ",".join("?" for _ in viajes_ids)
+        cur.execute(f"""
+            SELECT id
+            FROM viajes
+            WHERE id IN ({marcas})
+              AND estado = 'FINALIZADO'
+        """, viajes_ids)
+        if cur.fetchone():
+            raise ValueError("No se pueden cargar eventos en un viaje FINALIZADO")
+
+        cur.executemany("""
+            INSERT INTO eventos_viaje (
+                viaje_id,
+                tipo,
+                inicio_ts,
+                fin_ts,
+                observacion,
+                creado_por
+            ) VALUES (?, ?, ?, ?, ?, ?)
+        """, filas)
+    return len(filas)
+
+
 def listar_demoras_viaje(conn, viaje_id):
     cur = conn.cursor()
     cur.execute("""
@@ -171,25 +244,7 @@ def listar_demoras_viaje(conn, viaje_id):
           AND tipo IN ('DEMORA_CARGA', 'DEMORA_DESCARGA', 'DEMORA_CHOFER')
         ORDER BY inicio_ts
     """, (viaje_id,))
-    rows = cur.fetchall()
-
-    demoras = []
-    for r in rows:
-        d = dict(r)
-
-        inicio = d.get("inicio_ts")
-        fin = d.get("fin_ts")
-
-        inicio_dt = datetime.fromisoformat(inicio) if isinstance(inicio, str) else inicio
-        fin_dt = datetime.fromisoformat(fin) if isinstance(fin, str) else fin
-
-        d["duracion_min"] = (
-            duracion_evento_min(inicio_dt, fin_dt)
-            if inicio_dt and fin_dt else 0
-        )
-        demoras.append(d)
-
-    return demoras
+    return [_con_duracion(r) for r in cur.fetchall()]
 
 
 def duracion_demoras_viaje(conn, viaje_id):
@@ -210,3 +265,82 @@ def duracion_demoras_viaje(conn, viaje_id):
         r["tipo"]: int(r["minutos"] or 0)
         for r in cur.fetchall()
     }
+
+
+# =================================================
+# DEMORAS DE VARIOS VIAJES (EN LOTE)
+# =================================================
+# Para listados: una consulta por tanda de ids en vez de dos por viaje.
+TAMANO_TANDA = 500
+
+
+def _ids_enteros(viajes_ids) -> dict:
+    """
+    {id como vino: id entero}. SQLite devuelve viaje_id entero: se
+    consulta y agrupa con el entero y se responde con la clave original.
+    """
+    return {v: int(v) for v in viajes_ids}
+
+
+def _tandas(viajes_ids):
+    ids = list(dict.fromkeys(viajes_ids))
+    for i in range(0, len(ids), TAMANO_TANDA):
+        yield ids[i:i + TAMANO_TANDA]
+
+
+def listar_demoras_viajes(conn, viajes_ids) -> dict:
+    """
+    {viaje_id: [demoras]} con las mismas columnas que listar_demoras_viaje().
+    Los viajes sin demoras quedan con lista vacía. Las claves son los ids
+    tal como vinieron (int o texto).
+    """
+    ids = _ids_enteros(viajes_ids)
+    demoras = {i: [] for i in ids.values()}
+    cur = conn.cursor()
+    for tanda in _tandas(demoras):
+        marcas = ",".join("?" for _ in tanda)
+        cur.execute(f"""
+            SELECT
+                viaje_id,
+                id_evento,
+                tipo,
+                inicio_ts,
+                fin_ts,
+                observacion,
+                creado_en
+            FROM eventos_viaje
+            WHERE viaje_id IN ({marcas})
+              AND tipo IN ('DEMORA_CARGA', 'DEMORA_DESCARGA', 'DEMORA_CHOFER')
+            ORDER BY viaje_id, inicio_ts
+        """, tanda)
+        for r in cur.fetchall():
+            d = _con_duracion(r)
+            demoras[d.pop("viaje_id")].append(d)
+    return {v: demoras[i] for v, i in ids.items()}
+
+
+def duracion_demoras_viajes(conn, viajes_ids) -> dict:
+    """
+    {viaje_id: {tipo: minutos}} como duracion_demoras_viaje(), agrupado
+    en una consulta por tanda. Mismas claves que listar_demoras_viajes().
+    """
+    ids = _ids_enteros(viajes_ids)
+    totales = {i: {} for i in ids.values()}
+    cur = conn.cursor()
+    for tanda in _tandas(totales):
+        marcas = ",".join("?" for _ in tanda)
+        cur.execute(f"""
+            SELECT
+                viaje_id,
+                tipo,
+                SUM(
+                    (JULIANDAY(fin_ts) - JULIANDAY(inicio_ts)) * 24 * 60
+                ) AS minutos
+            FROM eventos_viaje
+            WHERE viaje_id IN ({marcas})
+              AND tipo IN ('DEMORA_CARGA', 'DEMORA_DESCARGA', 'DEMORA_CHOFER')
+            GROUP BY viaje_id, tipo
+        """, tanda)
+        for r in cur.fetchall():
+            totales[r["viaje_id"]][r["tipo"]] = int(r["minutos"] or 0)
+    return {v: totales[i] for v, i in ids.items()}
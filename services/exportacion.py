@@ -0,0 +1,427 @@
+"""
+services/exportacion.py
+Exportaciones a Excel / CSV sin DataFrame.
+
+Las filas se leen del cursor de a TAMANO_TANDA y se escriben en un
+workbook write-only de openpyxl (o en un CSV) directo a un archivo en
+disco, y se devuelve ese archivo abierto (nunca sus bytes): la memoria
+no crece con la cantidad de filas ni con el tamaño del archivo.
+
+El archivo se arma solo cuando el usuario lo pide y queda en un caché en
+disco (data/cache_exportaciones), compartido por todas las sesiones y
+procesos. La clave es un sha256 de (base, consulta, parámetros, formato,
+versiones de las tablas leídas): mientras ninguna de esas tablas cambie
+(versiones_tabla, mantenida por triggers) se sirve el mismo archivo, y
+varios usuarios pidiendo el mismo reporte semanal lo arman una sola vez.
+
+El caché se recorta por LRU (fecha de último uso = mtime del archivo)
+a ENTRADAS_CACHE archivos y CACHE_MAXIMO_BYTES en total.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import uuid
+from datetime import datetime
+from typing import BinaryIO
+
+from services.eventos_globales import filtros_eventos
+from utils.db import BASE_DIR
+from utils.fechas import a_fecha_iso
+from utils.schema import versiones_datos
+
+TAMANO_TANDA = 1000
+CACHE_DIR = BASE_DIR / "data" / "cache_exportaciones"
+ENTRADAS_CACHE = 64
+CACHE_MAXIMO_BYTES = 200 * 1024 * 1024
+
+MIME = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+}
+
+_lock = threading.Lock()
+
+
+# =================================================
+# CACHÉ EN DISCO
+# =================================================
+def _clave_cache(conn, sql, params, columnas, formato, transformar, tablas) -> str:
+    partes = (
+        str(getattr(conn, "ruta", "")),
+        " ".join(sql.split()),
+        tuple(params),
+        tuple(columnas or ()),
+        formato,
+        getattr(transformar, "__qualname__", None),
+        versiones_datos(conn, tablas),
+    )
+    return hashlib.sha256(repr(partes).encode()).hexdigest()
+
+
+def _abrir_cache(clave: str, formato: str):
+    ruta = CACHE_DIR / f"{clave}.{formato}"
+    try:
+        archivo = open(ruta, "rb")
+    except OSError:
+        return None
+    try:
+        os.utime(ruta)          # último uso, para el LRU
+    except OSError:
+        pass
+    return archivo
+
+
+def _archivo_temporal():
+    """
+    (fd, ruta) de un archivo nuevo en CACHE_DIR; si no se puede escribir
+    ahí, en el temporal del sistema (sin caché se sigue funcionando).
+    """
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        return tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    except OSError:
+        return tempfile.mkstemp(suffix=".tmp")
+
+
+def _publicar(tmp: str, clave: str, formato: str) -> BinaryIO:
+    """
+    Renombra el archivo ya escrito a su nombre de caché (nadie lee un
+    archivo a medias) y lo devuelve abierto para leer.
+    """
+    try:
+        final = CACHE_DIR / f"{clave}.{formato}"
+        os.replace(tmp, final)
+    except OSError:
+        # fuera de CACHE_DIR: se lee el temporal y se borra al cerrarlo
+        # (en Windows queda en el temporal del sistema)
+        archivo = open(tmp, "rb")
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        return archivo
+
+    archivo = open(final, "rb")
+    _recortar_cache()
+    return archivo
+
+
+def _recortar_cache():
+    with _lock:
+        archivos = []
+        for ruta in CACHE_DIR.iterdir():
+            if ruta.suffix == ".tmp":
+                continue
+            try:
+                info = ruta.stat()
+            except OSError:
+                continue
+            archivos.append((info.st_mtime_ns, info.st_size, ruta))
+
+        archivos.sort(reverse=True)      # más recientes primero
+        total = 0
+        for i, (_, tamano, ruta) in enumerate(archivos):
+            total += tamano
+            if i >= ENTRADAS_CACHE or total > CACHE_MAXIMO_BYTES:
+                try:
+                    ruta.unlink()
+                except OSError:
+                    pass
+
+
+def vaciar_cache():
+    """
+    Borra todas las exportaciones guardadas (p. ej. después de restaurar
+    un backup, que vuelve atrás las versiones de las tablas).
+    """
+    with _lock:
+        if not CACHE_DIR.exists():
+            return
+        for ruta in CACHE_DIR.iterdir():
+            try:
+                ruta.unlink()
+            except OSError:
+                pass
+
+
+# =================================================
+# ESCRITURA
+# =================================================
+def _tandas(cur):
+    while True:
+        filas = cur.fetchmany(TAMANO_TANDA)
+        if not filas:
+            return
+        yield filas
+
+
+def _escribir_xlsx(destino, encabezados, filas):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(encabezados)
+    for fila in filas:
+        ws.append(fila)
+    wb.save(destino)
+
+
+def _escribir_csv(destino, encabezados, filas):
+    # utf-8-sig: Excel abre bien los acentos
+    texto = io.TextIOWrapper(destino, encoding="utf-8-sig", newline="")
+    w = csv.writer(texto)
+    w.writerow(encabezados)
+    w.writerows(filas)
+    texto.flush()
+    texto.detach()
+
+
+def exportar_consulta(
+    conn,
+    sql: str,
+    params=(),
+    columnas=None,
+    formato: str = "xlsx",
+    transformar=None,
+    tablas=(),
+) -> BinaryIO:
+    """
+    Ejecuta `sql` y devuelve el archivo (xlsx o csv) abierto en modo
+    binario, listo para st.download_button. Cerrarlo es del que llama.
+
+    columnas:    [(encabezado, clave)] a tomar de cada fila
+                 (por defecto, todas las columnas del SELECT).
+    transformar: fila (dict) -> dict, para formatear antes de escribir.
+    tablas:      tablas que lee la consulta; con ellas se arma la clave
+                 del caché. Sin tablas el archivo no se reutiliza.
+    """
+    if formato not in MIME:
+        raise ValueError(f"Formato de exportación inválido: {formato}")
+
+    if tablas:
+        clave = _clave_cache(conn, sql, params, columnas, formato, transformar, tablas)
+        archivo = _abrir_cache(clave, formato)
+        if archivo is not None:
+            return archivo
+    else:
+        clave = uuid.uuid4().hex    # nadie lo vuelve a pedir; lo borra el LRU
+
+    cur = conn.cursor()
+    cur.execute(sql, tuple(params))
+    if columnas is None:
+        nombres = [d[0] for d in cur.description]
+        columnas = [(n, n) for n in nombres]
+    encabezados = [titulo for titulo, _ in columnas]
+    claves = [c for _, c in columnas]
+
+    def filas():
+        for tanda in _tandas(cur):
+            for r in tanda:
+                d = dict(r)
+                if transformar:
+                    d = transformar(d)
+                yield [d.get(c) for c in claves]
+
+    fd, tmp = _archivo_temporal()
+    try:
+        with os.fdopen(fd, "wb") as destino:
+            if formato == "xlsx":
+                _escribir_xlsx(destino, encabezados, filas())
+            else:
+                _escribir_csv(destino, encabezados, filas())
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+    return _publicar(tmp, clave, formato)
+
+
+# =================================================
+# EXPORTACIONES DE LAS PÁGINAS
+# =================================================
+def exportar_viajes(
+    conn,
+    desde=None,
+    hasta=None,
+    estado=None,
+    id_chofer=None,
+    formato: str = "xlsx",
+) -> BinaryIO:
+    """
+    Viajes del rango con los mismos filtros que pagina_viajes()
+    (pages/2_viajes.py).
+    """
+    where, params = [], []
+    if desde:
+        where.append("v.fecha >= ?")
+        params.append(a_fecha_iso(desde))
+    if hasta:
+        where.append("v.fecha <= ?")
+        params.append(a_fecha_iso(hasta))
+    if estado:
+        where.append("v.estado = ?")
+        params.append(estado)
+    if id_chofer:
+        where.append("v.id_chofer = ?")
+        params.append(id_chofer)
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+    return exportar_consulta(
+        conn,
+        f"""
+            SELECT
+                v.fecha,
+                ch.nombre   AS chofer,
+                t.patente   AS tractor,
+                c.cliente   AS cliente,
+                o.origen    AS origen,
+                d.destino   AS destino,
+                m.material  AS material
+            FROM viajes v
+            LEFT JOIN choferes   ch ON ch.id_chofer   = v.id_chofer
+            LEFT JOIN tractores  t  ON t.id_tractor  = v.id_tractor
+            LEFT JOIN clientes   c  ON c.id_cliente  = v.id_cliente
+            LEFT JOIN materiales m  ON m.id_material = v.id_material
+            LEFT JOIN origenes   o  ON o.id_origen   = v.id_origen
+            LEFT JOIN destinos   d  ON d.id_destino  = v.id_destino
+            {where_sql}
+            ORDER BY v.fecha DESC, v.id DESC
+        """,
+        params,
+        columnas=[
+            ("Fecha", "fecha"),
+            ("Chofer", "chofer"),
+            ("Patente", "tractor"),
+            ("Cliente", "cliente"),
+            ("Origen", "origen"),
+            ("Destino", "destino"),
+            ("Material", "material"),
+        ],
+        formato=formato,
+        tablas=("viajes", "choferes", "tractores", "clientes",
+                "materiales", "origenes", "destinos"),
+    )
+
+
+def exportar_programacion_semana(conn, lunes, hasta, formato: str = "xlsx") -> BinaryIO:
+    """
+    Líneas PROGRAMACION de la semana (pages/1_programacion.py).
+    """
+    return exportar_consulta(
+        conn,
+        """
+            SELECT
+                l.id,
+                l.fecha,
+                ch.nombre AS chofer,
+                l.id_material,
+                m.material AS material,
+                l.estado
+            FROM lineas_dia l
+            LEFT JOIN choferes ch
+                   ON ch.id_chofer = l.id_chofer
+            LEFT JOIN materiales m
+                   ON m.id_material = l.id_material
+            WHERE l.fecha BETWEEN ? AND ?
+              AND l.origen_linea = 'PROGRAMACION'
+            ORDER BY l.fecha, ch.nombre
+        """,
+        (a_fecha_iso(lunes), a_fecha_iso(hasta)),
+        formato=formato,
+        tablas=("lineas_dia", "choferes", "materiales"),
+    )
+
+
+def _formatear_evento(e: dict) -> dict:
+    inicio_dt = datetime.fromisoformat(e["inicio_ts"])
+    fin_dt = datetime.fromisoformat(e["fin_ts"]) if e["fin_ts"] else None
+
+    if fin_dt:
+        horas, rem = divmod(int((fin_dt - inicio_dt).total_seconds()), 3600)
+        duracion = f"{horas:02}:{rem // 60:02} h"
+    else:
+        duracion = "En curso"
+
+    return {
+        "Inicio": inicio_dt.strftime("%Y-%m-%d %H:%M"),
+        "Fin": fin_dt.strftime("%Y-%m-%d %H:%M") if fin_dt else "—",
+        "Duración": duracion,
+        "Tipo": e["tipo"],
+        "Chofer": e["chofer_nombre"] or e["id_chofer"] or "—",
+        "Tractor": e["tractor_id"] or "—",
+        "Observación": e["observacion"] or "",
+    }
+
+
+def exportar_eventos_globales(
+    conn,
+    desde,
+    hasta,
+    tipos=None,
+    chofer_id=None,
+    tractor_id=None,
+    formato: str = "xlsx",
+) -> BinaryIO:
+    """
+    Eventos de viaje con los filtros de pages/8_eventos_global.py
+    (mismas columnas que la grilla).
+    """
+    where, params = filtros_eventos(desde, hasta, tipos, chofer_id, tractor_id)
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+    return exportar_consulta(
+        conn,
+        f"""
+            SELECT
+                e.tipo,
+                e.inicio_ts,
+                e.fin_ts,
+                e.observacion,
+                v.id_chofer,
+                v.id_tractor AS tractor_id,
+                c.nombre AS chofer_nombre
+            FROM eventos_viaje e
+            JOIN viajes v ON v.id = e.viaje_id
+            LEFT JOIN choferes c ON c.id_chofer = v.id_chofer
+            {where_sql}
+            ORDER BY e.inicio_ts, e.id_evento
+        """,
+        params,
+        columnas=[(c, c) for c in (
+            "Inicio", "Fin", "Duración", "Tipo", "Chofer", "Tractor", "Observación",
+        )],
+        formato=formato,
+        transformar=_formatear_evento,
+        tablas=("eventos_viaje", "viajes", "choferes"),
+    )
+
+
+def exportar_chofer_tractor(conn, formato: str = "xlsx") -> BinaryIO:
+    """
+    Asignaciones chofer ⇄ tractor de los choferes activos (pages/9_chofer_tractor.py).
+    """
+    return exportar_consulta(
+        conn,
+        """
+            SELECT
+                ch.nombre AS chofer,
+                COALESCE(t.id_tractor, '—') AS tractor,
+                COALESCE(t.patente, '—') AS patente,
+                COALESCE(t.estado, '—') AS estado_tractor
+            FROM choferes ch
+            LEFT JOIN tractores t ON t.id_tractor = ch.id_tractor
+            WHERE ch.activo = 1
+            ORDER BY ch.nombre
+        """,
+        formato=formato,
+        tablas=("choferes", "tractores"),
+    )
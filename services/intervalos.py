@@ -0,0 +1,174 @@
+"""
+services/intervalos.py
+Índice en memoria de francos y taller por recurso.
+
+Se arma (lazy) con una consulta a `eventos` (francos y taller) y otra a
+`eventos_recursos` (mantenimientos de services/taller.py) y responde
+"¿está de franco / en taller tal día o en tal rango?" con bisect,
+O(log n) por recurso, sin ir a SQLite.
+
+Un mantenimiento sin fecha_fin está abierto: cuenta hasta ABIERTO.
+
+Es por proceso y por base. Lo invalidan las funciones que escriben
+eventos (iniciar/finalizar franco y mantenimiento); como red para
+escrituras de otros procesos, además vence a los EDAD_MAXIMA_S.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from utils.fechas import a_fecha_iso
+
+EDAD_MAXIMA_S = 60
+
+FRANCO = "FRANCO"
+TALLER = "TALLER"
+
+# Fin de un intervalo abierto (mantenimiento sin fecha_fin)
+ABIERTO = "9999-12-31"
+
+# Mismo criterio que eventos_recursos.chofer_en_franco / tractor_en_taller
+TIPOS_TALLER = ("MANTENIMIENTO", "TALLER", "MANTENIMIENTO_CORRECTIVO")
+
+_indices = {}   # clave de base -> (creado, {(categoria, recurso_id): (inicios, fines)})
+_lock = threading.Lock()
+
+
+# =================================================
+# CONSTRUCCIÓN
+# =================================================
+def _clave(conn):
+    ruta = getattr(conn, "ruta", None)
+    if not ruta or ruta == ":memory:":
+        return id(conn)
+    return ruta
+
+
+def _fusionar(intervalos):
+    """
+    Ordena y une intervalos solapados.
+    Fechas ISO: se comparan como texto.
+    """
+    inicios, fines = [], []
+    for fi, ff in sorted(intervalos):
+        if fines and fi <= fines[-1]:
+            if ff > fines[-1]:
+                fines[-1] = ff
+            continue
+        inicios.append(fi)
+        fines.append(ff)
+    return inicios, fines
+
+
+def _construir(conn) -> dict:
+    marcas = ",".join("?" for _ in TIPOS_TALLER)
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT tipo, recurso_tipo, recurso_id, fecha_inicio, fecha_fin
+        FROM eventos
+        WHERE tipo IN ('FRANCO', {marcas})
+    """, TIPOS_TALLER)
+
+    crudos = {}
+    for r in cur.fetchall():
+        if r["tipo"] == "FRANCO" and r["recurso_tipo"] == "CHOFER":
+            categoria = FRANCO
+        elif r["tipo"] in TIPOS_TALLER and r["recurso_tipo"] == "TRACTOR":
+            categoria = TALLER
+        else:
+            continue
+        if not r["fecha_inicio"] or not r["fecha_fin"]:
+            continue
+        crudos.setdefault((categoria, r["recurso_id"]), []).append(
+            (r["fecha_inicio"], r["fecha_fin"])
+        )
+
+    cur.execute(f"""
+        SELECT id_tractor, fecha_inicio, COALESCE(fecha_fin, ?) AS fecha_fin
+        FROM eventos_recursos
+        WHERE tipo IN ({marcas})
+          AND id_tractor IS NOT NULL
+          AND fecha_inicio IS NOT NULL
+    """, (ABIERTO, *TIPOS_TALLER))
+    for r in cur.fetchall():
+        crudos.setdefault((TALLER, r["id_tractor"]), []).append(
+            (r["fecha_inicio"], r["fecha_fin"])
+        )
+
+    return {clave: _fusionar(ivs) for clave, ivs in crudos.items()}
+
+
+def _indice(conn) -> dict:
+    clave = _clave(conn)
+    actual = _indices.get(clave)
+    if actual and time.monotonic() - actual[0] < EDAD_MAXIMA_S:
+        return actual[1]
+
+    with _lock:
+        actual = _indices.get(clave)
+        if actual and time.monotonic() - actual[0] < EDAD_MAXIMA_S:
+            return actual[1]
+        indice = _construir(conn)
+        _indices[clave] = (time.monotonic(), indice)
+        return indice
+
+
+def invalidar(conn=None):
+    """
+    Descarta el índice de la base de `conn` (o todos). Se llama después de
+    escribir francos / mantenimientos.
+    """
+    with _lock:
+        if conn is None:
+            _indices.clear()
+        else:
+            _indices.pop(_clave(conn), None)
+
+
+# =================================================
+# CONSULTAS
+# =================================================
+def ocupado(conn, categoria: str, recurso_id, fecha) -> bool:
+    """
+    ¿El recurso tiene un intervalo de `categoria` que cubre `fecha`?
+    """
+    ivs = _indice(conn).get((categoria, recurso_id))
+    if not ivs:
+        return False
+    f = a_fecha_iso(fecha)
+    inicios, fines = ivs
+    i = bisect_right(inicios, f) - 1
+    return i >= 0 and fines[i] >= f
+
+
+def ocupado_en_rango(conn, categoria: str, recurso_id, desde, hasta) -> bool:
+    """
+    ¿Algún intervalo del recurso se solapa con [desde, hasta]?
+    """
+    ivs = _indice(conn).get((categoria, recurso_id))
+    if not ivs:
+        return False
+    inicios, fines = ivs
+    i = bisect_right(inicios, a_fecha_iso(hasta)) - 1
+    return i >= 0 and fines[i] >= a_fecha_iso(desde)
+
+
+def intervalos_en_rango(conn, categoria: str, desde, hasta) -> list:
+    """
+    (recurso_id, inicio, fin) de todos los intervalos de `categoria` que
+    se solapan con [desde, hasta].
+    """
+    d, h = a_fecha_iso(desde), a_fecha_iso(hasta)
+    salida = []
+    for (cat, recurso_id), (inicios, fines) in _indice(conn).items():
+        if cat != categoria:
+            continue
+        # Fusionados, inicios y fines quedan ordenados: se solapan los
+        # que terminan >= desde y empiezan <= hasta.
+        j = bisect_right(inicios, h)
+        i = bisect_left(fines, d, 0, j)
+        salida.extend((recurso_id, inicios[k], fines[k]) for k in range(i, j))
+    return salida
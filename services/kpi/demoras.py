@@ -1,5 +1,8 @@
 from datetime import date
 
+from services.eventos_viaje import duracion_demoras_viajes
+from utils.fechas import a_fecha_iso
+
 # Tipos válidos de demoras
 TIPOS_DEMORA = (
     "DEMORA_CARGA",
@@ -10,34 +13,29 @@ TIPOS_DEMORA = (
 # =================================================
 # KPI: DEMORAS POR VIAJE
 # =================================================
-def kpi_demoras_por_viaje(conn, viaje_id: str):
+def kpi_demoras_por_viajes(conn, viajes_ids) -> dict:
     """
-    Devuelve minutos de demora por tipo y total para un viaje.
+    {viaje_id: minutos de demora por tipo y total}, una consulta
+    agrupada para todos los viajes.
     """
-    cur = conn.cursor()
-
-    cur.execute(f"""
-        SELECT
-            tipo,
-            SUM(
-                (JULIANDAY(fin_ts) - JULIANDAY(inicio_ts)) * 24 * 60
-            ) AS minutos
-        FROM eventos_viaje
-        WHERE viaje_id = ?
-          AND tipo IN {TIPOS_DEMORA}
-        GROUP BY tipo
-    """, (viaje_id,))
-
-    data = {r["tipo"]: int(r["minutos"] or 0) for r in cur.fetchall()}
-
     return {
-        "demora_carga": data.get("DEMORA_CARGA", 0),
-        "demora_descarga": data.get("DEMORA_DESCARGA", 0),
-        "demora_chofer": data.get("DEMORA_CHOFER", 0),
-        "total": sum(data.values()),
+        viaje_id: {
+            "demora_carga": data.get("DEMORA_CARGA", 0),
+            "demora_descarga": data.get("DEMORA_DESCARGA", 0),
+            "demora_chofer": data.get("DEMORA_CHOFER", 0),
+            "total": sum(data.values()),
+        }
+        for viaje_id, data in duracion_demoras_viajes(conn, viajes_ids).items()
     }
 
 
+def kpi_demoras_por_viaje(conn, viaje_id: str):
+    """
+    Devuelve minutos de demora por tipo y total para un viaje.
+    """
+    return kpi_demoras_por_viajes(conn, [viaje_id])[viaje_id]
+
+
 # =================================================
 # KPI: DEMORAS POR DÍA
 # =================================================
@@ -54,11 +52,11 @@ def kpi_demoras_por_dia(conn, fecha: date):
                 (JULIANDAY(e.fin_ts) - JULIANDAY(e.inicio_ts)) * 24 * 60
             ) AS minutos
         FROM eventos_viaje e
-        JOIN viajes v ON v.id_viaje = e.viaje_id
-        WHERE DATE(v.fecha) = DATE(?)
+        JOIN viajes v ON v.id = e.viaje_id
+        WHERE v.fecha = ?
           AND e.tipo IN {TIPOS_DEMORA}
         GROUP BY e.tipo
-    """, (fecha,))
+    """, (a_fecha_iso(fecha),))
 
     data = {r["tipo"]: int(r["minutos"] or 0) for r in cur.fetchall()}
 
@@ -87,13 +85,13 @@ def kpi_demoras_por_cliente(conn, desde, hasta):
                 (JULIANDAY(e.fin_ts) - JULIANDAY(e.inicio_ts)) * 24 * 60
             ) AS minutos
         FROM eventos_viaje e
-        JOIN viajes v   ON v.id_viaje = e.viaje_id
-        JOIN clientes c ON c.id_cliente = v.cliente_id
-        WHERE DATE(v.fecha) BETWEEN DATE(?) AND DATE(?)
+        JOIN viajes v   ON v.id = e.viaje_id
+        JOIN clientes c ON c.id_cliente = v.id_cliente
+        WHERE v.fecha BETWEEN ? AND ?
           AND e.tipo IN {TIPOS_DEMORA}
         GROUP BY c.cliente
         ORDER BY minutos DESC
-    """, (desde, hasta))
+    """, (a_fecha_iso(desde), a_fecha_iso(hasta)))
 
     return [
         {
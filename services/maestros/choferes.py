@@ -7,12 +7,6 @@ COLUMNAS_REQUERIDAS = {"ID_chofer", "Nombre", "Transporte"}
 # =====================================================
 # Utils
 # =====================================================
-def _table_columns(conn, table_name: str) -> set[str]:
-    cur = conn.cursor()
-    cur.execute(f"PRAGMA table_info({table_name})")
-    return {row[1] for row in cur.fetchall()}
-
-
 def _file_hash(path: str) -> str:
     h = hashlib.md5()
     with open(path, "rb") as f:
@@ -31,9 +25,6 @@ def importar_choferes_desde_excel(conn, ruta_excel: str):
         faltantes = COLUMNAS_REQUERIDAS - set(df.columns)
         raise ValueError(f"Faltan columnas en Choferes: {faltantes}")
 
-    cols = _table_columns(conn, "choferes")
-    usa_transporte = "transporte" in cols
-
     cur = conn.cursor()
 
     for _, row in df.iterrows():
@@ -45,30 +36,18 @@ def importar_choferes_desde_excel(conn, ruta_excel: str):
         nombre = str(row["Nombre"]).strip()
         transporte = str(row["Transporte"]).strip()
 
-        if usa_transporte:
-            cur.execute("""
-                INSERT INTO choferes (id_chofer, nombre, transporte, activo)
-                VALUES (?, ?, ?, 1)
-                ON CONFLICT(id_chofer) DO UPDATE SET
-                    nombre = excluded.nombre,
-                    transporte = excluded.transporte,
-                    activo = 1
-            """, (
-                str(id_chofer).strip(),
-                nombre,
-                transporte
-            ))
-        else:
-            cur.execute("""
-                INSERT INTO choferes (id_chofer, nombre, activo)
-                VALUES (?, ?, 1)
-                ON CONFLICT(id_chofer) DO UPDATE SET
-                    nombre = excluded.nombre,
-                    activo = 1
-            """, (
-                str(id_chofer).strip(),
-                nombre
-            ))
+        cur.execute("""
+            INSERT INTO choferes (id_chofer, nombre, transporte, activo)
+            VALUES (?, ?, ?, 1)
+            ON CONFLICT(id_chofer) DO UPDATE SET
+                nombre = excluded.nombre,
+                transporte = excluded.transporte,
+                activo = 1
+        """, (
+            str(id_chofer).strip(),
+            nombre,
+            transporte
+        ))
 
     conn.commit()
 
@@ -22,12 +22,6 @@ COLUMNAS_REQUERIDAS = {"ID_Material", "Material"}
 # =====================================================
 # Utils
 # =====================================================
-def _table_columns(conn, table_name: str) -> set[str]:
-    cur = conn.cursor()
-    cur.execute(f"PRAGMA table_info({table_name})")
-    return {row[1] for row in cur.fetchall()}
-
-
 def _file_hash(path: str) -> str:
     h = hashlib.md5()
     with open(path, "rb") as f:
@@ -50,9 +44,6 @@ def importar_materiales_desde_excel(conn, ruta_excel):
         faltantes = COLUMNAS_REQUERIDAS - set(df.columns)
         raise ValueError(f"Faltan columnas en Materiales: {faltantes}")
 
-    cols = _table_columns(conn, "materiales")
-    usa_activo = "activo" in cols
-
     cur = conn.cursor()
 
     for _, row in df.iterrows():
@@ -63,27 +54,16 @@ def importar_materiales_desde_excel(conn, ruta_excel):
 
         material = str(row["Material"]).strip()
 
-        if usa_activo:
-            cur.execute("""
-                INSERT INTO materiales (id_material, material, activo)
-                VALUES (?, ?, 1)
-                ON CONFLICT(id_material) DO UPDATE SET
-                    material = excluded.material,
-                    activo = 1
-            """, (
-                str(id_material).strip(),
-                material
-            ))
-        else:
-            cur.execute("""
-                INSERT INTO materiales (id_material, material)
-                VALUES (?, ?)
-                ON CONFLICT(id_material) DO UPDATE SET
-                    material = excluded.material
-            """, (
-                str(id_material).strip(),
-                material
-            ))
+        cur.execute("""
+            INSERT INTO materiales (id_material, material, activo)
+            VALUES (?, ?, 1)
+            ON CONFLICT(id_material) DO UPDATE SET
+                material = excluded.material,
+                activo = 1
+        """, (
+            str(id_material).strip(),
+            material
+        ))
 
     conn.commit()
 
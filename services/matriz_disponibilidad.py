@@ -0,0 +1,193 @@
+"""
+services/matriz_disponibilidad.py
+Matriz recursos × días de disponibilidad para las vistas de planificación
+(heatmap mensual, programación semanal).
+
+Se arma con los intervalos de franco / taller del índice en memoria
+(services/intervalos.py) y un llenado vectorizado por diferencias:
++1 en el día de inicio, -1 el día siguiente al fin y cumsum por fila.
+No hay un bucle por recurso × día.
+
+    m = matriz_choferes(conn, desde, hasta)
+    m.disponible      bool [recursos, días]
+    m.motivo          int8 [recursos, días]  (MOTIVO_*)
+    m.recursos[i]     id del recurso de la fila i
+    m.fechas[j]       date de la columna j
+"""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+
+from services import intervalos
+from utils.fechas import a_fecha_iso
+
+# Códigos de motivo (matriz int8)
+MOTIVO_DISPONIBLE = 0
+MOTIVO_FRANCO = 1
+MOTIVO_TALLER = 2
+MOTIVO_SIN_TRACTOR = 3
+
+MOTIVOS = {
+    MOTIVO_DISPONIBLE: "DISPONIBLE",
+    MOTIVO_FRANCO: "FRANCO",
+    MOTIVO_TALLER: "TALLER",
+    MOTIVO_SIN_TRACTOR: "SIN_TRACTOR",
+}
+
+
+@dataclass
+class MatrizDisponibilidad:
+    recursos: list
+    fechas: list
+    motivo: np.ndarray
+
+    @property
+    def disponible(self) -> np.ndarray:
+        return self.motivo == MOTIVO_DISPONIBLE
+
+    def fila(self, recurso_id) -> int:
+        return self.recursos.index(recurso_id)
+
+
+# =================================================
+# CONSTRUCCIÓN
+# =================================================
+def _rango(desde, hasta) -> tuple:
+    desde = date.fromisoformat(a_fecha_iso(desde))
+    hasta = date.fromisoformat(a_fecha_iso(hasta)) if hasta else desde
+    return desde, hasta
+
+
+def _ocupacion(ivs, recursos: list, desde: date, dias: int) -> np.ndarray:
+    """
+    bool [recursos, días]: True donde algún intervalo cubre el día.
+    """
+    posicion = {r: i for i, r in enumerate(recursos)}
+    filas, inicios, fines = [], [], []
+    for recurso_id, fi, ff in ivs:
+        i = posicion.get(recurso_id)
+        if i is None:
+            continue
+        filas.append(i)
+        inicios.append(max((date.fromisoformat(fi) - desde).days, 0))
+        fines.append(min((date.fromisoformat(ff) - desde).days, dias - 1) + 1)
+
+    # Una columna extra para el -1 del último día
+    delta = np.zeros((len(recursos), dias + 1), dtype=np.int32)
+    if filas:
+        filas = np.asarray(filas)
+        np.add.at(delta, (filas, np.asarray(inicios)), 1)
+        np.add.at(delta, (filas, np.asarray(fines)), -1)
+    return np.cumsum(delta, axis=1)[:, :dias] > 0
+
+
+def _matriz(conn, categoria: str, motivo: int, recursos: list, desde, hasta):
+    desde, hasta = _rango(desde, hasta)
+    dias = (hasta - desde).days + 1
+    ocupado = _ocupacion(
+        intervalos.intervalos_en_rango(conn, categoria, desde, hasta),
+        recursos, desde, dias,
+    )
+    return MatrizDisponibilidad(
+        recursos=list(recursos),
+        fechas=[desde + timedelta(days=j) for j in range(dias)],
+        motivo=np.where(ocupado, motivo, MOTIVO_DISPONIBLE).astype(np.int8),
+    )
+
+
+def matriz_choferes(conn, desde, hasta=None, choferes=None) -> MatrizDisponibilidad:
+    """
+    Choferes (por defecto los activos) × días, motivo FRANCO.
+    """
+    if choferes is None:
+        cur = conn.cursor()
+        cur.execute("SELECT id_chofer FROM choferes WHERE activo = 1 ORDER BY nombre")
+        choferes = [r["id_chofer"] for r in cur.fetchall()]
+    return _matriz(conn, intervalos.FRANCO, MOTIVO_FRANCO, choferes, desde, hasta)
+
+
+def matriz_tractores(conn, desde, hasta=None, tractores=None) -> MatrizDisponibilidad:
+    """
+    Tractores (por defecto los activos) × días, motivo TALLER.
+    """
+    if tractores is None:
+        cur = conn.cursor()
+        cur.execute("SELECT id_tractor FROM tractores WHERE activo = 1 ORDER BY id_tractor")
+        tractores = [r["id_tractor"] for r in cur.fetchall()]
+    return _matriz(conn, intervalos.TALLER, MOTIVO_TALLER, tractores, desde, hasta)
+
+
+def matriz_choferes_con_tractor(conn, desde, hasta=None) -> MatrizDisponibilidad:
+    """
+    Chofer disponible Y su tractor asignado operativo, por día.
+    Motivo: FRANCO del chofer, si no TALLER del tractor, si no
+    SIN_TRACTOR cuando no tiene uno activo asignado.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT c.id_chofer, t.id_tractor
+        FROM choferes c
+        LEFT JOIN tractores t
+               ON t.id_tractor = c.id_tractor
+              AND t.activo = 1
+        WHERE c.activo = 1
+        ORDER BY c.nombre
+    """)
+    pares = cur.fetchall()
+    choferes = [r["id_chofer"] for r in pares]
+    asignados = [r["id_tractor"] for r in pares]
+
+    m_ch = matriz_choferes(conn, desde, hasta, choferes=choferes)
+    m_tr = matriz_tractores(conn, desde, hasta, tractores=sorted({t for t in asignados if t}))
+
+    # Fila del tractor de cada chofer (-1 = sin tractor)
+    posicion = {t: i for i, t in enumerate(m_tr.recursos)}
+    idx = np.array([posicion.get(t, -1) for t in asignados], dtype=np.int64)
+    sin_tractor = idx < 0
+
+    motivo = m_ch.motivo.copy()
+    if len(m_tr.recursos):
+        taller = m_tr.motivo[np.where(sin_tractor, 0, idx)] == MOTIVO_TALLER
+        taller[sin_tractor] = False
+        motivo[(motivo == MOTIVO_DISPONIBLE) & taller] = MOTIVO_TALLER
+    motivo[(motivo == MOTIVO_DISPONIBLE) & sin_tractor[:, None]] = MOTIVO_SIN_TRACTOR
+
+    return MatrizDisponibilidad(recursos=choferes, fechas=m_ch.fechas, motivo=motivo)
+
+
+# =================================================
+# AGREGADOS
+# =================================================
+def totales_diarios(m: MatrizDisponibilidad) -> np.ndarray:
+    """
+    Recursos disponibles por día (int [días]).
+    """
+    return m.disponible.sum(axis=0)
+
+
+def dias_por_recurso(m: MatrizDisponibilidad, motivo: int = MOTIVO_DISPONIBLE) -> np.ndarray:
+    """
+    Días con `motivo` por recurso (int [recursos]).
+    """
+    return (m.motivo == motivo).sum(axis=1)
+
+
+def conteo_motivos(m: MatrizDisponibilidad) -> dict:
+    """
+    {motivo: int [días]} con cuántos recursos tienen cada motivo por día.
+    """
+    return {
+        nombre: (m.motivo == codigo).sum(axis=0)
+        for codigo, nombre in MOTIVOS.items()
+    }
+
+
+def interseccion(a: MatrizDisponibilidad, b: MatrizDisponibilidad) -> np.ndarray:
+    """
+    bool [recursos, días]: disponible en `a` y en `b` (mismos recursos y fechas).
+    """
+    if a.recursos != b.recursos or a.fechas != b.fechas:
+        raise ValueError("Las matrices no tienen los mismos recursos y fechas")
+    return a.disponible & b.disponible
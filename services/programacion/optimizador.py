@@ -0,0 +1,213 @@
+"""
+services/programacion/optimizador.py
+Propuesta automática de programación semanal.
+
+Entrada: objetivos por día y material (cantidad de líneas chofer-día,
+p. ej. {"Lunes": {"M_01": 20, "M_02": 12}}), la disponibilidad de
+choferes con su tractor asignado (services/matriz_disponibilidad.py) y
+un tope de días por chofer.
+
+Heurística greedy:
+  - los días se resuelven del más ajustado (menos choferes sobrantes)
+    al más holgado, para no gastar en un día fácil a los que hacen falta
+    en uno difícil;
+  - en cada día se asignan primero los choferes con menos días en la
+    semana (reparto parejo) y, a igualdad, los que ya venían con ese
+    material (menos cambios de carga);
+  - las líneas PROGRAMACION que ya existen cuentan para el objetivo y
+    para el tope del chofer; una CANCELADO no cuenta para ninguno de los
+    dos pero deja ocupado ese chofer-día (mismo criterio que
+    aplicar_plan_semanas: una línea cancelada no se reactiva).
+
+Con 300 choferes la semana se resuelve en milisegundos: la planilla
+puede recalcular en vivo.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import numpy as np
+
+from services.matriz_disponibilidad import matriz_choferes_con_tractor
+from services.programacion.semanal import (
+    MAPA_DIAS,
+    _domingo_de_semana,
+    _lunes_de_semana,
+)
+from utils.db import transaccion
+from utils.fechas import a_fecha_iso
+
+MAX_DIAS_POR_CHOFER = 6
+
+_INSERTAR_LINEA = """
+    INSERT OR IGNORE INTO lineas_dia (
+        fecha,
+        id_chofer,
+        id_tractor,
+        id_material,
+        estado,
+        origen_linea,
+        creado_por
+    )
+    VALUES (?, ?, ?, ?, 'PENDIENTE', 'PROGRAMACION', ?)
+"""
+
+
+# =================================================
+# HELPERS
+# =================================================
+def _fecha_objetivo(lunes: date, clave) -> str:
+    """
+    "Lunes".."Domingo" o una fecha de la semana -> fecha ISO.
+    """
+    if clave in MAPA_DIAS:
+        return (lunes + timedelta(days=MAPA_DIAS[clave])).isoformat()
+    return a_fecha_iso(clave)
+
+
+def _lineas_existentes(conn, lunes: date, domingo: date) -> dict:
+    """
+    {(fecha_iso, id_chofer): (id_material, estado)} de las líneas ya
+    programadas, CANCELADO incluidas.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT fecha, id_chofer, id_material, estado
+        FROM lineas_dia
+        WHERE fecha BETWEEN ? AND ?
+          AND origen_linea = 'PROGRAMACION'
+    """, (lunes.isoformat(), domingo.isoformat()))
+    return {
+        (r["fecha"], r["id_chofer"]): (r["id_material"], r["estado"])
+        for r in cur.fetchall()
+    }
+
+
+# =================================================
+# OPTIMIZAR
+# =================================================
+def optimizar_semana(
+    conn,
+    fecha_desde: date,
+    objetivos: dict,
+    max_dias_por_chofer: int = MAX_DIAS_POR_CHOFER,
+    choferes_ids: list[str] | None = None,
+) -> dict:
+    """
+    Calcula la propuesta sin escribir nada.
+
+    Devuelve:
+      asignaciones:     [{fecha, id_chofer, id_tractor, id_material}]
+      faltantes:        {fecha_iso: {id_material: n}} objetivos no cubiertos
+      dias_por_chofer:  {id_chofer: días en la semana (existentes + nuevos)}
+    """
+    lunes = _lunes_de_semana(fecha_desde)
+    domingo = _domingo_de_semana(fecha_desde)
+
+    matriz = matriz_choferes_con_tractor(conn, lunes, domingo)
+    cur = conn.cursor()
+    cur.execute("SELECT id_chofer, id_tractor FROM choferes WHERE activo = 1")
+    tractor_de = {r["id_chofer"]: r["id_tractor"] for r in cur.fetchall()}
+
+    choferes = matriz.recursos
+    disponible = matriz.disponible.copy()
+    if choferes_ids is not None:
+        elegidos = set(choferes_ids)
+        disponible &= np.array([c in elegidos for c in choferes], dtype=bool)[:, None]
+
+    fechas = [f.isoformat() for f in matriz.fechas]
+    col = {f: j for j, f in enumerate(fechas)}
+    fila = {c: i for i, c in enumerate(choferes)}
+
+    # Lo ya programado ocupa al chofer ese día; salvo lo CANCELADO,
+    # también descuenta del objetivo y suma al tope
+    ocupado = np.zeros_like(disponible)
+    usados = np.zeros(len(choferes), dtype=np.int32)
+    ultimo_material = [None] * len(choferes)
+    pendientes = {}
+    for clave, por_material in objetivos.items():
+        f = _fecha_objetivo(lunes, clave)
+        if f not in col:
+            raise ValueError(f"{clave} no pertenece a la semana del {lunes}")
+        for material, n in por_material.items():
+            if n > 0:
+                pendientes.setdefault(f, {})[material] = int(n)
+
+    for (f, id_chofer), (material, estado) in _lineas_existentes(conn, lunes, domingo).items():
+        i = fila.get(id_chofer)
+        if i is None:
+            continue
+        ocupado[i, col[f]] = True
+        if estado == "CANCELADO":
+            continue
+        usados[i] += 1
+        ultimo_material[i] = material
+        if pendientes.get(f, {}).get(material):
+            pendientes[f][material] -= 1
+
+    libres = disponible & ~ocupado
+    demanda = {f: sum(m.values()) for f, m in pendientes.items()}
+
+    # Del día más ajustado al más holgado
+    orden_dias = sorted(pendientes, key=lambda f: (libres[:, col[f]].sum() - demanda[f], f))
+
+    asignaciones = []
+    faltantes = {}
+    for f in orden_dias:
+        j = col[f]
+        # Materiales de mayor demanda primero
+        for material, n in sorted(pendientes[f].items(), key=lambda x: -x[1]):
+            if n <= 0:
+                continue
+            candidatos = np.flatnonzero(libres[:, j] & (usados < max_dias_por_chofer))
+            cambio = np.array(
+                [ultimo_material[i] not in (None, material) for i in candidatos],
+                dtype=bool,
+            )
+            # lexsort: la última clave manda (días usados, cambio, orden de la matriz)
+            candidatos = candidatos[np.lexsort((candidatos, cambio, usados[candidatos]))][:n]
+
+            for i in candidatos:
+                asignaciones.append({
+                    "fecha": f,
+                    "id_chofer": choferes[i],
+                    "id_tractor": tractor_de.get(choferes[i]),
+                    "id_material": material,
+                })
+                ultimo_material[i] = material
+            libres[candidatos, j] = False
+            usados[candidatos] += 1
+
+            if len(candidatos) < n:
+                faltantes.setdefault(f, {})[material] = n - len(candidatos)
+
+    asignaciones.sort(key=lambda a: (a["fecha"], a["id_chofer"]))
+    return {
+        "asignaciones": asignaciones,
+        "faltantes": faltantes,
+        "dias_por_chofer": {c: int(usados[i]) for i, c in enumerate(choferes) if usados[i]},
+    }
+
+
+# =================================================
+# APLICAR
+# =================================================
+def aplicar_propuesta(conn, propuesta: dict, usuario: str) -> int:
+    """
+    Inserta las asignaciones de optimizar_semana() como líneas
+    PROGRAMACION PENDIENTE, en un solo executemany. Las que ya existan
+    (otro usuario las generó o canceló entre medio) se descartan por el
+    índice único. Devuelve las líneas creadas.
+    """
+    filas = [
+        (a["fecha"], a["id_chofer"], a["id_tractor"], a["id_material"], usuario)
+        for a in propuesta["asignaciones"]
+    ]
+    if not filas:
+        return 0
+
+    with transaccion(conn):
+        cur = conn.cursor()
+        cur.executemany(_INSERTAR_LINEA, filas)
+        return cur.rowcount
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from datetime import date, timedelta, datetime
-from typing import Optional
 
-from services.eventos_recursos import chofer_en_franco
+from services.disponibilidad_diaria import bloqueos_en_rango
+from utils.db import confirmar, transaccion
 
 
 # =================================================
@@ -24,37 +24,6 @@ def _codigo_semana(d) -> str:
     return f"{y}-W{w:02d}"
 
 
-# =================================================
-# Helpers materiales (evita adivinar "nombre")
-# =================================================
-def _material_display_col(conn) -> Optional[str]:
-    """
-    Devuelve el nombre de columna 'visible' en la tabla materiales.
-    Evita errores tipo 'no such column: m.nombre' cuando el esquema usa
-    'descripcion', 'material', etc.
-    """
-    cur = conn.cursor()
-    try:
-        cur.execute("PRAGMA table_info(materiales)")
-        cols = [r[1] for r in cur.fetchall()]  # r[1] = nombre columna
-    except Exception:
-        return None
-
-    # Orden de preferencia (ajustado a esquemas típicos)
-    preferred = [
-        "nombre",
-        "descripcion",
-        "material",
-        "nombre_material",
-        "desc",
-        "detalle",
-    ]
-    for c in preferred:
-        if c in cols:
-            return c
-    return None
-
-
 # =================================================
 # STUB RRHH
 # =================================================
@@ -65,6 +34,21 @@ def chofer_no_operativo_rrhh(conn, chofer_id: str, fecha: date) -> bool:
 # =================================================
 # CREAR LÍNEA EN lineas_dia (PROGRAMACIÓN)
 # =================================================
+# Una sola línea PROGRAMACION por chofer y día: el índice único
+# ux_lineas_dia_programacion descarta la repetida (INSERT OR IGNORE).
+_INSERTAR_LINEA_PROGRAMADA = """
+    INSERT OR IGNORE INTO lineas_dia (
+        fecha,
+        id_chofer,
+        id_material,
+        estado,
+        origen_linea,
+        creado_por
+    )
+    VALUES (?, ?, ?, 'PENDIENTE', 'PROGRAMACION', ?)
+"""
+
+
 def crear_linea_programada(
     conn,
     fecha: date,
@@ -73,41 +57,54 @@ def crear_linea_programada(
     usuario: str
 ) -> bool:
     cur = conn.cursor()
-
-    cur.execute("""
-        SELECT 1
-        FROM lineas_dia
-        WHERE fecha = ?
-          AND id_chofer = ?
-          AND origen_linea = 'PROGRAMACION'
-    """, (fecha.isoformat(), chofer_id))
-
-    if cur.fetchone():
-        return False
-
-    cur.execute("""
-        INSERT INTO lineas_dia (
-            fecha,
-            id_chofer,
-            id_material,
-            estado,
-            origen_linea,
-            creado_por
-        )
-        VALUES (?, ?, ?, 'PENDIENTE', 'PROGRAMACION', ?)
-    """, (
+    cur.execute(_INSERTAR_LINEA_PROGRAMADA, (
         fecha.isoformat(),
         chofer_id,
         material_id,
         usuario
     ))
-
-    return True
+    return cur.rowcount > 0
 
 
 # =================================================
 # GENERAR PROGRAMACIÓN SEMANAL
 # =================================================
+MAPA_DIAS = {
+    "Lunes": 0,
+    "Martes": 1,
+    "Miércoles": 2,
+    "Jueves": 3,
+    "Viernes": 4,
+    "Sábado": 5,
+    "Domingo": 6,
+}
+
+
+def _francos_semana(conn, lunes: date, domingo: date) -> set:
+    """
+    {(fecha_iso, id_chofer)} en franco durante la semana.
+    """
+    return {
+        (b["fecha"], b["recurso_id"])
+        for b in bloqueos_en_rango(conn, lunes, domingo)
+        if b["recurso_tipo"] == "CHOFER" and b["motivo"] == "FRANCO"
+    }
+
+
+def _lineas_existentes(conn, lunes: date, domingo: date) -> set:
+    """
+    {(fecha_iso, id_chofer)} que ya tienen línea PROGRAMACION en la semana.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT fecha, id_chofer
+        FROM lineas_dia
+        WHERE fecha BETWEEN ? AND ?
+          AND origen_linea = 'PROGRAMACION'
+    """, (lunes.isoformat(), domingo.isoformat()))
+    return {(r["fecha"], r["id_chofer"]) for r in cur.fetchall()}
+
+
 def generar_programacion_semanal(
     conn,
     fecha_desde: date,
@@ -116,17 +113,13 @@ def generar_programacion_semanal(
     material_id: str,
     usuario: str
 ):
+    """
+    Crea las líneas PROGRAMACION de choferes × días de la semana.
+    Francos y líneas existentes se leen una vez; las nuevas se insertan
+    con un solo executemany, todo en una transacción.
+    """
     lunes = _lunes_de_semana(fecha_desde)
-
-    mapa_dias = {
-        "Lunes": 0,
-        "Martes": 1,
-        "Miércoles": 2,
-        "Jueves": 3,
-        "Viernes": 4,
-        "Sábado": 5,
-        "Domingo": 6,
-    }
+    domingo = _domingo_de_semana(fecha_desde)
 
     resultado = {
         "creadas": 0,
@@ -135,48 +128,218 @@ def generar_programacion_semanal(
         "mensajes": [],
     }
 
-    for chofer_id in choferes_ids:
-        for dia in dias:
-            if dia not in mapa_dias:
-                continue
+    with transaccion(conn):
+        francos = _francos_semana(conn, lunes, domingo)
+        existentes = _lineas_existentes(conn, lunes, domingo)
+
+        nuevas = []
+        for chofer_id in choferes_ids:
+            for dia in dias:
+                if dia not in MAPA_DIAS:
+                    continue
+
+                fecha_prog = lunes + timedelta(days=MAPA_DIAS[dia])
+                clave = (fecha_prog.isoformat(), chofer_id)
+
+                if clave in francos:
+                    motivo = "FRANCO"
+                elif chofer_no_operativo_rrhh(conn, chofer_id, fecha_prog):
+                    motivo = "RRHH"
+                elif clave in existentes:
+                    motivo = "YA EXISTE"
+                else:
+                    existentes.add(clave)
+                    nuevas.append((*clave, material_id, usuario))
+                    continue
 
-            fecha_prog = lunes + timedelta(days=mapa_dias[dia])
-
-            if chofer_en_franco(conn, chofer_id, fecha_prog):
                 resultado["omitidas"] += 1
                 resultado["mensajes"].append(
-                    f"{fecha_prog} – Chofer {chofer_id}: FRANCO"
+                    f"{fecha_prog} – Chofer {chofer_id}: {motivo}"
                 )
-                continue
 
-            if chofer_no_operativo_rrhh(conn, chofer_id, fecha_prog):
-                resultado["omitidas"] += 1
-                resultado["mensajes"].append(
-                    f"{fecha_prog} – Chofer {chofer_id}: RRHH"
-                )
-                continue
-
-            if crear_linea_programada(
-                conn,
-                fecha_prog,
-                chofer_id,
-                material_id,
-                usuario
-            ):
-                resultado["creadas"] += 1
-                resultado["por_material"][material_id] = (
-                    resultado["por_material"].get(material_id, 0) + 1
-                )
-            else:
-                resultado["omitidas"] += 1
-                resultado["mensajes"].append(
-                    f"{fecha_prog} – Chofer {chofer_id}: YA EXISTE"
-                )
+        if nuevas:
+            cur = conn.cursor()
+            cur.executemany(_INSERTAR_LINEA_PROGRAMADA, nuevas)
+            resultado["creadas"] = cur.rowcount
+            resultado["omitidas"] += len(nuevas) - cur.rowcount
+            if cur.rowcount:
+                resultado["por_material"][material_id] = cur.rowcount
 
-    conn.commit()
     return resultado
 
 
+# =================================================
+# PLAN DE VARIAS SEMANAS (DIFERENCIAL)
+# =================================================
+# Estados que el plan no toca (igual que eliminar_linea_programacion,
+# más las que ya generaron viaje).
+ESTADOS_PROTEGIDOS = ("CONFIRMADO", "GENERADO")
+
+
+def patron_de_semana(conn, fecha_base: date) -> dict:
+    """
+    {"Lunes": {id_chofer: id_material}, ...} de la programación de una
+    semana, para repetirla con repetir_patron().
+    """
+    lunes = _lunes_de_semana(fecha_base)
+    nombres = {v: k for k, v in MAPA_DIAS.items()}
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT fecha, id_chofer, id_material
+        FROM lineas_dia
+        WHERE fecha BETWEEN ? AND ?
+          AND origen_linea = 'PROGRAMACION'
+          AND estado != 'CANCELADO'
+    """, (lunes.isoformat(), _domingo_de_semana(fecha_base).isoformat()))
+
+    patron = {}
+    for r in cur.fetchall():
+        dia = nombres[(date.fromisoformat(r["fecha"]) - lunes).days]
+        patron.setdefault(dia, {})[r["id_chofer"]] = r["id_material"]
+    return patron
+
+
+def repetir_patron(fecha_desde: date, semanas: int, patron: dict) -> dict:
+    """
+    Plan {(fecha_iso, id_chofer): id_material} con el mismo patrón
+    semanal durante `semanas` semanas desde la de `fecha_desde`.
+    """
+    lunes = _lunes_de_semana(fecha_desde)
+    plan = {}
+    for n in range(semanas):
+        for dia, por_chofer in patron.items():
+            fecha = lunes + timedelta(weeks=n, days=MAPA_DIAS[dia])
+            for id_chofer, id_material in por_chofer.items():
+                plan[(fecha.isoformat(), id_chofer)] = id_material
+    return plan
+
+
+def _diferencias_plan(conn, lunes: date, fin: date, plan: dict, usuario: str):
+    """
+    Compara el plan con lineas_dia y arma (resumen, insertar, actualizar, eliminar).
+    """
+    resumen = {
+        "desde": lunes.isoformat(),
+        "hasta": fin.isoformat(),
+        "insertadas": 0,
+        "actualizadas": 0,
+        "eliminadas": 0,
+        "sin_cambios": 0,
+        "omitidas": 0,
+        "mensajes": [],
+    }
+
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT id, fecha, id_chofer, id_material, estado
+        FROM lineas_dia
+        WHERE fecha BETWEEN ? AND ?
+          AND origen_linea = 'PROGRAMACION'
+    """, (lunes.isoformat(), fin.isoformat()))
+    existentes = {(r["fecha"], r["id_chofer"]): r for r in cur.fetchall()}
+    francos = _francos_semana(conn, lunes, fin)
+
+    insertar, actualizar, eliminar = [], [], []
+
+    for clave, id_material in sorted(plan.items()):
+        fecha, id_chofer = clave
+        if not lunes.isoformat() <= fecha <= fin.isoformat():
+            raise ValueError(f"{fecha} está fuera del plan ({lunes} a {fin})")
+
+        linea = existentes.get(clave)
+        if linea is None:
+            if clave in francos:
+                resumen["omitidas"] += 1
+                resumen["mensajes"].append(f"{fecha} – Chofer {id_chofer}: FRANCO")
+            else:
+                insertar.append((fecha, id_chofer, id_material, usuario))
+        elif linea["estado"] == "CANCELADO":
+            # La cancelación fue a mano: el plan no la revierte
+            resumen["omitidas"] += 1
+            resumen["mensajes"].append(
+                f"{fecha} – Chofer {id_chofer}: CANCELADO, no se reactiva"
+            )
+        elif linea["id_material"] == id_material:
+            resumen["sin_cambios"] += 1
+        elif linea["estado"] in ESTADOS_PROTEGIDOS:
+            resumen["omitidas"] += 1
+            resumen["mensajes"].append(
+                f"{fecha} – Chofer {id_chofer}: {linea['estado']}, no se cambia el material"
+            )
+        else:
+            actualizar.append((id_material, linea["id"]))
+
+    for clave, linea in sorted(existentes.items()):
+        if clave in plan:
+            continue
+        # Una CANCELADO tampoco se borra: queda registro de la cancelación
+        if linea["estado"] in ESTADOS_PROTEGIDOS or linea["estado"] == "CANCELADO":
+            resumen["omitidas"] += 1
+            resumen["mensajes"].append(
+                f"{clave[0]} – Chofer {clave[1]}: {linea['estado']}, no se elimina"
+            )
+        else:
+            eliminar.append((linea["id"],))
+
+    resumen["insertadas"] = len(insertar)
+    resumen["actualizadas"] = len(actualizar)
+    resumen["eliminadas"] = len(eliminar)
+    return resumen, insertar, actualizar, eliminar
+
+
+def aplicar_plan_semanas(
+    conn,
+    fecha_desde: date,
+    semanas: int,
+    plan: dict,
+    usuario: str,
+    simular: bool = False,
+    vaciar: bool = False,
+) -> dict:
+    """
+    Lleva la programación de `semanas` semanas (desde la de `fecha_desde`)
+    al `plan` deseado {(fecha_iso, id_chofer): id_material} con los
+    cambios mínimos: inserta lo que falta, cambia el material donde
+    difiere y borra lo que sobra. Las líneas CONFIRMADO / GENERADO no se
+    tocan, las CANCELADO no se reactivan ni se borran y no se programa a
+    un chofer de franco.
+    Un plan vacío borraría todas las líneas pendientes del rango: solo se
+    aplica con vaciar=True.
+    Todo en una transacción; con simular=True solo devuelve el resumen
+    (sin tomar el lock de escritura).
+    """
+    lunes = _lunes_de_semana(fecha_desde)
+    fin = lunes + timedelta(weeks=semanas, days=-1)
+
+    if not plan and not simular and not vaciar:
+        raise ValueError(
+            "El plan está vacío: aplicarlo borraría toda la programación "
+            f"pendiente del {lunes} al {fin}."
+        )
+
+    if simular:
+        return _diferencias_plan(conn, lunes, fin, plan, usuario)[0]
+
+    with transaccion(conn):
+        resumen, insertar, actualizar, eliminar = _diferencias_plan(
+            conn, lunes, fin, plan, usuario
+        )
+        cur = conn.cursor()
+        cur.executemany(_INSERTAR_LINEA_PROGRAMADA, insertar)
+        cur.executemany("""
+            UPDATE lineas_dia
+            SET id_material = ?
+            WHERE id = ?
+        """, actualizar)
+        cur.executemany("""
+            DELETE FROM lineas_dia
+            WHERE id = ?
+              AND origen_linea = 'PROGRAMACION'
+        """, eliminar)
+
+    return resumen
+
+
 # =================================================
 # LISTADOS PARA UI
 # =================================================
@@ -184,46 +347,24 @@ def listar_programacion_semana(conn, fecha_base: date):
     lunes = _lunes_de_semana(fecha_base)
     domingo = _domingo_de_semana(fecha_base)
 
-    mat_col = _material_display_col(conn)
-
     cur = conn.cursor()
-
-    # Si encontramos una columna "visible" en materiales, la usamos.
-    # Si no, devolvemos el id_material también como "material" para no romper la UI.
-    if mat_col:
-        cur.execute(f"""
-            SELECT
-                l.id,
-                l.fecha,
-                ch.nombre AS chofer,
-                l.id_material,
-                m.{mat_col} AS material,
-                l.estado
-            FROM lineas_dia l
-            LEFT JOIN choferes ch
-                   ON ch.id_chofer = l.id_chofer
-            LEFT JOIN materiales m
-                   ON m.id_material = l.id_material
-            WHERE l.fecha BETWEEN ? AND ?
-              AND l.origen_linea = 'PROGRAMACION'
-            ORDER BY l.fecha, ch.nombre
-        """, (lunes.isoformat(), domingo.isoformat()))
-    else:
-        cur.execute("""
-            SELECT
-                l.id,
-                l.fecha,
-                ch.nombre AS chofer,
-                l.id_material,
-                l.id_material AS material,
-                l.estado
-            FROM lineas_dia l
-            LEFT JOIN choferes ch
-                   ON ch.id_chofer = l.id_chofer
-            WHERE l.fecha BETWEEN ? AND ?
-              AND l.origen_linea = 'PROGRAMACION'
-            ORDER BY l.fecha, ch.nombre
-        """, (lunes.isoformat(), domingo.isoformat()))
+    cur.execute("""
+        SELECT
+            l.id,
+            l.fecha,
+            ch.nombre AS chofer,
+            l.id_material,
+            m.material AS material,
+            l.estado
+        FROM lineas_dia l
+        LEFT JOIN choferes ch
+               ON ch.id_chofer = l.id_chofer
+        LEFT JOIN materiales m
+               ON m.id_material = l.id_material
+        WHERE l.fecha BETWEEN ? AND ?
+          AND l.origen_linea = 'PROGRAMACION'
+        ORDER BY l.fecha, ch.nombre
+    """, (lunes.isoformat(), domingo.isoformat()))
 
     return cur.fetchall()
 
@@ -282,5 +423,5 @@ def eliminar_linea_programacion(conn, id_linea: int) -> bool:
           AND origen_linea = 'PROGRAMACION'
     """, (id_linea,))
 
-    conn.commit()
+    confirmar(conn)
     return cur.rowcount > 0
@@ -1,50 +1,13 @@
 from __future__ import annotations
 from datetime import date
 
+from services import intervalos
+from utils.fechas import a_fecha_iso
+
 
 # =================================================
-# Helpers - detectar esquema real
+# Helpers
 # =================================================
-def _cols(conn, table: str) -> set[str]:
-    cur = conn.cursor()
-    cur.execute(f"PRAGMA table_info({table})")
-    return {r[1] for r in cur.fetchall()}  # r[1] = nombre columna
-
-
-def _eventos_ref_col(conn) -> str:
-    """
-    Devuelve el nombre de columna en eventos_recursos que referencia al tractor.
-    Evita seguir adivinando (tractor_id / recurso_id / etc).
-
-    Si no encuentra ninguna, levanta error con detalle.
-    """
-    c = _cols(conn, "eventos_recursos")
-
-    # Nombres posibles (orden de preferencia)
-    candidates = [
-        "tractor_id",
-        "id_tractor",
-        "tractor",
-        "recurso_id",
-        "id_recurso",
-        "recurso",
-        "unidad_id",
-        "id_unidad",
-    ]
-    for name in candidates:
-        if name in c:
-            return name
-
-    raise RuntimeError(
-        "No encuentro la columna que referencia al tractor en eventos_recursos. "
-        f"Columnas disponibles: {sorted(c)}"
-    )
-
-
-def _has_col(conn, table: str, col: str) -> bool:
-    return col in _cols(conn, table)
-
-
 def _rows_to_dicts(cur, rows):
     # Si tu conexión usa sqlite3.Row, dict(row) funciona.
     # Si no, lo convertimos por descripción del cursor.
@@ -74,8 +37,6 @@ def iniciar_mantenimiento_correctivo(
     """
 
     cur = conn.cursor()
-    ref_col = _eventos_ref_col(conn)
-    cols = _cols(conn, "eventos_recursos")
 
     # 1️⃣ Desvincular chofer del tractor
     cur.execute("""
@@ -85,35 +46,20 @@ def iniciar_mantenimiento_correctivo(
     """, (tractor_id,))
 
     # 2️⃣ Insertar evento de mantenimiento (SIN fecha_fin)
-    insert_cols = ["tipo", ref_col, "fecha_inicio"]
-    insert_vals = ["MANTENIMIENTO_CORRECTIVO", tractor_id, fecha_inicio]
-
-    # usuario creador (si existe)
-    if "creado_por" in cols:
-        insert_cols.append("creado_por")
-        insert_vals.append(usuario)
-    elif "usuario" in cols:
-        insert_cols.append("usuario")
-        insert_vals.append(usuario)
-    elif "created_by" in cols:
-        insert_cols.append("created_by")
-        insert_vals.append(usuario)
-
-    # observación (si existe la columna)
-    if observacion and "observacion" in cols:
-        insert_cols.append("observacion")
-        insert_vals.append(observacion)
-
-    placeholders = ",".join(["?"] * len(insert_cols))
-    colnames = ",".join(insert_cols)
-
-    cur.execute(
-        f"""
-        INSERT INTO eventos_recursos ({colnames})
-        VALUES ({placeholders})
-        """,
-        tuple(insert_vals),
-    )
+    cur.execute("""
+        INSERT INTO eventos_recursos (
+            tipo,
+            id_tractor,
+            fecha_inicio,
+            creado_por,
+            observacion
+        ) VALUES ('MANTENIMIENTO_CORRECTIVO', ?, ?, ?, ?)
+    """, (
+        tractor_id,
+        a_fecha_iso(fecha_inicio),
+        usuario,
+        observacion or None,
+    ))
 
     # 3️⃣ Cambiar estado tractor
     cur.execute("""
@@ -123,6 +69,7 @@ def iniciar_mantenimiento_correctivo(
     """, (tractor_id,))
 
     conn.commit()
+    intervalos.invalidar(conn)
 
 
 # =================================================
@@ -143,7 +90,7 @@ def finalizar_mantenimiento(conn, evento_id: int, tractor_id: str):
         WHERE id = ?
           AND tipo = 'MANTENIMIENTO_CORRECTIVO'
         """,
-        (date.today(), evento_id),
+        (a_fecha_iso(date.today()), evento_id),
     )
 
     cur.execute(
@@ -156,6 +103,7 @@ def finalizar_mantenimiento(conn, evento_id: int, tractor_id: str):
     )
 
     conn.commit()
+    intervalos.invalidar(conn)
 
 
 # =================================================
@@ -164,10 +112,8 @@ def finalizar_mantenimiento(conn, evento_id: int, tractor_id: str):
 def listar_tractores_en_mantenimiento(conn, solo_activos: bool = True):
     """
     Lista tractores en mantenimiento correctivo.
-    Auto-detecta la columna FK en eventos_recursos para no romper por esquema.
     """
     cur = conn.cursor()
-    ref_col = _eventos_ref_col(conn)
 
     where_activos = "AND e.fecha_fin IS NULL" if solo_activos else ""
 
@@ -181,7 +127,7 @@ def listar_tractores_en_mantenimiento(conn, solo_activos: bool = True):
             e.fecha_fin
         FROM eventos_recursos e
         JOIN tractores t
-          ON t.id_tractor = e.{ref_col}
+          ON t.id_tractor = e.id_tractor
         WHERE e.tipo = 'MANTENIMIENTO_CORRECTIVO'
         {where_activos}
         ORDER BY e.fecha_inicio DESC
@@ -1,7 +1,16 @@
+import sqlite3
 import uuid
-from datetime import date
 
-from services.eventos import chofer_disponible
+from services.plantillas import listar_plantillas
+from utils import secuencias
+from utils.db import confirmar, transaccion
+from utils.fechas import a_fecha_iso
+from utils.paginacion import (
+    TAMANO_PAGINA,
+    armar_pagina,
+    decodificar_cursor,
+    limitar_tamano,
+)
 
 
 # =================================================
@@ -39,9 +48,79 @@ def listar_lineas_para_viajes(conn):
 
 
 
+def pagina_lineas_para_viajes(
+    conn,
+    desde=None,
+    hasta=None,
+    id_chofer=None,
+    cursor=None,
+    tamano=TAMANO_PAGINA,
+) -> dict:
+    """
+    Una página de líneas pendientes, en orden (fecha, id).
+    `cursor` es el token "siguiente" de la página anterior.
+    Devuelve {"filas": [...], "siguiente": token | None}.
+    """
+    tamano = limitar_tamano(tamano)
+    where = [
+        "ld.estado = 'PENDIENTE'",
+        "ld.origen_linea IN ('PROGRAMACION', 'FUERA_DE_PLAN')",
+        "NOT EXISTS (SELECT 1 FROM viajes v WHERE v.linea_id = ld.id)",
+    ]
+    params = []
+
+    if desde:
+        where.append("ld.fecha >= ?")
+        params.append(a_fecha_iso(desde))
+    if hasta:
+        where.append("ld.fecha <= ?")
+        params.append(a_fecha_iso(hasta))
+    if id_chofer:
+        where.append("ld.id_chofer = ?")
+        params.append(id_chofer)
+    if cursor:
+        where.append("(ld.fecha, ld.id) > (?, ?)")
+        params.extend(decodificar_cursor(cursor))
+
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT
+            ld.id                AS id_linea,
+            ld.fecha,
+            ld.id_chofer,
+            ch.nombre            AS chofer,
+            ld.id_material,
+            m.material           AS material,
+            COALESCE(t.patente, 'Sin tractor') AS tractor,
+            ld.origen_linea,
+            ld.estado
+        FROM lineas_dia ld
+        LEFT JOIN choferes ch
+               ON ch.id_chofer = ld.id_chofer
+        LEFT JOIN materiales m
+               ON m.id_material = ld.id_material
+        LEFT JOIN tractores t
+               ON t.id_tractor = ch.id_tractor
+        WHERE {' AND '.join(where)}
+        ORDER BY ld.fecha, ld.id
+        LIMIT ?
+    """, params + [tamano + 1])
+
+    return armar_pagina(
+        [dict(r) for r in cur.fetchall()],
+        tamano,
+        lambda r: (r["fecha"], r["id_linea"]),
+    )
+
+
 # =================================================
 # CONFIRMAR LÍNEA Y GENERAR VIAJE
 # =================================================
+# El nro de viaje sale de utils/secuencias.py (bloques reservados por
+# proceso) y se pide antes de abrir la transacción. Las validaciones y
+# los INSERT/UPDATE van juntos en una transacción de escritura cortita:
+# lo validado no puede cambiar antes de insertar y dos despachantes no
+# generan dos viajes para la misma línea.
 def confirmar_linea_y_generar_viaje(
     conn,
     id_linea,
@@ -55,77 +134,189 @@ def confirmar_linea_y_generar_viaje(
     id_plantilla,
     observacion,
     usuario,
+    nro_viaje=None,
 ):
-    cur = conn.cursor()
-
-    if isinstance(fecha, str):
-        fecha = date.fromisoformat(fecha)
-
-    if not chofer_disponible(conn, chofer_id, fecha):
-        raise ValueError("❌ El chofer está de FRANCO. No se puede generar el viaje.")
-
-    cur.execute("""
-        SELECT t.id_tractor, t.estado
-        FROM choferes c
-        LEFT JOIN tractores t ON t.id_tractor = c.id_tractor
-        WHERE c.id_chofer = ?
-    """, (chofer_id,))
-    row = cur.fetchone()
-
-    tractor_id = None
-    if row and row["id_tractor"]:
-        if row["estado"] != "OPERATIVO":
-            raise ValueError("El tractor no está OPERATIVO.")
-        tractor_id = row["id_tractor"]
-
-    cur.execute("BEGIN IMMEDIATE;")
-
-    cur.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM viajes;")
-    nro_viaje = cur.fetchone()[0]
-
+    if nro_viaje is None:
+        nro_viaje = secuencias.siguiente(conn, "viajes")
     id_viaje = str(uuid.uuid4())
-
-    cur.execute("""
-        INSERT INTO viajes (
-            id,
+    fecha = a_fecha_iso(fecha)
+
+    with transaccion(conn):
+        cur = conn.cursor()
+
+        # Franco: la tabla mantenida por triggers (no el índice en
+        # memoria, que puede estar atrasado respecto de otro proceso)
+        cur.execute("""
+            SELECT 1
+            FROM disponibilidad_diaria
+            WHERE fecha = ?
+              AND recurso_tipo = 'CHOFER'
+              AND recurso_id = ?
+              AND motivo = 'FRANCO'
+            LIMIT 1
+        """, (fecha, chofer_id))
+        if cur.fetchone():
+            raise ValueError("❌ El chofer está de FRANCO. No se puede generar el viaje.")
+
+        cur.execute("""
+            SELECT t.id_tractor, t.estado
+            FROM choferes c
+            LEFT JOIN tractores t ON t.id_tractor = c.id_tractor
+            WHERE c.id_chofer = ?
+        """, (chofer_id,))
+        row = cur.fetchone()
+
+        tractor_id = None
+        if row and row["id_tractor"]:
+            if row["estado"] != "OPERATIVO":
+                raise ValueError("El tractor no está OPERATIVO.")
+            tractor_id = row["id_tractor"]
+
+        if id_linea is not None:
+            cur.execute("""
+                UPDATE lineas_dia
+                SET estado = 'GENERADO'
+                WHERE id = ?
+                  AND estado = 'PENDIENTE'
+            """, (id_linea,))
+            if cur.rowcount == 0:
+                raise ValueError("La línea ya no está PENDIENTE (¿otro usuario generó el viaje?).")
+
+        cur.execute("""
+            INSERT INTO viajes (
+                id,
+                id_viaje,
+                fecha,
+                id_chofer,
+                id_tractor,
+                id_cliente,
+                id_material,
+                id_origen,
+                id_destino,
+                origen_viaje,
+                id_plantilla,
+                estado,
+                creado_por,
+                linea_id
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'CONFIRMADO', ?, ?)
+        """, (
+            nro_viaje,
+            id_viaje,
             fecha,
-            id_chofer,
-            id_tractor,
-            id_cliente,
-            id_material,
-            id_origen,
-            id_destino,
-            origen_viaje,
+            chofer_id,
+            tractor_id,
+            cliente_id,
+            material_id,
+            origen_id,
+            destino_id,
+            origen_linea,
             id_plantilla,
-            estado,
-            creado_por,
-            linea_id
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'CONFIRMADO', ?, ?)
-    """, (
-        nro_viaje,
-        fecha,
-        chofer_id,
-        tractor_id,
-        cliente_id,
-        material_id,
-        origen_id,
-        destino_id,
-        origen_linea,
-        id_plantilla,
-        usuario,
-        id_linea
-    ))
+            usuario,
+            id_linea
+        ))
 
-    cur.execute("""
-        UPDATE lineas_dia
-        SET estado = 'GENERADO'
-        WHERE id = ?
-    """, (id_linea,))
-
-    conn.commit()
     return id_viaje
 
 
+# =================================================
+# GENERAR VIAJES EN LOTE
+# =================================================
+_CAMPOS_PLANTILLA = {
+    "material_id": "id_material",
+    "cliente_id": "id_cliente",
+    "origen_id": "id_origen",
+    "destino_id": "id_destino",
+    "observacion": "observacion",
+}
+
+
+def generar_viajes_lote(conn, items, usuario) -> dict:
+    """
+    Genera los viajes de varias líneas pendientes en una transacción.
+
+    items: [{"id_linea": 12, "id_plantilla": 3}, ...]; cada item puede
+    pisar lo de la plantilla con material_id, cliente_id, origen_id,
+    destino_id u observacion. Sin plantilla ni material, va el de la línea.
+
+    Cada línea corre en su SAVEPOINT: si falla se deshace solo esa y el
+    resto sigue. Devuelve {"generados": [{id_linea, id_viaje}],
+    "errores": [{id_linea, error}]}.
+
+    El nro de viaje se pide dentro del SAVEPOINT y solo para los items
+    que pasaron la validación: una línea inexistente o sin datos no gasta
+    número. Si falla después (franco, línea ya confirmada) el número que
+    vino del bloque en memoria queda como hueco; el reservado en esta
+    misma transacción (bloque agotado) vuelve con el ROLLBACK TO.
+    """
+    resultado = {"generados": [], "errores": []}
+    items = list(items)
+    if not items:
+        return resultado
+
+    ids = [it["id_linea"] for it in items]
+    marcas = ",".join("?" for _ in ids)
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT id, fecha, id_chofer, id_material, origen_linea
+        FROM lineas_dia
+        WHERE id IN ({marcas})
+    """, ids)
+    lineas = {r["id"]: dict(r) for r in cur.fetchall()}
+    plantillas = {p["id"]: p for p in listar_plantillas(conn)}
+
+    with transaccion(conn):
+        for it in items:
+            id_linea = it["id_linea"]
+            linea = lineas.get(id_linea)
+            if linea is None:
+                resultado["errores"].append({"id_linea": id_linea, "error": "La línea no existe"})
+                continue
+
+            datos = {"material_id": linea["id_material"]}
+            plantilla = plantillas.get(it.get("id_plantilla"))
+            if it.get("id_plantilla") and plantilla is None:
+                resultado["errores"].append({"id_linea": id_linea, "error": "Plantilla inexistente o inactiva"})
+                continue
+            for campo, columna in _CAMPOS_PLANTILLA.items():
+                if plantilla and plantilla.get(columna) is not None:
+                    datos[campo] = plantilla[columna]
+                if it.get(campo) is not None:
+                    datos[campo] = it[campo]
+
+            faltan = [c for c in ("cliente_id", "origen_id", "destino_id") if datos.get(c) is None]
+            if faltan:
+                resultado["errores"].append({"id_linea": id_linea, "error": f"Faltan datos: {', '.join(faltan)}"})
+                continue
+
+            cur.execute("SAVEPOINT viaje_lote")
+            try:
+                nro_viaje = secuencias.siguiente(conn, "viajes")
+                id_viaje = confirmar_linea_y_generar_viaje(
+                    conn,
+                    id_linea=id_linea,
+                    origen_linea=linea["origen_linea"],
+                    fecha=linea["fecha"],
+                    chofer_id=linea["id_chofer"],
+                    cliente_id=datos["cliente_id"],
+                    material_id=datos["material_id"],
+                    origen_id=datos["origen_id"],
+                    destino_id=datos["destino_id"],
+                    id_plantilla=it.get("id_plantilla"),
+                    observacion=datos.get("observacion"),
+                    usuario=usuario,
+                    nro_viaje=nro_viaje,
+                )
+            except (ValueError, sqlite3.IntegrityError) as e:
+                cur.execute("ROLLBACK TO viaje_lote")
+                cur.execute("RELEASE viaje_lote")
+                resultado["errores"].append({"id_linea": id_linea, "error": str(e)})
+                continue
+            cur.execute("RELEASE viaje_lote")
+            resultado["generados"].append({"id_linea": id_linea, "id_viaje": id_viaje})
+
+    return resultado
+
+
 # =================================================
 # LISTAR VIAJES (HISTÓRICO)
 # =================================================
@@ -135,12 +326,12 @@ def listar_viajes(conn, desde=None, hasta=None):
     params = []
 
     if desde:
-        where.append("DATE(v.fecha) >= DATE(?)")
-        params.append(desde)
+        where.append("v.fecha >= ?")
+        params.append(a_fecha_iso(desde))
 
     if hasta:
-        where.append("DATE(v.fecha) <= DATE(?)")
-        params.append(hasta)
+        where.append("v.fecha <= ?")
+        params.append(a_fecha_iso(hasta))
 
     where_sql = f"WHERE {' AND '.join(where)}" if where else ""
 
@@ -163,12 +354,79 @@ def listar_viajes(conn, desde=None, hasta=None):
         LEFT JOIN origenes   o  ON o.id_origen   = v.id_origen
         LEFT JOIN destinos   d  ON d.id_destino  = v.id_destino
         {where_sql}
-        ORDER BY DATE(v.fecha) DESC, v.id DESC
+        ORDER BY v.fecha DESC, v.id DESC
     """, params)
 
     return [dict(r) for r in cur.fetchall()]
 
 
+def pagina_viajes(
+    conn,
+    desde=None,
+    hasta=None,
+    estado=None,
+    id_chofer=None,
+    cursor=None,
+    tamano=TAMANO_PAGINA,
+) -> dict:
+    """
+    Una página del histórico de viajes, del más nuevo al más viejo
+    (fecha, id descendentes). Mismas columnas que listar_viajes().
+    Devuelve {"filas": [...], "siguiente": token | None}.
+    """
+    tamano = limitar_tamano(tamano)
+    where = []
+    params = []
+
+    if desde:
+        where.append("v.fecha >= ?")
+        params.append(a_fecha_iso(desde))
+    if hasta:
+        where.append("v.fecha <= ?")
+        params.append(a_fecha_iso(hasta))
+    if estado:
+        where.append("v.estado = ?")
+        params.append(estado)
+    if id_chofer:
+        where.append("v.id_chofer = ?")
+        params.append(id_chofer)
+    if cursor:
+        where.append("(v.fecha, v.id) < (?, ?)")
+        params.extend(decodificar_cursor(cursor))
+
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT
+            v.id,
+            v.fecha,
+            ch.nombre     AS chofer,
+            t.patente     AS tractor,
+            c.cliente     AS cliente,
+            m.material    AS material,
+            o.origen      AS origen,
+            d.destino     AS destino,
+            v.estado
+        FROM viajes v
+        LEFT JOIN choferes   ch ON ch.id_chofer   = v.id_chofer
+        LEFT JOIN tractores  t  ON t.id_tractor  = v.id_tractor
+        LEFT JOIN clientes   c  ON c.id_cliente  = v.id_cliente
+        LEFT JOIN materiales m  ON m.id_material = v.id_material
+        LEFT JOIN origenes   o  ON o.id_origen   = v.id_origen
+        LEFT JOIN destinos   d  ON d.id_destino  = v.id_destino
+        {where_sql}
+        ORDER BY v.fecha DESC, v.id DESC
+        LIMIT ?
+    """, params + [tamano + 1])
+
+    return armar_pagina(
+        [dict(r) for r in cur.fetchall()],
+        tamano,
+        lambda r: (r["fecha"], r["id"]),
+    )
+
+
 # =================================================
 # LISTAR VIAJES ACTIVOS (EVENTOS)
 # =================================================
@@ -178,12 +436,12 @@ def listar_viajes_activos(conn, desde=None, hasta=None):
     params = []
 
     if desde:
-        where.append("DATE(v.fecha) >= DATE(?)")
-        params.append(desde)
+        where.append("v.fecha >= ?")
+        params.append(a_fecha_iso(desde))
 
     if hasta:
-        where.append("DATE(v.fecha) <= DATE(?)")
-        params.append(hasta)
+        where.append("v.fecha <= ?")
+        params.append(a_fecha_iso(hasta))
 
     where_sql = f"WHERE {' AND '.join(where)}"
 
@@ -200,7 +458,7 @@ def listar_viajes_activos(conn, desde=None, hasta=None):
         LEFT JOIN tractores  t  ON t.id_tractor  = v.id_tractor
         LEFT JOIN materiales m  ON m.id_material = v.id_material
         {where_sql}
-        ORDER BY DATE(v.fecha) DESC
+        ORDER BY v.fecha DESC
     """, params)
 
     return [dict(r) for r in cur.fetchall()]
@@ -216,4 +474,21 @@ def finalizar_viaje(conn, viaje_id, usuario):
         SET estado = 'FINALIZADO'
         WHERE id = ?
     """, (viaje_id,))
-    conn.commit()
+    confirmar(conn)
+
+
+def finalizar_viajes(conn, viajes_ids, usuario) -> int:
+    """
+    Finaliza varios viajes en una sola transacción.
+    """
+    ids = [(i,) for i in dict.fromkeys(viajes_ids)]
+    if not ids:
+        return 0
+    with transaccion(conn):
+        cur = conn.cursor()
+        cur.executemany("""
+            UPDATE viajes
+            SET estado = 'FINALIZADO'
+            WHERE id = ?
+        """, ids)
+        return cur.rowcount
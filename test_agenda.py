@@ -0,0 +1,108 @@
+# test_agenda.py
+#
+# Agenda semanal (services/agenda.py): caché por semana invalidado por
+# versiones_semana y precarga en segundo plano.
+
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from services import agenda
+
+LUNES = date(2026, 1, 5)
+
+
+@pytest.fixture
+def semanas(conn):
+    conn.execute("INSERT INTO choferes (id_chofer, nombre) VALUES ('CH_1', 'Ana')")
+    conn.execute("INSERT INTO materiales (id_material, material) VALUES ('M_01', 'Arena')")
+    for fecha in ("2026-01-05", "2026-01-07", "2026-01-12"):
+        conn.execute("""
+            INSERT INTO lineas_dia (fecha, id_chofer, id_material, estado, origen_linea)
+            VALUES (?, 'CH_1', 'M_01', 'PENDIENTE', 'PROGRAMACION')
+        """, (fecha,))
+    conn.execute("""
+        INSERT INTO viajes (fecha, id_chofer, id_material, estado)
+        VALUES ('2026-01-05', 'CH_1', 'M_01', 'confirmado ')
+    """)
+    conn.commit()
+    return conn
+
+
+def _consultas_agenda(conn, llamada):
+    sentencias = []
+    conn.set_trace_callback(sentencias.append)
+    try:
+        resultado = llamada()
+    finally:
+        conn.set_trace_callback(None)
+    return resultado, [s for s in sentencias if "UNION ALL" in s]
+
+
+def test_agrupa_por_dia_con_nombres(semanas):
+    por_dia = agenda.agenda_semana(semanas, LUNES)
+
+    assert list(por_dia) == [date(2026, 1, 5), date(2026, 1, 7)]
+    lunes = por_dia[date(2026, 1, 5)]
+    assert [(i["tipo"], i["estado"], i["chofer"], i["material"]) for i in lunes] == [
+        ("LINEA", "PENDIENTE", "Ana", "Arena"),
+        ("VIAJE", "CONFIRMADO", "Ana", "Arena"),
+    ]
+
+
+def test_cache_por_semana(semanas):
+    agenda.agenda_semana(semanas, LUNES)
+    _, consultas = _consultas_agenda(semanas, lambda: agenda.agenda_semana(semanas, LUNES))
+    assert consultas == []
+
+    # una escritura en otra semana no invalida esta
+    semanas.execute("UPDATE lineas_dia SET estado = 'CONFIRMADO' WHERE fecha = '2026-01-12'")
+    semanas.commit()
+    _, consultas = _consultas_agenda(semanas, lambda: agenda.agenda_semana(semanas, LUNES))
+    assert consultas == []
+
+    # una en la misma semana sí
+    semanas.execute("UPDATE lineas_dia SET estado = 'CANCELADO' WHERE fecha = '2026-01-07'")
+    semanas.commit()
+    por_dia, consultas = _consultas_agenda(semanas, lambda: agenda.agenda_semana(semanas, LUNES))
+    assert len(consultas) == 1
+    assert por_dia[date(2026, 1, 7)][0]["estado"] == "CANCELADO"
+
+
+def test_mover_una_linea_invalida_las_dos_semanas(semanas):
+    agenda.agenda_semana(semanas, LUNES)
+    agenda.agenda_semana(semanas, LUNES + timedelta(weeks=1))
+
+    semanas.execute("UPDATE lineas_dia SET fecha = '2026-01-13' WHERE fecha = '2026-01-07'")
+    semanas.commit()
+
+    assert date(2026, 1, 7) not in agenda.agenda_semana(semanas, LUNES)
+    assert date(2026, 1, 13) in agenda.agenda_semana(semanas, LUNES + timedelta(weeks=1))
+
+
+def test_renombrar_chofer_invalida(semanas):
+    agenda.agenda_semana(semanas, LUNES)
+    semanas.execute("UPDATE choferes SET nombre = 'Ana María'")
+    semanas.commit()
+
+    por_dia = agenda.agenda_semana(semanas, LUNES)
+    assert por_dia[date(2026, 1, 5)][0]["chofer"] == "Ana María"
+
+
+def test_lo_devuelto_no_modifica_el_cache(semanas):
+    agenda.agenda_semana(semanas, LUNES)[date(2026, 1, 5)].clear()
+    assert len(agenda.agenda_semana(semanas, LUNES)[date(2026, 1, 5)]) == 2
+
+
+def test_precarga_en_segundo_plano(semanas):
+    siguientes = [LUNES + timedelta(weeks=1), LUNES - timedelta(weeks=1)]
+    agenda.precargar_semanas(semanas, siguientes)
+    for t in threading.enumerate():
+        if t.name == "agenda-precarga":
+            t.join(timeout=10)
+
+    for lunes in siguientes:
+        _, consultas = _consultas_agenda(semanas, lambda: agenda.agenda_semana(semanas, lunes))
+        assert consultas == []
+    assert not agenda._precargando
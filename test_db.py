@@ -1,15 +1,42 @@
-from utils.db import get_connection
+# test_db.py
+#
+# La base versionada, migrada sobre una copia temporal: la original no se
+# toca (ni siquiera se abre para escribir).
 
-conn = get_connection()
-cur = conn.cursor()
+import hashlib
+import shutil
 
-cur.execute("SELECT name FROM sqlite_master WHERE type='table'")
-print("TABLAS:", [r[0] for r in cur.fetchall()])
+from utils import schema
+from utils.db import BASE_DIR, get_connection
 
-cur.execute("SELECT COUNT(*) FROM choferes")
-print("Choferes OK")
+BASE_REAL = BASE_DIR / "data" / "programacion_bca.sqlite"
 
-cur.execute("SELECT COUNT(*) FROM materiales")
-print("Materiales OK")
 
-conn.close()
+def _huella(ruta) -> str:
+    return hashlib.sha256(ruta.read_bytes()).hexdigest()
+
+
+def test_base_real_migra_en_una_copia(tmp_path):
+    antes = _huella(BASE_REAL)
+    copia = tmp_path / "copia.sqlite"
+    shutil.copy(BASE_REAL, copia)
+
+    conn = get_connection(db_path=copia)
+    cur = conn.cursor()
+
+    assert schema.version(conn) == schema.VERSION_ACTUAL
+    cur.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    tablas = {r[0] for r in cur.fetchall()}
+    assert set(schema.TABLAS) <= tablas
+
+    cur.execute("SELECT COUNT(*) FROM choferes")
+    assert cur.fetchone()[0] > 0
+    cur.execute("SELECT COUNT(*) FROM materiales")
+    assert cur.fetchone()[0] > 0
+
+    assert _huella(BASE_REAL) == antes
+
+
+def test_get_connection_sin_ruta_no_abre_la_base_real():
+    conn = get_connection()
+    assert conn.ruta != str(BASE_REAL)
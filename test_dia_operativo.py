@@ -0,0 +1,64 @@
+# test_dia_operativo.py
+#
+# Acciones masivas sobre las líneas del día (modules/dia_operativo.py).
+
+from modules.dia_operativo import (
+    cancelar_lineas,
+    confirmar_linea,
+    confirmar_lineas,
+)
+
+
+def _linea(conn, estado: str) -> int:
+    cur = conn.cursor()
+    cur.execute("""
+        INSERT INTO lineas_dia (fecha, id_chofer, estado, origen_linea)
+        VALUES ('2026-01-05', 'CH_1', ?, 'FUERA_DE_PLAN')
+    """, (estado,))
+    conn.commit()
+    return cur.lastrowid
+
+
+def _estado(conn, id_linea: int) -> str:
+    return conn.execute(
+        "SELECT estado FROM lineas_dia WHERE id = ?", (id_linea,)
+    ).fetchone()[0]
+
+
+def test_solo_cambian_las_pendientes(conn):
+    pendiente = _linea(conn, "PENDIENTE")
+    confirmada = _linea(conn, "CONFIRMADO")
+    generada = _linea(conn, "GENERADO")
+
+    n = cancelar_lineas(conn, [pendiente, confirmada, generada], "test")
+
+    assert n == 1
+    assert _estado(conn, pendiente) == "CANCELADO"
+    assert _estado(conn, confirmada) == "CONFIRMADO"
+    assert _estado(conn, generada) == "GENERADO"
+
+
+def test_una_cancelada_no_se_vuelve_a_confirmar(conn):
+    cancelada = _linea(conn, "CANCELADO")
+    assert confirmar_lineas(conn, [cancelada], "test") == 0
+    assert _estado(conn, cancelada) == "CANCELADO"
+
+
+def test_ids_repetidos_cuentan_una_vez(conn):
+    a, b = _linea(conn, "PENDIENTE"), _linea(conn, "PENDIENTE")
+    assert confirmar_lineas(conn, [a, b, a], "test") == 2
+    assert confirmar_lineas(conn, [], "test") == 0
+
+
+def test_confirmar_una_sola_linea_respeta_el_estado(conn):
+    pendiente = _linea(conn, "PENDIENTE")
+    cancelada = _linea(conn, "CANCELADO")
+    generada = _linea(conn, "GENERADO")
+
+    assert confirmar_linea(conn, pendiente, "test") == 1
+    assert confirmar_linea(conn, cancelada, "test") == 0
+    assert confirmar_linea(conn, generada, "test") == 0
+
+    assert _estado(conn, pendiente) == "CONFIRMADO"
+    assert _estado(conn, cancelada) == "CANCELADO"
+    assert _estado(conn, generada) == "GENERADO"
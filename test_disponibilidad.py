@@ -0,0 +1,74 @@
+# test_disponibilidad.py
+#
+# Motor de disponibilidad por rango (services/disponibilidad.py): francos,
+# taller de `eventos` y mantenimientos abiertos de `eventos_recursos`.
+
+from datetime import date
+
+import pytest
+
+from services.disponibilidad import (
+    choferes_disponibles,
+    disponibilidad_flota,
+    motivos_choferes,
+    motivos_tractores,
+    tractores_disponibles,
+)
+from services.eventos_recursos import iniciar_franco
+from services.taller import iniciar_mantenimiento_correctivo
+
+
+@pytest.fixture
+def flota(conn):
+    conn.executemany(
+        "INSERT INTO choferes (id_chofer, nombre, activo) VALUES (?, ?, ?)",
+        [("CH_1", "Uno", 1), ("CH_2", "Dos", 1), ("CH_3", "Baja", 0)],
+    )
+    conn.executemany(
+        "INSERT INTO tractores (id_tractor, patente, activo) VALUES (?, ?, ?)",
+        [("TR_1", "AA1", 1), ("TR_2", "AA2", 1), ("TR_3", "AA3", 1)],
+    )
+    conn.commit()
+
+    iniciar_franco(conn, "CH_1", date(2026, 1, 5), date(2026, 1, 6), "test")
+    # franco de un chofer inactivo: no aparece en los motivos
+    iniciar_franco(conn, "CH_3", date(2026, 1, 5), date(2026, 1, 6), "test")
+    # mantenimiento abierto (fecha_fin NULL) en eventos_recursos
+    iniciar_mantenimiento_correctivo(conn, "TR_1", date(2026, 1, 6), None, "test")
+    # taller cargado en `eventos`
+    conn.execute("""
+        INSERT INTO eventos (tipo, recurso_tipo, recurso_id, fecha_inicio, fecha_fin)
+        VALUES ('TALLER', 'TRACTOR', 'TR_2', '2026-01-05', '2026-01-05')
+    """)
+    conn.commit()
+    return disponibilidad_flota(conn, "2026-01-04", date(2026, 1, 8))
+
+
+def test_solo_maestros_activos(flota):
+    assert sorted(flota["choferes"]) == ["CH_1", "CH_2"]
+    assert sorted(flota["tractores"]) == ["TR_1", "TR_2", "TR_3"]
+    assert flota["desde"] == date(2026, 1, 4)
+    assert flota["hasta"] == date(2026, 1, 8)
+
+
+def test_francos(flota):
+    assert sorted(choferes_disponibles(flota, "2026-01-04")) == ["CH_1", "CH_2"]
+    assert choferes_disponibles(flota, date(2026, 1, 5)) == ["CH_2"]
+    assert motivos_choferes(flota, date(2026, 1, 6)) == {"CH_1": "FRANCO"}
+    assert motivos_choferes(flota, date(2026, 1, 7)) == {}
+
+
+def test_taller_de_eventos_y_mantenimiento_abierto(flota):
+    assert sorted(tractores_disponibles(flota, "2026-01-04")) == ["TR_1", "TR_2", "TR_3"]
+    assert motivos_tractores(flota, "2026-01-05") == {"TR_2": "TALLER"}
+    # abierto desde el 6: sigue bloqueado hasta el final del rango
+    for dia in (6, 7, 8):
+        assert motivos_tractores(flota, date(2026, 1, dia)) == {"TR_1": "TALLER"}
+        assert sorted(tractores_disponibles(flota, date(2026, 1, dia))) == ["TR_2", "TR_3"]
+
+
+def test_un_solo_dia(conn, flota):
+    dia = disponibilidad_flota(conn, date(2026, 1, 5))
+    assert dia["hasta"] == dia["desde"] == date(2026, 1, 5)
+    assert set(dia["motivos_chofer"]) == set(dia["motivos_tractor"]) == {"2026-01-05"}
+    assert motivos_tractores(dia, "2026-01-05") == {"TR_2": "TALLER"}
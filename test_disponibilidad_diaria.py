@@ -0,0 +1,105 @@
+# test_disponibilidad_diaria.py
+#
+# disponibilidad_diaria mantenida por triggers desde `eventos` y desde el
+# taller de `eventos_recursos`, contrastada con verificar().
+
+from datetime import date, timedelta
+
+from services import disponibilidad_diaria
+from services.taller import finalizar_mantenimiento, iniciar_mantenimiento_correctivo
+from utils.schema import CALENDARIO_HASTA
+
+HOY = date.today()
+
+
+def _bloqueos(conn, recurso_id):
+    return conn.execute("""
+        SELECT MIN(fecha), MAX(fecha), COUNT(*)
+        FROM disponibilidad_diaria
+        WHERE recurso_id = ?
+    """, (recurso_id,)).fetchone()
+
+
+def _verificar_ok(conn):
+    r = disponibilidad_diaria.verificar(conn)
+    assert r["ok"], (r["faltantes"][:5], r["sobrantes"][:5])
+    return r
+
+
+def test_eventos_insert_update_delete(conn):
+    conn.execute("""
+        INSERT INTO eventos (tipo, recurso_tipo, recurso_id, fecha_inicio, fecha_fin)
+        VALUES ('FRANCO', 'CHOFER', 'CH_1', '2026-01-05', '2026-01-07')
+    """)
+    assert tuple(_bloqueos(conn, "CH_1")) == ("2026-01-05", "2026-01-07", 3)
+    _verificar_ok(conn)
+
+    conn.execute("UPDATE eventos SET fecha_fin = '2026-01-10'")
+    assert tuple(_bloqueos(conn, "CH_1")) == ("2026-01-05", "2026-01-10", 6)
+    _verificar_ok(conn)
+
+    conn.execute("DELETE FROM eventos")
+    assert _bloqueos(conn, "CH_1")[2] == 0
+    _verificar_ok(conn)
+
+
+def test_mantenimiento_de_eventos_recursos_bloquea_el_tractor(conn):
+    iniciar_mantenimiento_correctivo(conn, "TR_1", HOY, None, "test")
+
+    # abierto: bloqueado hasta el final del calendario
+    assert tuple(_bloqueos(conn, "TR_1"))[:2] == (HOY.isoformat(), CALENDARIO_HASTA)
+    bloqueos = disponibilidad_diaria.bloqueos_en_rango(conn, HOY, HOY + timedelta(days=30))
+    assert {(b["recurso_id"], b["motivo"]) for b in bloqueos} == {("TR_1", "TALLER")}
+    _verificar_ok(conn)
+
+    evento_id = conn.execute("SELECT id FROM eventos_recursos").fetchone()[0]
+    finalizar_mantenimiento(conn, evento_id, "TR_1")
+    assert tuple(_bloqueos(conn, "TR_1")) == (HOY.isoformat(), HOY.isoformat(), 1)
+    _verificar_ok(conn)
+
+    conn.execute("DELETE FROM eventos_recursos")
+    assert _bloqueos(conn, "TR_1")[2] == 0
+    _verificar_ok(conn)
+
+
+def test_ids_repetidos_entre_tablas_no_se_pisan(conn):
+    conn.execute("""
+        INSERT INTO eventos (id, tipo, recurso_tipo, recurso_id, fecha_inicio, fecha_fin)
+        VALUES (1, 'TALLER', 'TRACTOR', 'TR_1', '2026-01-05', '2026-01-06')
+    """)
+    conn.execute("""
+        INSERT INTO eventos_recursos (id, tipo, id_tractor, fecha_inicio, fecha_fin)
+        VALUES (1, 'MANTENIMIENTO_CORRECTIVO', 'TR_1', '2026-01-06', '2026-01-08')
+    """)
+    assert _bloqueos(conn, "TR_1")[2] == 5
+
+    # borrar el evento de una tabla no toca las filas de la otra
+    conn.execute("DELETE FROM eventos WHERE id = 1")
+    assert tuple(_bloqueos(conn, "TR_1")) == ("2026-01-06", "2026-01-08", 3)
+    _verificar_ok(conn)
+
+
+def test_verificar_detecta_y_reconstruir_repara(conn):
+    conn.execute("""
+        INSERT INTO eventos_recursos (tipo, id_tractor, fecha_inicio, fecha_fin)
+        VALUES ('TALLER', 'TR_1', '2026-01-05', '2026-01-06')
+    """)
+    conn.execute("DELETE FROM disponibilidad_diaria WHERE fecha = '2026-01-06'")
+    conn.execute("""
+        INSERT INTO disponibilidad_diaria
+            (fecha, recurso_tipo, recurso_id, tabla_evento, evento_id, estado, motivo)
+        VALUES ('2026-02-01', 'CHOFER', 'CH_9', 'eventos', 99, 'NO_DISPONIBLE', 'FRANCO')
+    """)
+    conn.commit()
+
+    r = disponibilidad_diaria.verificar(conn)
+    assert not r["ok"]
+    assert r["faltantes"] == [
+        ("2026-01-06", "TRACTOR", "TR_1", "eventos_recursos", 1, "TALLER"),
+    ]
+    assert r["sobrantes"] == [
+        ("2026-02-01", "CHOFER", "CH_9", "eventos", 99, "FRANCO"),
+    ]
+
+    assert disponibilidad_diaria.reconstruir(conn) == 2
+    _verificar_ok(conn)
@@ -0,0 +1,176 @@
+# test_eventos_globales.py
+#
+# Vista global de eventos de viaje (services/eventos_globales.py):
+# filtros en el WHERE, paginación por (inicio_ts, id_evento) y el cubo
+# eventos_horas_dia mantenido por triggers.
+
+import pytest
+
+from services.eventos_globales import (
+    horas_por_tipo,
+    listar_eventos_globales,
+    pagina_eventos_globales,
+    pivot_eventos_horas,
+)
+from utils import schema
+from utils.db import get_connection
+
+TIPOS = ("DEMORA_CARGA", "RRHH", "DEMORA_DESCARGA")
+
+
+@pytest.fixture
+def eventos(conn):
+    conn.execute("INSERT INTO choferes (id_chofer, nombre) VALUES ('CH_1', 'Ana'), ('CH_2', 'Beto')")
+    for n in range(1, 7):
+        conn.execute("""
+            INSERT INTO viajes (id, fecha, id_chofer, id_tractor)
+            VALUES (?, ?, ?, ?)
+        """, (n, f"2026-01-{n + 4:02d}", f"CH_{1 + n % 2}", f"TR_{1 + n % 3}"))
+        for k in range(4):
+            conn.execute("""
+                INSERT INTO eventos_viaje (viaje_id, tipo, inicio_ts, fin_ts)
+                VALUES (?, ?, ?, ?)
+            """, (
+                n, TIPOS[(n + k) % 3],
+                f"2026-01-{n + 4:02d} {8 + k:02d}:00:00",
+                f"2026-01-{n + 4:02d} {8 + k:02d}:45:00",
+            ))
+    # dos eventos con el mismo inicio: el id desempata el cursor
+    conn.execute("""
+        INSERT INTO eventos_viaje (viaje_id, tipo, inicio_ts, fin_ts)
+        VALUES (1, 'RRHH', '2026-01-05 08:00:00', '2026-01-05 08:10:00')
+    """)
+    conn.commit()
+    return conn
+
+
+def _recorrer(conn, **filtros):
+    filas, cursor = [], None
+    while True:
+        pagina = pagina_eventos_globales(conn, cursor=cursor, tamano=4, **filtros)
+        filas.extend(pagina["filas"])
+        cursor = pagina["siguiente"]
+        if cursor is None:
+            return filas
+
+
+@pytest.mark.parametrize("filtros", [
+    {"desde": "2026-01-01", "hasta": "2026-01-31"},
+    {"desde": "2026-01-06", "hasta": "2026-01-08"},
+    {"desde": "2026-01-01", "hasta": "2026-01-31", "tipos": ["Demora carga", "RRHH"]},
+    {"desde": "2026-01-01", "hasta": "2026-01-31", "chofer_id": "CH_2"},
+    {"desde": "2026-01-01", "hasta": "2026-01-31", "tractor_id": "TR_1", "tipos": ["RRHH"]},
+])
+def test_paginas_igual_al_listado_completo(eventos, filtros):
+    completo = listar_eventos_globales(eventos, **filtros)
+    assert completo
+    assert _recorrer(eventos, **filtros) == completo
+
+
+def test_filtros_y_duracion(eventos):
+    filas = listar_eventos_globales(
+        eventos, "2026-01-05", "2026-01-05", tipos=["RRHH"],
+    )
+    assert {f["tipo"] for f in filas} == {"RRHH"}
+    assert {f["fecha"] for f in filas} == {"2026-01-05"}
+    assert sorted(f["duracion_min"] for f in filas) == [10, 45, 45]
+    assert {f["chofer_nombre"] for f in filas} == {"Beto"}
+
+    # `hasta` incluye el día completo
+    assert listar_eventos_globales(eventos, "2026-01-10", "2026-01-10")[-1]["inicio_ts"] == "2026-01-10 11:00:00"
+
+
+def test_rango_usa_el_indice_de_inicio(eventos):
+    plan = " ".join(r[3] for r in eventos.execute("""
+        EXPLAIN QUERY PLAN
+        SELECT id_evento FROM eventos_viaje
+        WHERE inicio_ts >= '2026-01-05' AND inicio_ts < '2026-01-06'
+    """))
+    assert "idx_eventos_viaje_inicio" in plan
+
+
+# -------------------------------------------------
+# Cubo eventos_horas_dia
+# -------------------------------------------------
+def _cubo(conn):
+    return sorted(
+        (r[0], r[1], r[2], r[3], r[4], r[5], round(r[6], 6))
+        for r in conn.execute("SELECT * FROM eventos_horas_dia")
+    )
+
+
+def _reconstruido(conn):
+    conn.execute("SAVEPOINT cubo")
+    schema.reconstruir_eventos_horas_dia(conn.cursor())
+    cubo = _cubo(conn)
+    conn.execute("ROLLBACK TO cubo")
+    conn.execute("RELEASE cubo")
+    return cubo
+
+
+def test_cubo_por_deltas_igual_a_reconstruir(eventos):
+    assert _cubo(eventos) == _reconstruido(eventos)
+
+    # NULL y '' son la misma clave
+    eventos.execute("UPDATE viajes SET id_cliente = '' WHERE id = 1")
+    eventos.execute("UPDATE viajes SET id_cliente = NULL WHERE id = 3")
+    eventos.execute("UPDATE viajes SET id_chofer = 'CH_2', id_tractor = NULL WHERE id = 2")
+    assert _cubo(eventos) == _reconstruido(eventos)
+
+    eventos.execute("""
+        INSERT INTO eventos_viaje (viaje_id, tipo, inicio_ts, fin_ts)
+        VALUES (3, 'RRHH', '2026-01-07 23:30:00', '2026-01-08 00:30:00')
+    """)
+    eventos.execute("""
+        UPDATE eventos_viaje
+        SET inicio_ts = '2026-01-20 08:00:00', fin_ts = '2026-01-20 10:00:00', tipo = 'RRHH'
+        WHERE viaje_id = 4
+    """)
+    eventos.execute("UPDATE eventos_viaje SET viaje_id = 6 WHERE viaje_id = 5")
+    eventos.execute("DELETE FROM eventos_viaje WHERE viaje_id = 1 AND tipo = 'RRHH'")
+    assert _cubo(eventos) == _reconstruido(eventos)
+
+    eventos.execute("DELETE FROM viajes WHERE id = 6")
+    eventos.execute("DELETE FROM eventos_viaje WHERE viaje_id = 2")
+    assert _cubo(eventos) == _reconstruido(eventos)
+
+    # no quedan filas en cero
+    assert eventos.execute(
+        "SELECT COUNT(*) FROM eventos_horas_dia WHERE eventos <= 0"
+    ).fetchone()[0] == 0
+
+
+def test_pivot_y_horas_por_tipo(eventos):
+    eventos.execute("UPDATE viajes SET id_cliente = 'CL_1' WHERE id IN (1, 2)")
+
+    por_tipo = horas_por_tipo(eventos, "2026-01-01", "2026-01-31")
+    assert sum(r["eventos"] for r in por_tipo) == 25
+    assert round(sum(r["horas"] for r in por_tipo), 6) == round((24 * 45 + 10) / 60, 6)
+    assert [r["horas"] for r in por_tipo] == sorted((r["horas"] for r in por_tipo), reverse=True)
+
+    por_cliente = {
+        r["id_cliente"]: r["eventos"]
+        for r in pivot_eventos_horas(eventos, "2026-01-01", "2026-01-31", ("id_cliente",))
+    }
+    assert por_cliente == {"CL_1": 9, "": 16}
+
+    with pytest.raises(ValueError):
+        pivot_eventos_horas(eventos, "2026-01-01", "2026-01-31", ("patente",))
+
+
+def test_migracion_10_arma_el_cubo(tmp_path):
+    # Base en la versión 9 con el cubo vacío: m010 lo reconstruye, con
+    # cliente NULL y '' en la misma clave
+    conn = get_connection(db_path=tmp_path / "vieja.sqlite")
+    conn.execute("INSERT INTO viajes (id, fecha, id_cliente) VALUES (1, '2026-01-05', NULL), (2, '2026-01-05', '')")
+    for viaje in (1, 2):
+        conn.execute("""
+            INSERT INTO eventos_viaje (viaje_id, tipo, inicio_ts, fin_ts)
+            VALUES (?, 'RRHH', '2026-01-05 08:00:00', '2026-01-05 09:00:00')
+        """, (viaje,))
+    conn.execute("DELETE FROM eventos_horas_dia")
+    conn.execute("PRAGMA user_version = 9")
+    conn.commit()
+
+    assert schema.migrar(conn) == schema.VERSION_ACTUAL
+    assert _cubo(conn) == [("2026-01-05", "RRHH", "", "", "", 2, 120.0)]
@@ -0,0 +1,85 @@
+# test_eventos_viaje.py
+#
+# Demoras de viaje (services/eventos_viaje.py, services/kpi/demoras.py).
+
+from datetime import datetime
+
+import pytest
+
+from services.eventos_viaje import (
+    crear_evento_demora,
+    crear_eventos_demora,
+    duracion_demoras_viajes,
+    listar_demoras_viaje,
+    listar_demoras_viajes,
+)
+from services.kpi.demoras import kpi_demoras_por_viaje
+
+
+@pytest.fixture
+def viaje(conn):
+    cur = conn.execute("INSERT INTO viajes (fecha) VALUES ('2026-01-05')")
+    conn.commit()
+    return cur.lastrowid
+
+
+def test_la_validacion_compara_fechas_normalizadas(conn, viaje):
+    # Como texto, "06/01/2026" < "2026-01-05": sin normalizar se rechazaba.
+    n = crear_eventos_demora(conn, [{
+        "viaje_id": viaje,
+        "tipo": "DEMORA_CARGA",
+        "inicio_ts": "2026-01-05 23:00",
+        "fin_ts": "06/01/2026 01:00",
+    }], "test")
+    assert n == 1
+
+    # datetime contra texto tampoco se podía comparar.
+    crear_evento_demora(
+        conn, viaje, "DEMORA_CHOFER",
+        "2026-01-06 08:00", datetime(2026, 1, 6, 9, 30), None, "test",
+    )
+
+    filas = listar_demoras_viaje(conn, viaje)
+    assert {(f["inicio_ts"], f["fin_ts"]) for f in filas} == {
+        ("2026-01-05 23:00:00", "2026-01-06 01:00:00"),
+        ("2026-01-06 08:00:00", "2026-01-06 09:30:00"),
+    }
+
+
+def test_fin_anterior_al_inicio_se_rechaza(conn, viaje):
+    with pytest.raises(ValueError):
+        crear_eventos_demora(conn, [{
+            "viaje_id": viaje,
+            "tipo": "DEMORA_CARGA",
+            "inicio_ts": "06/01/2026 01:00",
+            "fin_ts": "2026-01-05 23:00",
+        }], "test")
+    assert listar_demoras_viaje(conn, viaje) == []
+
+
+def test_demoras_en_lote_con_ids_de_texto(conn, viaje):
+    crear_evento_demora(
+        conn, viaje, "DEMORA_CARGA",
+        "2026-01-05 08:00", "2026-01-05 08:45", None, "test",
+    )
+    otro = conn.execute("INSERT INTO viajes (fecha) VALUES ('2026-01-05')").lastrowid
+    conn.commit()
+
+    # las claves son las que pasó el que llama, aunque SQLite devuelva enteros
+    ids = [str(viaje), str(otro)]
+    demoras = listar_demoras_viajes(conn, ids)
+    assert list(demoras) == ids
+    assert [d["tipo"] for d in demoras[str(viaje)]] == ["DEMORA_CARGA"]
+    assert demoras[str(otro)] == []
+
+    assert duracion_demoras_viajes(conn, ids) == {
+        str(viaje): {"DEMORA_CARGA": 45},
+        str(otro): {},
+    }
+    assert kpi_demoras_por_viaje(conn, str(viaje)) == {
+        "demora_carga": 45,
+        "demora_descarga": 0,
+        "demora_chofer": 0,
+        "total": 45,
+    }
+    assert kpi_demoras_por_viaje(conn, viaje)["total"] == 45
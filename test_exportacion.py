@@ -0,0 +1,140 @@
+# test_exportacion.py
+#
+# Exportaciones a archivo (services/exportacion.py): se devuelven abiertas
+# desde disco, nunca como bytes, y el caché en disco se invalida con las
+# versiones de las tablas.
+
+import io
+import os
+
+import pytest
+from openpyxl import load_workbook
+
+from services import exportacion
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    directorio = tmp_path / "cache"
+    monkeypatch.setattr(exportacion, "CACHE_DIR", directorio)
+    return directorio
+
+
+@pytest.fixture
+def choferes(conn):
+    conn.executemany(
+        "INSERT INTO choferes (id_chofer, nombre) VALUES (?, ?)",
+        [(f"CH_{n:04d}", f"Chofer {n:04d}") for n in range(2500)],
+    )
+    conn.commit()
+    return conn
+
+
+def test_xlsx_se_devuelve_como_archivo_abierto(choferes, cache):
+    with exportacion.exportar_chofer_tractor(choferes) as archivo:
+        # lo que st.download_button acepta sin copiar a bytes
+        assert isinstance(archivo, io.BufferedReader)
+        assert archivo.name.startswith(str(cache))
+        hoja = load_workbook(archivo, read_only=True).active
+        filas = list(hoja.values)
+
+    assert filas[0] == ("chofer", "tractor", "patente", "estado_tractor")
+    assert len(filas) == 2501
+    assert filas[1] == ("Chofer 0000", "—", "—", "—")
+
+
+def test_sin_tablas_no_se_reutiliza(choferes, cache):
+    sql = "SELECT id_chofer FROM choferes ORDER BY id_chofer LIMIT 3"
+    with exportacion.exportar_consulta(choferes, sql, formato="csv") as a, \
+         exportacion.exportar_consulta(choferes, sql, formato="csv") as b:
+        assert a.name != b.name
+        assert a.read() == b.read()
+
+
+def test_error_a_mitad_no_deja_archivos(choferes, cache):
+    def romper(fila):
+        if fila["id_chofer"] == "CH_1500":
+            raise RuntimeError("boom")
+        return fila
+
+    with pytest.raises(RuntimeError):
+        exportacion.exportar_consulta(
+            choferes, "SELECT id_chofer FROM choferes", formato="csv",
+            transformar=romper, tablas=("choferes",),
+        )
+    assert list(cache.iterdir()) == []
+
+
+def test_formato_invalido(conn, cache):
+    with pytest.raises(ValueError):
+        exportacion.exportar_consulta(conn, "SELECT 1", formato="pdf")
+
+
+# -------------------------------------------------
+# Caché en disco
+# -------------------------------------------------
+SQL_CHOFERES = "SELECT id_chofer, nombre FROM choferes ORDER BY id_chofer"
+
+
+def _exportar(conn, sql=SQL_CHOFERES):
+    with exportacion.exportar_consulta(conn, sql, formato="csv", tablas=("choferes",)) as a:
+        return a.name, a.read()
+
+
+def _envejecer(cache):
+    # el LRU ordena por mtime: se separan los usos en el tiempo
+    for n, ruta in enumerate(sorted(cache.iterdir(), key=os.path.getmtime)):
+        os.utime(ruta, (1_000_000 + n, 1_000_000 + n))
+
+
+def _consultas(conn, llamada):
+    sentencias = []
+    conn.set_trace_callback(sentencias.append)
+    try:
+        llamada()
+    finally:
+        conn.set_trace_callback(None)
+    return [s for s in sentencias if "FROM choferes" in s]
+
+
+def test_cache_se_reutiliza_hasta_que_cambia_la_tabla(choferes, cache):
+    ruta, contenido = _exportar(choferes)
+
+    # segundo pedido: mismo archivo, sin volver a consultar
+    assert _consultas(choferes, lambda: _exportar(choferes)) == []
+    assert _exportar(choferes) == (ruta, contenido)
+
+    choferes.execute("UPDATE choferes SET nombre = 'Otro' WHERE id_chofer = 'CH_0000'")
+    choferes.commit()
+
+    nueva, contenido_nuevo = _exportar(choferes)
+    assert nueva != ruta
+    assert b"Otro" in contenido_nuevo
+
+
+def test_cache_recorta_por_cantidad(choferes, cache, monkeypatch):
+    monkeypatch.setattr(exportacion, "ENTRADAS_CACHE", 3)
+    rutas = []
+    for n in range(1, 6):
+        rutas.append(_exportar(choferes, f"{SQL_CHOFERES} LIMIT {n}")[0])
+        _envejecer(cache)
+
+    quedan = {str(r) for r in cache.iterdir()}
+    assert quedan == set(rutas[-3:])
+
+
+def test_cache_recorta_por_tamano(choferes, cache, monkeypatch):
+    _, contenido = _exportar(choferes)
+    _envejecer(cache)
+    # las dos juntas no entran: se va la menos usada
+    monkeypatch.setattr(exportacion, "CACHE_MAXIMO_BYTES", len(contenido))
+
+    chica = _exportar(choferes, f"{SQL_CHOFERES} LIMIT 1")[0]
+
+    assert {str(r) for r in cache.iterdir()} == {chica}
+
+
+def test_vaciar_cache(choferes, cache):
+    _exportar(choferes)
+    exportacion.vaciar_cache()
+    assert list(cache.iterdir()) == []
@@ -0,0 +1,73 @@
+# test_fechas.py
+#
+# Formato canónico de fechas (utils/fechas.py) y los triggers que lo
+# exigen en la base.
+
+import sqlite3
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from utils.fechas import a_fecha_iso, a_ts_iso
+
+
+@pytest.fixture
+def zona_buenos_aires(monkeypatch):
+    monkeypatch.setenv("TZ", "America/Argentina/Buenos_Aires")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    (date(2026, 1, 5), "2026-01-05"),
+    (datetime(2026, 1, 5, 23, 59), "2026-01-05"),
+    ("2026-01-05", "2026-01-05"),
+    ("05/01/2026", "2026-01-05"),
+    ("05-01-2026", "2026-01-05"),
+    ("2026/01/05", "2026-01-05"),
+    (None, None),
+    ("", None),
+])
+def test_a_fecha_iso(valor, esperado):
+    assert a_fecha_iso(valor) == esperado
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    (datetime(2026, 1, 5, 8, 30), "2026-01-05 08:30:00"),
+    (date(2026, 1, 5), "2026-01-05 00:00:00"),
+    ("2026-01-05T08:30", "2026-01-05 08:30:00"),
+    ("05/01/2026 08:30", "2026-01-05 08:30:00"),
+])
+def test_a_ts_iso(valor, esperado):
+    assert a_ts_iso(valor) == esperado
+
+
+def test_fecha_no_reconocida():
+    with pytest.raises(ValueError):
+        a_fecha_iso("mañana")
+
+
+def test_datetime_con_zona_se_pasa_a_hora_local(zona_buenos_aires):
+    utc = datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc)
+    assert a_ts_iso(utc) == "2026-01-05 09:00:00"
+    assert a_ts_iso("2026-01-05T12:00:00+00:00") == "2026-01-05 09:00:00"
+
+    otra = datetime(2026, 1, 5, 1, 0, tzinfo=timezone(timedelta(hours=2)))
+    assert a_fecha_iso(otra) == "2026-01-04"
+
+
+def test_trigger_rechaza_fechas_no_canonicas(conn):
+    with pytest.raises(sqlite3.DatabaseError, match="formato de fecha"):
+        conn.execute("INSERT INTO lineas_dia (fecha) VALUES ('05/01/2026')")
+    with pytest.raises(sqlite3.DatabaseError, match="formato de fecha"):
+        conn.execute(
+            "INSERT INTO eventos_viaje (viaje_id, tipo, inicio_ts, fin_ts) "
+            "VALUES (1, 'RRHH', '2026-01-05T08:00', '2026-01-05 09:00:00')"
+        )
+
+    conn.execute("INSERT INTO lineas_dia (fecha) VALUES ('2026-01-05')")
+    with pytest.raises(sqlite3.DatabaseError, match="formato de fecha"):
+        conn.execute("UPDATE lineas_dia SET fecha = '2026-1-6'")
@@ -0,0 +1,170 @@
+# test_indices.py
+#
+# Corre las consultas de services/ y modules/ contra una base en memoria
+# con el esquema canónico, captura el SQL real (trace callback) y pasa
+# cada sentencia por EXPLAIN QUERY PLAN.
+# Falla (exit 1) si alguna recorre completa una tabla transaccional.
+#
+#   python test_indices.py
+
+import re
+import sys
+from datetime import date
+
+from utils.db import get_connection
+from utils.paginacion import codificar_cursor
+from utils.schema import INDICES
+
+# Tablas que crecen con la operación. Los maestros (choferes, tractores,
+# materiales...) son chicos y se pueden recorrer.
+TABLAS_CALIENTES = {
+    "lineas_dia",
+    "viajes",
+    "eventos",
+    "eventos_viaje",
+    "eventos_recursos",
+    "eventos_horas_dia",
+}
+
+# Consultas que todavía recorren la tabla completa, con el motivo.
+CONOCIDAS = {}
+
+FECHA = date(2026, 1, 5)
+HASTA = date(2026, 1, 11)
+
+
+def _catalogo():
+    from modules import dia_operativo
+    from services import (
+        agenda,
+        desvios,
+        disponibilidad,
+        disponibilidad_diaria,
+        eventos,
+        eventos_globales,
+        eventos_recursos,
+        eventos_viaje,
+        taller,
+        viajes,
+    )
+    from services.kpi import demoras
+    from services.programacion import semanal
+
+    return [
+        ("dia_operativo.obtener_lineas_del_dia", lambda c: dia_operativo.obtener_lineas_del_dia(c, FECHA)),
+        ("dia_operativo.kpis_dia", lambda c: dia_operativo.kpis_dia(c, FECHA)),
+        ("dia_operativo.confirmar_linea", lambda c: dia_operativo.confirmar_linea(c, 1, "test")),
+        ("semanal.listar_programacion_semana", lambda c: semanal.listar_programacion_semana(c, FECHA)),
+        ("semanal.contadores_semana", lambda c: semanal.contadores_semana(c, FECHA)),
+        ("semanal.crear_linea_programada", lambda c: semanal.crear_linea_programada(c, FECHA, "CH_1", "M_01", "test")),
+        ("semanal.eliminar_linea_programacion", lambda c: semanal.eliminar_linea_programacion(c, 1)),
+        ("disponibilidad.disponibilidad_flota", lambda c: disponibilidad.disponibilidad_flota(c, FECHA, HASTA)),
+        ("disponibilidad.contadores_choferes", lambda c: disponibilidad.contadores_choferes(c, FECHA)),
+        ("disponibilidad.contadores_tractores", lambda c: disponibilidad.contadores_tractores(c, FECHA)),
+        ("disponibilidad.pool_disponibilidad_diaria", lambda c: disponibilidad.pool_disponibilidad_diaria(c, FECHA)),
+        ("disponibilidad_diaria.resumen_disponibilidad", lambda c: disponibilidad_diaria.resumen_disponibilidad(c, FECHA, HASTA)),
+        ("eventos.listar_eventos", lambda c: eventos.listar_eventos(c, recurso_tipo="CHOFER", recurso_id="CH_1")),
+        ("eventos_recursos.chofer_en_franco", lambda c: eventos_recursos.chofer_en_franco(c, "CH_1", FECHA)),
+        ("eventos_recursos.tractor_en_taller", lambda c: eventos_recursos.tractor_en_taller(c, "TR_1", FECHA)),
+        ("eventos_recursos.listar_francos_mes", lambda c: eventos_recursos.listar_francos_mes(c, 2026, 1)),
+        ("eventos_recursos.contadores_franco_por_chofer_mes", lambda c: eventos_recursos.contadores_franco_por_chofer_mes(c, 2026, 1)),
+        ("eventos_viaje.listar_eventos_viaje", lambda c: eventos_viaje.listar_eventos_viaje(c, 1)),
+        ("eventos_viaje.listar_demoras_viaje", lambda c: eventos_viaje.listar_demoras_viaje(c, 1)),
+        ("eventos_viaje.duracion_demoras_viaje", lambda c: eventos_viaje.duracion_demoras_viaje(c, 1)),
+        ("eventos_viaje.listar_demoras_viajes", lambda c: eventos_viaje.listar_demoras_viajes(c, [1, 2, 3])),
+        ("eventos_viaje.duracion_demoras_viajes", lambda c: eventos_viaje.duracion_demoras_viajes(c, [1, 2, 3])),
+        ("taller.listar_tractores_en_mantenimiento", lambda c: taller.listar_tractores_en_mantenimiento(c)),
+        ("viajes.listar_lineas_para_viajes", lambda c: viajes.listar_lineas_para_viajes(c)),
+        ("viajes.listar_viajes", lambda c: viajes.listar_viajes(c, desde=str(FECHA), hasta=str(HASTA))),
+        ("viajes.pagina_viajes", lambda c: viajes.pagina_viajes(c, desde=FECHA, cursor=codificar_cursor(str(HASTA), 1))),
+        ("viajes.pagina_lineas_para_viajes", lambda c: viajes.pagina_lineas_para_viajes(c, cursor=codificar_cursor(str(FECHA), 1))),
+        ("viajes.listar_viajes_activos", lambda c: viajes.listar_viajes_activos(c, desde=str(FECHA), hasta=str(HASTA))),
+        ("viajes.finalizar_viaje", lambda c: viajes.finalizar_viaje(c, 1, "test")),
+        ("desvios.calcular_desvios_dia", lambda c: desvios.calcular_desvios_dia(c, FECHA)),
+        ("desvios.calcular_resumen_semana", lambda c: desvios.calcular_resumen_semana(c, FECHA)),
+        ("demoras.kpi_demoras_por_viajes", lambda c: demoras.kpi_demoras_por_viajes(c, [1, 2, 3])),
+        ("demoras.kpi_demoras_por_dia", lambda c: demoras.kpi_demoras_por_dia(c, FECHA)),
+        ("demoras.kpi_demoras_por_cliente", lambda c: demoras.kpi_demoras_por_cliente(c, FECHA, HASTA)),
+        ("agenda.listar_viajes_agenda", lambda c: agenda.listar_viajes_agenda(c, FECHA, HASTA)),
+        ("eventos_globales.listar_eventos_globales", lambda c: eventos_globales.listar_eventos_globales(c, FECHA, HASTA)),
+        ("eventos_globales.pagina_eventos_globales", lambda c: eventos_globales.pagina_eventos_globales(c, FECHA, HASTA, tipos=["Demora carga", "RRHH"], cursor=codificar_cursor(f"{FECHA} 08:00:00", 1))),
+        ("eventos_globales.horas_por_tipo", lambda c: eventos_globales.horas_por_tipo(c, FECHA, HASTA, chofer_id="CH_0001")),
+        ("eventos_globales.pivot_eventos_horas", lambda c: eventos_globales.pivot_eventos_horas(c, FECHA, HASTA, ("fecha", "id_cliente"))),
+    ]
+
+
+def _alias(sql: str) -> dict:
+    """
+    alias -> tabla, para leer "SCAN l" en el plan.
+    """
+    alias = {}
+    for tabla, nombre in re.findall(
+        r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?",
+        sql,
+        flags=re.IGNORECASE,
+    ):
+        alias[tabla] = tabla
+        if nombre and nombre.upper() not in {"WHERE", "ON", "SET", "LEFT", "JOIN", "GROUP", "ORDER", "VALUES", "SELECT"}:
+            alias[nombre] = tabla
+    return alias
+
+
+def _scans(conn, sql: str) -> list:
+    cur = conn.cursor()
+    cur.execute(f"EXPLAIN QUERY PLAN {sql}")
+    alias = _alias(sql)
+    malos = []
+    for r in cur.fetchall():
+        detalle = r[3]
+        m = re.match(r"SCAN (\w+)", detalle)
+        if m and alias.get(m.group(1), m.group(1)) in TABLAS_CALIENTES:
+            malos.append(detalle)
+    return malos
+
+
+def main() -> int:
+    conn = get_connection(db_path=":memory:")
+
+    fallas = []
+    for nombre, llamada in _catalogo():
+        sentencias = []
+        conn.set_trace_callback(sentencias.append)
+        try:
+            llamada(conn)
+        finally:
+            conn.set_trace_callback(None)
+
+        for sql in sentencias:
+            if not re.match(r"\s*(SELECT|UPDATE|DELETE|INSERT|WITH)", sql, re.IGNORECASE):
+                continue
+            malos = _scans(conn, sql)
+            if not malos:
+                continue
+            if nombre in CONOCIDAS:
+                print(f"~ {nombre}: {', '.join(malos)} ({CONOCIDAS[nombre]})")
+            else:
+                fallas.append(nombre)
+                print(f"✗ {nombre}: {', '.join(malos)}")
+                print("   " + " ".join(sql.split()))
+
+    if fallas:
+        print(f"\n{len(fallas)} consulta(s) sin índice")
+        return 1
+
+    print("\nOK: ninguna consulta del catálogo recorre tablas completas")
+    return 0
+
+
+def test_consultas_usan_indices():
+    assert main() == 0
+
+
+def test_indices_administrados_existen(conn):
+    creados = {
+        r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    }
+    assert set(INDICES) <= creados
+
+
+if __name__ == "__main__":
+    sys.exit(main())
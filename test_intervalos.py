@@ -0,0 +1,72 @@
+# test_intervalos.py
+#
+# Índice en memoria de francos y taller (services/intervalos.py).
+
+from datetime import date, timedelta
+
+from services import intervalos
+from services.eventos_recursos import chofer_en_franco, iniciar_franco, tractor_en_taller
+from services.taller import finalizar_mantenimiento, iniciar_mantenimiento_correctivo
+
+HOY = date.today()
+
+
+def _evento(conn, tipo, recurso_tipo, recurso_id, desde, hasta):
+    conn.execute("""
+        INSERT INTO eventos (tipo, recurso_tipo, recurso_id, fecha_inicio, fecha_fin)
+        VALUES (?, ?, ?, ?, ?)
+    """, (tipo, recurso_tipo, recurso_id, desde, hasta))
+    conn.commit()
+    intervalos.invalidar(conn)
+
+
+def test_mantenimiento_abierto_bloquea_el_tractor(conn):
+    conn.execute("INSERT INTO tractores (id_tractor, patente, estado) VALUES ('TR_1', 'AA1', 'OPERATIVO')")
+    conn.commit()
+    assert not tractor_en_taller(conn, "TR_1", HOY)
+
+    iniciar_mantenimiento_correctivo(conn, "TR_1", HOY, None, "test")
+
+    # sin fecha_fin: bloqueado desde el inicio en adelante
+    assert tractor_en_taller(conn, "TR_1", HOY)
+    assert tractor_en_taller(conn, "TR_1", HOY + timedelta(days=400))
+    assert not tractor_en_taller(conn, "TR_1", HOY - timedelta(days=1))
+    assert intervalos.ocupado_en_rango(
+        conn, intervalos.TALLER, "TR_1", HOY + timedelta(days=30), HOY + timedelta(days=60)
+    )
+
+
+def test_finalizar_mantenimiento_libera_el_tractor(conn):
+    iniciar_mantenimiento_correctivo(conn, "TR_1", HOY - timedelta(days=3), None, "test")
+    evento_id = conn.execute("SELECT id FROM eventos_recursos").fetchone()[0]
+
+    finalizar_mantenimiento(conn, evento_id, "TR_1")
+
+    assert tractor_en_taller(conn, "TR_1", HOY)
+    assert not tractor_en_taller(conn, "TR_1", HOY + timedelta(days=1))
+
+
+def test_franco_y_taller_desde_eventos(conn):
+    iniciar_franco(conn, "CH_1", date(2026, 1, 5), date(2026, 1, 7), "test")
+    _evento(conn, "TALLER", "TRACTOR", "TR_2", "2026-01-10", "2026-01-12")
+    # un FRANCO cargado sobre un tractor no cuenta
+    _evento(conn, "FRANCO", "TRACTOR", "TR_2", "2026-01-01", "2026-01-31")
+
+    assert chofer_en_franco(conn, "CH_1", date(2026, 1, 5))
+    assert chofer_en_franco(conn, "CH_1", date(2026, 1, 7))
+    assert not chofer_en_franco(conn, "CH_1", date(2026, 1, 8))
+    assert tractor_en_taller(conn, "TR_2", date(2026, 1, 11))
+    assert not tractor_en_taller(conn, "TR_2", date(2026, 1, 9))
+
+
+def test_intervalos_solapados_se_fusionan(conn):
+    _evento(conn, "FRANCO", "CHOFER", "CH_1", "2026-01-05", "2026-01-08")
+    _evento(conn, "FRANCO", "CHOFER", "CH_1", "2026-01-07", "2026-01-10")
+    _evento(conn, "FRANCO", "CHOFER", "CH_1", "2026-02-01", "2026-02-02")
+
+    assert intervalos.intervalos_en_rango(
+        conn, intervalos.FRANCO, date(2026, 1, 1), date(2026, 1, 31)
+    ) == [("CH_1", "2026-01-05", "2026-01-10")]
+    assert not intervalos.ocupado_en_rango(
+        conn, intervalos.FRANCO, "CH_1", date(2026, 1, 11), date(2026, 1, 31)
+    )
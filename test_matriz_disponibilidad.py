@@ -0,0 +1,107 @@
+# test_matriz_disponibilidad.py
+#
+# Matriz recursos × días (services/matriz_disponibilidad.py) contrastada
+# celda por celda con las consultas puntuales (chofer_en_franco,
+# tractor_en_taller) y con el motor de rango (disponibilidad_flota).
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from services import intervalos
+from services import matriz_disponibilidad as md
+from services.disponibilidad import (
+    choferes_disponibles,
+    disponibilidad_flota,
+    tractores_disponibles,
+)
+from services.eventos_recursos import chofer_en_franco, iniciar_franco, tractor_en_taller
+from services.taller import iniciar_mantenimiento_correctivo
+
+DESDE, HASTA = date(2026, 1, 5), date(2026, 1, 18)
+
+
+@pytest.fixture
+def flota(conn):
+    conn.executemany(
+        "INSERT INTO tractores (id_tractor, patente) VALUES (?, ?)",
+        [("TR_1", "AA1"), ("TR_2", "AA2"), ("TR_3", "AA3")],
+    )
+    conn.executemany(
+        "INSERT INTO choferes (id_chofer, nombre) VALUES (?, ?)",
+        [("CH_1", "Ana"), ("CH_2", "Beto"), ("CH_3", "Caro"), ("CH_4", "Dani")],
+    )
+    conn.commit()
+
+    # francos: uno que empieza antes del rango, dos solapados y uno que
+    # termina después
+    iniciar_franco(conn, "CH_1", date(2026, 1, 1), date(2026, 1, 6), "test")
+    iniciar_franco(conn, "CH_2", date(2026, 1, 8), date(2026, 1, 10), "test")
+    iniciar_franco(conn, "CH_2", date(2026, 1, 10), date(2026, 1, 12), "test")
+    iniciar_franco(conn, "CH_3", date(2026, 1, 17), date(2026, 1, 25), "test")
+    # taller cargado en `eventos` y mantenimiento abierto en eventos_recursos
+    conn.execute("""
+        INSERT INTO eventos (tipo, recurso_tipo, recurso_id, fecha_inicio, fecha_fin)
+        VALUES ('TALLER', 'TRACTOR', 'TR_2', '2026-01-14', '2026-01-15')
+    """)
+    conn.commit()
+    intervalos.invalidar(conn)
+    iniciar_mantenimiento_correctivo(conn, "TR_3", date(2026, 1, 9), None, "test")
+
+    # franco y taller desvinculan el tractor: se asignan al final
+    conn.executemany(
+        "UPDATE choferes SET id_tractor = ? WHERE id_chofer = ?",
+        [("TR_1", "CH_1"), ("TR_2", "CH_2"), ("TR_3", "CH_3")],
+    )
+    conn.commit()
+    return conn
+
+
+def test_choferes_coincide_con_chofer_en_franco(flota):
+    m = md.matriz_choferes(flota, DESDE, HASTA)
+    assert m.recursos == ["CH_1", "CH_2", "CH_3", "CH_4"]
+    assert m.motivo.shape == (4, 14)
+    for i, chofer in enumerate(m.recursos):
+        for j, dia in enumerate(m.fechas):
+            assert (m.motivo[i, j] == md.MOTIVO_FRANCO) == chofer_en_franco(flota, chofer, dia)
+
+
+def test_tractores_coincide_con_tractor_en_taller(flota):
+    m = md.matriz_tractores(flota, DESDE, HASTA)
+    assert m.recursos == ["TR_1", "TR_2", "TR_3"]
+    for i, tractor in enumerate(m.recursos):
+        for j, dia in enumerate(m.fechas):
+            assert (m.motivo[i, j] == md.MOTIVO_TALLER) == tractor_en_taller(flota, tractor, dia)
+
+
+def test_disponibles_coinciden_con_disponibilidad_flota(flota):
+    fl = disponibilidad_flota(flota, DESDE, HASTA)
+    m_ch = md.matriz_choferes(flota, DESDE, HASTA)
+    m_tr = md.matriz_tractores(flota, DESDE, HASTA)
+
+    for j, dia in enumerate(m_ch.fechas):
+        assert sorted(np.compress(m_ch.disponible[:, j], m_ch.recursos)) == \
+            sorted(choferes_disponibles(fl, dia))
+        assert sorted(np.compress(m_tr.disponible[:, j], m_tr.recursos)) == \
+            sorted(tractores_disponibles(fl, dia))
+    assert list(md.totales_diarios(m_ch)) == [
+        len(choferes_disponibles(fl, dia)) for dia in m_ch.fechas
+    ]
+
+
+def test_choferes_con_tractor(flota):
+    m = md.matriz_choferes_con_tractor(flota, DESDE, HASTA)
+    col = {d: j for j, d in enumerate(m.fechas)}
+
+    def motivo(chofer, dia):
+        return md.MOTIVOS[m.motivo[m.fila(chofer), col[date(2026, 1, dia)]]]
+
+    assert motivo("CH_1", 5) == "FRANCO"
+    assert motivo("CH_1", 7) == "DISPONIBLE"
+    assert motivo("CH_2", 14) == "TALLER"
+    # franco y taller el mismo día: gana el franco
+    assert motivo("CH_3", 17) == "FRANCO"
+    assert motivo("CH_3", 9) == "TALLER"
+    assert motivo("CH_4", 5) == "SIN_TRACTOR"
+    assert list(md.dias_por_recurso(m, md.MOTIVO_SIN_TRACTOR)) == [0, 0, 0, 14]
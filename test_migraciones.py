@@ -0,0 +1,128 @@
+# test_migraciones.py
+#
+# Motor de migraciones (utils/schema.py) sobre bases temporales.
+
+import sqlite3
+
+import pytest
+
+from utils import schema
+from utils.db import get_connection
+
+
+def test_base_nueva_queda_en_la_version_actual(conn):
+    assert schema.version(conn) == schema.VERSION_ACTUAL
+    for tabla in schema.TABLAS:
+        reales = {r[1] for r in conn.execute(f"PRAGMA table_info({tabla})")}
+        assert set(schema.columnas(tabla)) <= reales, tabla
+
+
+def test_migrar_dos_veces_no_cambia_nada(conn):
+    objetos = conn.execute(
+        "SELECT type, name, sql FROM sqlite_master ORDER BY name"
+    ).fetchall()
+    assert schema.migrar(conn) == schema.VERSION_ACTUAL
+    assert conn.execute(
+        "SELECT type, name, sql FROM sqlite_master ORDER BY name"
+    ).fetchall() == objetos
+
+
+def test_esquema_viejo_se_renombra_conservando_datos(tmp_path):
+    ruta = tmp_path / "vieja.sqlite"
+    vieja = sqlite3.connect(ruta)
+    vieja.execute("""
+        CREATE TABLE eventos_recursos (
+            id_evento INTEGER PRIMARY KEY,
+            tipo TEXT,
+            tractor_id TEXT,
+            fecha_inicio TEXT,
+            fecha_fin TEXT,
+            columna_local TEXT
+        )
+    """)
+    vieja.execute("""
+        INSERT INTO eventos_recursos
+        VALUES (7, 'MANTENIMIENTO_CORRECTIVO', 'TR_1', '2026-01-05', NULL, 'x')
+    """)
+    vieja.commit()
+    vieja.close()
+
+    conn = get_connection(db_path=ruta)
+
+    fila = dict(conn.execute("SELECT * FROM eventos_recursos").fetchone())
+    assert fila["id"] == 7
+    assert fila["id_tractor"] == "TR_1"
+    assert fila["fecha_fin"] is None
+    # columnas que el esquema canónico no conoce se conservan
+    assert fila["columna_local"] == "x"
+    assert "tractor_id" not in fila
+
+
+def test_migracion_fallida_no_avanza_la_version(tmp_path, monkeypatch):
+    ruta = tmp_path / "falla.sqlite"
+    conn = sqlite3.connect(ruta)
+
+    def romper(cur):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(
+        schema, "MIGRACIONES", schema.MIGRACIONES[:1] + [(2, romper)]
+    )
+    with pytest.raises(RuntimeError):
+        schema.migrar(conn)
+    assert schema.version(conn) == 1
+    conn.close()
+
+
+def test_m005_deduplica_lineas_de_programacion(conn):
+    # Base en la versión 4 con tres líneas PROGRAMACION del mismo chofer y día
+    conn.execute("DROP INDEX ux_lineas_dia_programacion")
+    cur = conn.cursor()
+    ids = {}
+    for nombre, estado in (("vieja", "PENDIENTE"), ("confirmada", "CONFIRMADO"),
+                           ("con_viaje", "PENDIENTE"), ("sobrante", "PENDIENTE")):
+        cur.execute("""
+            INSERT INTO lineas_dia (fecha, id_chofer, origen_linea, estado)
+            VALUES ('2026-01-05', 'CH_1', 'PROGRAMACION', ?)
+        """, (estado,))
+        ids[nombre] = cur.lastrowid
+    cur.execute("""
+        INSERT INTO lineas_dia (fecha, id_chofer, origen_linea, estado)
+        VALUES ('2026-01-06', 'CH_1', 'PROGRAMACION', 'PENDIENTE')
+    """)
+    otro_dia = cur.lastrowid
+    cur.execute("INSERT INTO viajes (linea_id, fecha, id_chofer) VALUES (?, '2026-01-05', 'CH_1')",
+                (ids["con_viaje"],))
+    conn.execute("PRAGMA user_version = 4")
+    conn.commit()
+
+    assert schema.migrar(conn) == schema.VERSION_ACTUAL
+
+    filas = {
+        r["id"]: r["origen_linea"]
+        for r in conn.execute("SELECT id, origen_linea FROM lineas_dia")
+    }
+    # queda la que tiene viajes; las demás sin viajes se borran sin respaldo
+    assert filas == {ids["con_viaje"]: "PROGRAMACION", otro_dia: "PROGRAMACION"}
+
+
+def test_m005_no_borra_lineas_con_viajes(conn):
+    conn.execute("DROP INDEX ux_lineas_dia_programacion")
+    cur = conn.cursor()
+    ids = []
+    for estado in ("PENDIENTE", "CONFIRMADO"):
+        cur.execute("""
+            INSERT INTO lineas_dia (fecha, id_chofer, origen_linea, estado)
+            VALUES ('2026-01-05', 'CH_1', 'PROGRAMACION', ?)
+        """, (estado,))
+        ids.append(cur.lastrowid)
+        cur.execute("INSERT INTO viajes (linea_id, fecha, id_chofer) VALUES (?, '2026-01-05', 'CH_1')",
+                    (cur.lastrowid,))
+    conn.execute("PRAGMA user_version = 4")
+    conn.commit()
+
+    schema.migrar(conn)
+
+    filas = dict(conn.execute("SELECT id, origen_linea FROM lineas_dia").fetchall())
+    # gana la CONFIRMADO; la otra tiene viajes: pasa a FUERA_DE_PLAN
+    assert filas == {ids[1]: "PROGRAMACION", ids[0]: "FUERA_DE_PLAN"}
@@ -0,0 +1,110 @@
+# test_optimizador.py
+#
+# Propuesta automática de programación semanal
+# (services/programacion/optimizador.py).
+
+from datetime import date
+
+import pytest
+
+from services.programacion.optimizador import aplicar_propuesta, optimizar_semana
+
+LUNES = date(2026, 1, 5)
+
+
+@pytest.fixture
+def flota(conn):
+    for n in (1, 2, 3):
+        conn.execute("INSERT INTO tractores (id_tractor, patente) VALUES (?, ?)", (f"TR_{n}", f"AA{n}"))
+        conn.execute(
+            "INSERT INTO choferes (id_chofer, nombre, id_tractor) VALUES (?, ?, ?)",
+            (f"CH_{n}", f"Chofer {n}", f"TR_{n}"),
+        )
+    conn.commit()
+    return conn
+
+
+def _linea(conn, fecha, id_chofer, id_material, estado):
+    conn.execute("""
+        INSERT INTO lineas_dia (fecha, id_chofer, id_tractor, id_material, estado, origen_linea)
+        VALUES (?, ?, 'TR_1', ?, ?, 'PROGRAMACION')
+    """, (fecha, id_chofer, id_material, estado))
+    conn.commit()
+
+
+def test_cubre_objetivos_y_reporta_faltantes(flota):
+    p = optimizar_semana(flota, LUNES, {"Lunes": {"M_01": 2}, "Martes": {"M_01": 4}})
+
+    por_dia = {}
+    for a in p["asignaciones"]:
+        por_dia.setdefault(a["fecha"], []).append(a)
+    assert len(por_dia["2026-01-05"]) == 2
+    assert len(por_dia["2026-01-06"]) == 3
+    assert p["faltantes"] == {"2026-01-06": {"M_01": 1}}
+    assert all(a["id_tractor"] == a["id_chofer"].replace("CH", "TR") for a in p["asignaciones"])
+
+
+def test_respeta_tope_de_dias_y_francos(flota):
+    flota.execute("""
+        INSERT INTO eventos (tipo, recurso_tipo, recurso_id, fecha_inicio, fecha_fin)
+        VALUES ('FRANCO', 'CHOFER', 'CH_2', '2026-01-05', '2026-01-11')
+    """)
+    flota.commit()
+    semana = {dia: {"M_01": 2} for dia in
+              ("Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo")}
+
+    p = optimizar_semana(flota, LUNES, semana, max_dias_por_chofer=3)
+
+    assert "CH_2" not in p["dias_por_chofer"]
+    assert max(p["dias_por_chofer"].values()) <= 3
+    assert len(p["asignaciones"]) == 6
+
+
+def test_lineas_existentes_cuentan_y_las_canceladas_ocupan(flota):
+    _linea(flota, "2026-01-05", "CH_1", "M_01", "PENDIENTE")
+    _linea(flota, "2026-01-05", "CH_2", "M_01", "CANCELADO")
+
+    p = optimizar_semana(flota, LUNES, {"Lunes": {"M_01": 3}})
+
+    # la PENDIENTE cubre una; la CANCELADO no cubre nada pero deja al
+    # chofer ocupado: solo queda CH_3
+    assert [a["id_chofer"] for a in p["asignaciones"]] == ["CH_3"]
+    assert p["faltantes"] == {"2026-01-05": {"M_01": 1}}
+    assert p["dias_por_chofer"] == {"CH_1": 1, "CH_3": 1}
+
+    assert aplicar_propuesta(flota, p, "test") == 1
+    estados = dict(flota.execute(
+        "SELECT id_chofer, estado FROM lineas_dia WHERE fecha = '2026-01-05'"
+    ).fetchall())
+    assert estados == {"CH_1": "PENDIENTE", "CH_2": "CANCELADO", "CH_3": "PENDIENTE"}
+
+
+def test_aplicar_no_reactiva_canceladas(flota):
+    p = optimizar_semana(flota, LUNES, {"Lunes": {"M_01": 1}})
+    elegido = p["asignaciones"][0]["id_chofer"]
+    # otro usuario programa y cancela el mismo chofer-día entre medio
+    _linea(flota, "2026-01-05", elegido, "M_02", "CANCELADO")
+
+    assert aplicar_propuesta(flota, p, "test") == 0
+    fila = flota.execute(
+        "SELECT id_material, estado FROM lineas_dia WHERE id_chofer = ?", (elegido,)
+    ).fetchone()
+    assert tuple(fila) == ("M_02", "CANCELADO")
+
+
+def test_aplicar_no_pisa_lineas_vigentes(flota):
+    p = optimizar_semana(flota, LUNES, {"Lunes": {"M_01": 1}})
+    elegido = p["asignaciones"][0]["id_chofer"]
+    # otro usuario programa el mismo chofer-día entre medio
+    _linea(flota, "2026-01-05", elegido, "M_02", "CONFIRMADO")
+
+    assert aplicar_propuesta(flota, p, "test") == 0
+    fila = flota.execute(
+        "SELECT id_material, estado FROM lineas_dia WHERE id_chofer = ?", (elegido,)
+    ).fetchone()
+    assert tuple(fila) == ("M_02", "CONFIRMADO")
+
+
+def test_dia_fuera_de_la_semana(flota):
+    with pytest.raises(ValueError):
+        optimizar_semana(flota, LUNES, {"2026-01-20": {"M_01": 1}})
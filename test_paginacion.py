@@ -0,0 +1,101 @@
+# test_paginacion.py
+#
+# Paginación por clave (utils/paginacion.py) en los listados de viajes, y
+# la exportación con los mismos filtros que la página.
+
+import csv
+import io
+
+import pytest
+
+from services import exportacion
+from services.viajes import pagina_lineas_para_viajes, pagina_viajes
+from utils.paginacion import (
+    TAMANO_MAXIMO,
+    codificar_cursor,
+    decodificar_cursor,
+    limitar_tamano,
+)
+
+ESTADOS = ("CONFIRMADO", "FINALIZADO", "CANCELADO")
+
+
+@pytest.fixture
+def viajes(conn):
+    conn.execute("INSERT INTO choferes (id_chofer, nombre) VALUES ('CH_1', 'Ana'), ('CH_2', 'Beto')")
+    for n in range(30):
+        conn.execute("""
+            INSERT INTO viajes (fecha, id_chofer, estado)
+            VALUES (?, ?, ?)
+        """, (f"2026-01-{1 + n % 10:02d}", f"CH_{1 + n % 2}", ESTADOS[n % 3]))
+        conn.execute("""
+            INSERT INTO lineas_dia (fecha, id_chofer, estado, origen_linea)
+            VALUES (?, ?, 'PENDIENTE', 'PROGRAMACION')
+        """, (f"2026-02-{1 + n:02d}", "CH_1"))
+    conn.commit()
+    return conn
+
+
+def _recorrer(listar, **filtros):
+    filas, cursor = [], None
+    while True:
+        pagina = listar(cursor=cursor, tamano=7, **filtros)
+        assert len(pagina["filas"]) <= 7
+        filas.extend(pagina["filas"])
+        cursor = pagina["siguiente"]
+        if cursor is None:
+            return filas
+
+
+def test_cursor_ida_y_vuelta():
+    token = codificar_cursor("2026-01-05", 12)
+    assert decodificar_cursor(token) == ["2026-01-05", 12]
+    with pytest.raises(ValueError):
+        decodificar_cursor("no es un cursor")
+    assert limitar_tamano(None) == 50
+    assert limitar_tamano(0) == 50
+    assert limitar_tamano(10_000) == TAMANO_MAXIMO
+
+
+@pytest.mark.parametrize("filtros", [
+    {},
+    {"estado": "CANCELADO"},
+    {"id_chofer": "CH_2"},
+    {"desde": "2026-01-03", "hasta": "2026-01-06", "estado": "CONFIRMADO"},
+])
+def test_pagina_viajes_recorre_todo_sin_repetir(viajes, filtros):
+    filas = _recorrer(lambda **k: pagina_viajes(viajes, **k), **filtros)
+
+    where, params = ["1 = 1"], []
+    for clave, sql in (("desde", "fecha >= ?"), ("hasta", "fecha <= ?"),
+                       ("estado", "estado = ?"), ("id_chofer", "id_chofer = ?")):
+        if clave in filtros:
+            where.append(sql)
+            params.append(filtros[clave])
+    esperado = [r[0] for r in viajes.execute(
+        f"SELECT id FROM viajes WHERE {' AND '.join(where)} ORDER BY fecha DESC, id DESC",
+        params,
+    )]
+    assert [f["id"] for f in filas] == esperado
+
+
+def test_pagina_lineas_en_orden_ascendente(viajes):
+    filas = _recorrer(lambda **k: pagina_lineas_para_viajes(viajes, **k), desde="2026-02-10")
+    fechas = [f["fecha"] for f in filas]
+    assert fechas == sorted(fechas)
+    assert len(filas) == 21
+
+
+def test_exportar_viajes_respeta_filtros(viajes):
+    def filas(**filtros):
+        with exportacion.exportar_viajes(viajes, formato="csv", **filtros) as archivo:
+            return list(csv.DictReader(io.TextIOWrapper(archivo, encoding="utf-8-sig")))
+
+    todas = filas()
+    canceladas = filas(estado="CANCELADO")
+    de_beto = filas(estado="CANCELADO", id_chofer="CH_2")
+
+    assert len(todas) == 30
+    assert len(canceladas) == 10
+    assert 0 < len(de_beto) < len(canceladas)
+    assert {f["Chofer"] for f in de_beto} == {"Beto"}
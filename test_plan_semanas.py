@@ -0,0 +1,128 @@
+# test_plan_semanas.py
+#
+# Repetir una semana de programación en las siguientes con cambios mínimos
+# (patron_de_semana / repetir_patron / aplicar_plan_semanas).
+
+from datetime import date
+
+import pytest
+
+from services.programacion.semanal import (
+    aplicar_plan_semanas,
+    patron_de_semana,
+    repetir_patron,
+)
+
+LUNES = date(2026, 1, 5)
+SIGUIENTE = date(2026, 1, 12)
+
+
+def _linea(conn, fecha, id_chofer, id_material, estado="PENDIENTE"):
+    cur = conn.execute("""
+        INSERT INTO lineas_dia (fecha, id_chofer, id_material, estado, origen_linea)
+        VALUES (?, ?, ?, ?, 'PROGRAMACION')
+    """, (fecha, id_chofer, id_material, estado))
+    conn.commit()
+    return cur.lastrowid
+
+
+def _lineas(conn, desde="2026-01-12"):
+    return {
+        (r["fecha"], r["id_chofer"]): (r["id_material"], r["estado"])
+        for r in conn.execute(
+            "SELECT fecha, id_chofer, id_material, estado FROM lineas_dia WHERE fecha >= ?",
+            (desde,),
+        )
+    }
+
+
+def test_patron_y_repeticion(conn):
+    _linea(conn, "2026-01-05", "CH_1", "M_01")
+    _linea(conn, "2026-01-07", "CH_2", "M_02")
+    _linea(conn, "2026-01-07", "CH_3", "M_02", "CANCELADO")
+
+    patron = patron_de_semana(conn, LUNES)
+    assert patron == {"Lunes": {"CH_1": "M_01"}, "Miércoles": {"CH_2": "M_02"}}
+
+    assert repetir_patron(SIGUIENTE, 2, patron) == {
+        ("2026-01-12", "CH_1"): "M_01",
+        ("2026-01-14", "CH_2"): "M_02",
+        ("2026-01-19", "CH_1"): "M_01",
+        ("2026-01-21", "CH_2"): "M_02",
+    }
+
+
+def test_aplica_solo_las_diferencias(conn):
+    _linea(conn, "2026-01-12", "CH_1", "M_01")                 # igual
+    _linea(conn, "2026-01-12", "CH_2", "M_01")                 # cambia material
+    _linea(conn, "2026-01-13", "CH_3", "M_01")                 # sobra
+    _linea(conn, "2026-01-13", "CH_4", "M_01", "CONFIRMADO")   # sobra, protegida
+    conn.execute("""
+        INSERT INTO eventos (tipo, recurso_tipo, recurso_id, fecha_inicio, fecha_fin)
+        VALUES ('FRANCO', 'CHOFER', 'CH_5', '2026-01-12', '2026-01-12')
+    """)
+    conn.commit()
+    plan = {
+        ("2026-01-12", "CH_1"): "M_01",
+        ("2026-01-12", "CH_2"): "M_02",
+        ("2026-01-12", "CH_5"): "M_01",   # de franco
+        ("2026-01-14", "CH_6"): "M_01",   # nueva
+    }
+
+    previa = aplicar_plan_semanas(conn, SIGUIENTE, 1, plan, "test", simular=True)
+    assert (previa["insertadas"], previa["actualizadas"], previa["eliminadas"],
+            previa["sin_cambios"], previa["omitidas"]) == (1, 1, 1, 1, 2)
+    assert len(_lineas(conn)) == 4   # simular no escribe
+
+    aplicar_plan_semanas(conn, SIGUIENTE, 1, plan, "test")
+    assert _lineas(conn) == {
+        ("2026-01-12", "CH_1"): ("M_01", "PENDIENTE"),
+        ("2026-01-12", "CH_2"): ("M_02", "PENDIENTE"),
+        ("2026-01-13", "CH_4"): ("M_01", "CONFIRMADO"),
+        ("2026-01-14", "CH_6"): ("M_01", "PENDIENTE"),
+    }
+
+
+def test_no_reactiva_ni_cambia_canceladas(conn):
+    _linea(conn, "2026-01-12", "CH_1", "M_01", "CANCELADO")
+    plan = {("2026-01-12", "CH_1"): "M_02"}
+
+    res = aplicar_plan_semanas(conn, SIGUIENTE, 1, plan, "test")
+
+    assert res["actualizadas"] == 0 and res["omitidas"] == 1
+    assert _lineas(conn) == {("2026-01-12", "CH_1"): ("M_01", "CANCELADO")}
+
+
+def test_no_borra_canceladas_fuera_del_plan(conn):
+    _linea(conn, "2026-01-12", "CH_1", "M_01", "CANCELADO")
+    _linea(conn, "2026-01-13", "CH_1", "M_01")
+    plan = {("2026-01-14", "CH_1"): "M_01"}
+
+    res = aplicar_plan_semanas(conn, SIGUIENTE, 1, plan, "test")
+
+    assert (res["insertadas"], res["eliminadas"], res["omitidas"]) == (1, 1, 1)
+    assert res["mensajes"] == ["2026-01-12 – Chofer CH_1: CANCELADO, no se elimina"]
+    assert _lineas(conn) == {
+        ("2026-01-12", "CH_1"): ("M_01", "CANCELADO"),
+        ("2026-01-14", "CH_1"): ("M_01", "PENDIENTE"),
+    }
+
+
+def test_plan_vacio_requiere_confirmacion(conn):
+    _linea(conn, "2026-01-12", "CH_1", "M_01")
+    _linea(conn, "2026-01-20", "CH_1", "M_01")
+
+    with pytest.raises(ValueError, match="vacío"):
+        aplicar_plan_semanas(conn, SIGUIENTE, 2, {}, "test")
+    assert len(_lineas(conn)) == 2
+
+    # la previa no escribe: se puede mostrar sin confirmar
+    assert aplicar_plan_semanas(conn, SIGUIENTE, 2, {}, "test", simular=True)["eliminadas"] == 2
+
+    aplicar_plan_semanas(conn, SIGUIENTE, 2, {}, "test", vaciar=True)
+    assert _lineas(conn) == {}
+
+
+def test_fecha_fuera_del_rango(conn):
+    with pytest.raises(ValueError, match="fuera del plan"):
+        aplicar_plan_semanas(conn, SIGUIENTE, 1, {("2026-01-20", "CH_1"): "M_01"}, "test")
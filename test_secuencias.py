@@ -0,0 +1,112 @@
+# test_secuencias.py
+#
+# Números de viaje por bloques (utils/secuencias.py): los huecos que deja,
+# la puesta al día con el máximo real de la tabla y varios threads
+# pidiendo números a la vez.
+
+import threading
+import time
+
+from utils import secuencias
+from utils.db import get_connection, transaccion
+from utils.secuencias import TAMANO_BLOQUE
+
+
+def _proximo(conn):
+    return conn.execute(
+        "SELECT proximo FROM secuencias WHERE nombre = 'viajes'"
+    ).fetchone()[0]
+
+
+def test_reserva_por_bloques(conn):
+    assert secuencias.siguiente(conn, "viajes") == 1
+    # un solo UPDATE reserva el bloque entero
+    assert _proximo(conn) == 1 + TAMANO_BLOQUE
+
+    numeros = [secuencias.siguiente(conn, "viajes") for _ in range(TAMANO_BLOQUE - 1)]
+    assert numeros == list(range(2, TAMANO_BLOQUE + 1))
+    assert _proximo(conn) == 1 + TAMANO_BLOQUE
+
+    assert secuencias.siguiente(conn, "viajes") == TAMANO_BLOQUE + 1
+    assert _proximo(conn) == 1 + 2 * TAMANO_BLOQUE
+
+
+def test_bloque_descartado_deja_hueco(conn):
+    assert [secuencias.siguiente(conn, "viajes") for _ in range(3)] == [1, 2, 3]
+
+    # otro proceso (o un reinicio) no conoce el bloque: 4..20 quedan sin usar
+    secuencias.descartar_bloques()
+    assert secuencias.siguiente(conn, "viajes") == TAMANO_BLOQUE + 1
+
+
+def test_se_pone_al_dia_con_ids_explicitos(conn):
+    secuencias.siguiente(conn, "viajes")
+    conn.execute("INSERT INTO viajes (id, fecha) VALUES (500, '2026-01-05')")
+    conn.commit()
+
+    secuencias.descartar_bloques()
+    assert secuencias.siguiente(conn, "viajes") == 501
+
+
+def test_dentro_de_una_transaccion_reserva_de_a_uno(conn):
+    # Sin bloque y con la transacción abierta no se puede usar la otra
+    # conexión: se reserva un número en la misma transacción
+    with transaccion(conn):
+        assert secuencias.siguiente(conn, "viajes") == 1
+        assert secuencias.siguiente(conn, "viajes") == 2
+        assert _proximo(conn) == 3
+
+    # si la transacción se deshace, la reserva también: sin hueco
+    conn.execute("BEGIN")
+    assert secuencias.siguiente(conn, "viajes") == 3
+    conn.rollback()
+    assert secuencias.siguiente(conn, "viajes") == 3
+
+
+def test_threads_esperan_un_solo_bloque(conn):
+    ruta = conn.ruta
+    numeros = []
+    largada = threading.Barrier(8)
+
+    def despachante():
+        c = get_connection(db_path=ruta)
+        largada.wait()
+        numeros.extend(secuencias.siguiente(c, "viajes") for _ in range(2))
+
+    hilos = [threading.Thread(target=despachante) for _ in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join(10)
+
+    # una sola reserva: los demás esperaron el bloque del primero
+    assert sorted(numeros) == list(range(1, 17))
+    assert _proximo(conn) == 1 + TAMANO_BLOQUE
+
+
+def test_transaccion_abierta_no_espera_otra_reserva(conn):
+    # A reserva un bloque y queda esperando el lock de escritura que tiene
+    # B; B, dentro de su transacción, pide un número: no puede esperar a A
+    ruta = conn.ruta
+    b_escribe, a_pidio = threading.Event(), threading.Event()
+    resultado = {}
+
+    def despachante_a():
+        c = get_connection(db_path=ruta)
+        b_escribe.wait()
+        a_pidio.set()
+        resultado["a"] = secuencias.siguiente(c, "viajes")
+
+    a = threading.Thread(target=despachante_a)
+    a.start()
+    with transaccion(conn):
+        b_escribe.set()
+        a_pidio.wait()
+        time.sleep(0.2)   # A ya está en BEGIN IMMEDIATE
+
+        inicio = time.monotonic()
+        resultado["b"] = secuencias.siguiente(conn, "viajes")
+        assert time.monotonic() - inicio < 1
+    a.join(10)
+
+    assert resultado == {"b": 1, "a": 2}
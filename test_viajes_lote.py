@@ -0,0 +1,69 @@
+# test_viajes_lote.py
+#
+# Generación de viajes en lote (services/viajes.generar_viajes_lote): qué
+# items gastan nro de viaje y cuáles no.
+
+import pytest
+
+from services.viajes import generar_viajes_lote
+from utils import secuencias
+
+DATOS = {"cliente_id": "CL_1", "origen_id": "OR_1", "destino_id": "DE_1"}
+
+
+@pytest.fixture
+def lineas(conn):
+    conn.execute("INSERT INTO tractores (id_tractor, patente) VALUES ('TR_1', 'AA1')")
+    ids = []
+    for n in range(1, 5):
+        conn.execute(
+            "INSERT INTO choferes (id_chofer, nombre, id_tractor) VALUES (?, ?, 'TR_1')",
+            (f"CH_{n}", f"Chofer {n}"),
+        )
+        cur = conn.execute("""
+            INSERT INTO lineas_dia (fecha, id_chofer, id_material, estado, origen_linea)
+            VALUES ('2026-01-05', ?, 'M_01', 'PENDIENTE', 'PROGRAMACION')
+        """, (f"CH_{n}",))
+        ids.append(cur.lastrowid)
+    # CH_3 de franco: falla dentro de la generación, no en la validación
+    conn.execute("""
+        INSERT INTO eventos (tipo, recurso_tipo, recurso_id, fecha_inicio, fecha_fin)
+        VALUES ('FRANCO', 'CHOFER', 'CH_3', '2026-01-05', '2026-01-05')
+    """)
+    conn.commit()
+    return ids
+
+
+def _items(ids):
+    return [
+        {"id_linea": ids[0], **DATOS},
+        {"id_linea": 9999, **DATOS},          # no existe
+        {"id_linea": ids[1]},                 # faltan datos
+        {"id_linea": ids[2], **DATOS},        # franco
+        {"id_linea": ids[3], **DATOS},
+    ]
+
+
+def _numeros(conn):
+    return dict(conn.execute("SELECT linea_id, id FROM viajes").fetchall())
+
+
+def test_items_invalidos_no_gastan_numero(conn, lineas):
+    res = generar_viajes_lote(conn, _items(lineas), "test")
+
+    assert [g["id_linea"] for g in res["generados"]] == [lineas[0], lineas[3]]
+    assert len(res["errores"]) == 3
+    # sin bloque en memoria cada número se reserva en la transacción del
+    # lote: el del franco vuelve con el ROLLBACK TO y no queda hueco
+    assert _numeros(conn) == {lineas[0]: 1, lineas[3]: 2}
+
+
+def test_con_bloque_en_memoria_el_fallo_tardio_deja_hueco(conn, lineas):
+    assert secuencias.siguiente(conn, "viajes") == 1   # reserva el bloque
+
+    generar_viajes_lote(conn, _items(lineas), "test")
+
+    # las inválidas no piden número; el franco gasta el 3
+    assert _numeros(conn) == {lineas[0]: 2, lineas[3]: 4}
+    estados = [r[0] for r in conn.execute("SELECT estado FROM lineas_dia ORDER BY id")]
+    assert estados == ["GENERADO", "PENDIENTE", "PENDIENTE", "GENERADO"]
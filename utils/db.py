@@ -1,12 +1,281 @@
-# utils/db.py
+import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
+from utils import instrumentacion
+from utils.schema import migrar
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 DB_PATH = BASE_DIR / "data" / "programacion_bca.sqlite"
 
-def get_connection():
-    conn = sqlite3.connect(DB_PATH)
+# =================================================
+# PRAGMAS DE CONEXIÓN
+# =================================================
+# WAL deja leer mientras otro despachante escribe; synchronous=NORMAL
+# es seguro con WAL y evita un fsync por commit.
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KIB = 20000          # ~20 MB de page cache por conexión
+MMAP_SIZE = 256 * 1024 * 1024   # 256 MB
+MAX_LIBRES_POR_BASE = 8
+
+
+def get_db_path() -> Path:
+    return DB_PATH
+
+
+def _aplicar_pragmas(conn, solo_lectura: bool):
+    cur = conn.cursor()
+    cur.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    if not solo_lectura:
+        cur.execute("PRAGMA journal_mode = WAL")
+        cur.execute("PRAGMA synchronous = NORMAL")
+    cur.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+    cur.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    cur.execute("PRAGMA temp_store = MEMORY")
+    cur.close()
+
+
+# =================================================
+# CONEXIÓN DEL POOL
+# =================================================
+class ConexionBCA(sqlite3.Connection):
+    """
+    Conexión entregada por get_connection().
+    close() la devuelve al pool en lugar de cerrarla.
+    Con la instrumentación activa (utils/instrumentacion.py) los cursores
+    registran cada sentencia.
+    """
+
+    ruta: str = ""
+    solo_lectura: bool = False
+
+    def cursor(self, factory=sqlite3.Cursor):
+        if factory is sqlite3.Cursor and instrumentacion.activa():
+            factory = instrumentacion.CursorInstrumentado
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        if instrumentacion.activa():
+            return self.cursor().execute(sql, parametros)
+        return super().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        if instrumentacion.activa():
+            return self.cursor().executemany(sql, parametros)
+        return super().executemany(sql, parametros)
+
+    def close(self):
+        _pool.liberar(self)
+
+    def cerrar_definitivo(self):
+        super().close()
+
+
+def _abrir(ruta: str, solo_lectura: bool) -> ConexionBCA:
+    if solo_lectura:
+        uri = f"{Path(ruta).as_uri()}?mode=ro"
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            factory=ConexionBCA,
+            check_same_thread=False,
+        )
+    else:
+        conn = sqlite3.connect(
+            ruta,
+            factory=ConexionBCA,
+            check_same_thread=False,
+        )
+
+    conn.ruta = ruta
+    conn.solo_lectura = solo_lectura
     conn.row_factory = sqlite3.Row
+    _aplicar_pragmas(conn, solo_lectura)
     return conn
 
+
+# =================================================
+# POOL POR PROCESO Y THREAD
+# =================================================
+class _PoolConexiones:
+    """
+    Cada thread recibe siempre la misma conexión mientras vive.
+    Streamlit usa un thread nuevo por rerun: cuando el thread dueño
+    termina, su conexión vuelve a quedar libre para el siguiente.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self._pid = os.getpid()
+        self._asignadas = {}   # (ruta, ro, ident) -> (thread, conn)
+        self._libres = {}      # (ruta, ro) -> [conn]
+
+    def obtener(self, ruta: str, solo_lectura: bool) -> ConexionBCA:
+        actual = threading.current_thread()
+        clave = (ruta, solo_lectura, actual.ident)
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # Fork: las conexiones heredadas no se comparten.
+                self._reiniciar()
+
+            asignada = self._asignadas.get(clave)
+            if asignada and asignada[0] is actual:
+                return asignada[1]
+
+            self._recuperar_huerfanas()
+
+            libres = self._libres.get((ruta, solo_lectura), [])
+            conn = libres.pop() if libres else None
+
+        if conn is None:
+            conn = _abrir(ruta, solo_lectura)
+        elif conn.in_transaction:
+            # Rerun anterior cortado a mitad de transacción.
+            conn.rollback()
+
+        with self._lock:
+            self._asignadas[clave] = (actual, conn)
+        return conn
+
+    def _recuperar_huerfanas(self):
+        for clave, (thread, conn) in list(self._asignadas.items()):
+            if not thread.is_alive():
+                del self._asignadas[clave]
+                self._guardar_libre(conn)
+
+    def _guardar_libre(self, conn):
+        libres = self._libres.setdefault((conn.ruta, conn.solo_lectura), [])
+        if len(libres) < MAX_LIBRES_POR_BASE:
+            libres.append(conn)
+        else:
+            conn.cerrar_definitivo()
+
+    def liberar(self, conn: ConexionBCA):
+        with self._lock:
+            for clave, (_, asignada) in list(self._asignadas.items()):
+                if asignada is conn:
+                    del self._asignadas[clave]
+                    break
+            else:
+                return
+
+        if conn.in_transaction:
+            conn.rollback()
+
+        with self._lock:
+            self._guardar_libre(conn)
+
+    def cerrar_todas(self):
+        with self._lock:
+            conexiones = [c for _, c in self._asignadas.values()]
+            for libres in self._libres.values():
+                conexiones.extend(libres)
+            self._reiniciar()
+
+        for conn in conexiones:
+            conn.cerrar_definitivo()
+
+
+_pool = _PoolConexiones()
+
+
+# =================================================
+# MIGRACIÓN (UNA VEZ POR BASE Y PROCESO)
+# =================================================
+_migradas = set()
+_lock_migracion = threading.Lock()
+
+
+def _asegurar_migrada(ruta: str, conn):
+    if ruta in _migradas:
+        return
+    with _lock_migracion:
+        if ruta not in _migradas:
+            migrar(conn)
+            _migradas.add(ruta)
+
+
+# =================================================
+# API
+# =================================================
+def get_connection(solo_lectura: bool = False, db_path=None):
+    """
+    Devuelve la conexión del thread actual (pool por proceso y thread).
+    solo_lectura=True abre la base en modo read-only (páginas de análisis).
+    """
+    ruta = str(db_path or DB_PATH)
+    conn = _pool.obtener(ruta, solo_lectura)
+    if not solo_lectura:
+        _asegurar_migrada(ruta, conn)
+    return conn
+
+
+def cerrar_conexiones():
+    """
+    Cierra todas las conexiones del pool (scripts, backups, reset de base).
+    """
+    _pool.cerrar_todas()
+    with _lock_migracion:
+        _migradas.clear()
+
+
+# =================================================
+# UNIDAD DE TRABAJO
+# =================================================
+# id(conn) -> profundidad de transaccion() abiertas
+_transacciones = {}
+
+
+@contextmanager
+def transaccion(conn):
+    """
+    Agrupa varias escrituras en una sola transacción (un solo fsync).
+    Los mutadores de services/ y modules/ llaman a confirmar(conn) en vez
+    de conn.commit(): dentro de un bloque transaccion() no confirman y el
+    commit (o rollback si hay excepción) lo hace el bloque más externo.
+
+        with transaccion(conn):
+            confirmar_linea(conn, 1, usuario)
+            cancelar_linea(conn, 2, usuario)
+    """
+    clave = id(conn)
+    profundidad = _transacciones.get(clave, 0)
+
+    if profundidad == 0:
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+
+    _transacciones[clave] = profundidad + 1
+    try:
+        yield conn
+    except BaseException:
+        if profundidad == 0:
+            conn.rollback()
+        raise
+    else:
+        if profundidad == 0:
+            conn.commit()
+    finally:
+        if profundidad == 0:
+            _transacciones.pop(clave, None)
+        else:
+            _transacciones[clave] = profundidad
+
+
+def en_transaccion(conn) -> bool:
+    return id(conn) in _transacciones
+
+
+def confirmar(conn):
+    """
+    commit() salvo que la conexión esté dentro de transaccion().
+    """
+    if id(conn) not in _transacciones:
+        conn.commit()
@@ -0,0 +1,42 @@
+# utils/descargas.py
+#
+# Botón de descarga "a pedido" para las páginas.
+# st.download_button necesita el archivo ya armado en cada rerun; acá
+# primero se muestra "Preparar" y recién al apretarlo se genera (con el
+# caché de services/exportacion.py, los reruns siguientes no rehacen el
+# archivo mientras los datos no cambien).
+
+import streamlit as st
+
+from services.exportacion import MIME
+from utils.panel_consultas import recargar
+
+
+def boton_descarga(etiqueta: str, clave: str, generar, nombre_archivo: str, formato: str = "xlsx"):
+    """
+    generar: callable sin argumentos que devuelve el archivo abierto en
+             modo binario (las exportaciones de services/exportacion.py);
+             se cierra acá.
+    clave:   identifica la exportación con sus filtros; si cambian los
+             filtros hay que volver a pedirla.
+    """
+    pedida = st.session_state.get("descargas_pedidas", set())
+
+    if clave not in pedida:
+        if st.button(f"⚙️ Preparar: {etiqueta}", key=f"preparar_{clave}"):
+            pedida.add(clave)
+            st.session_state["descargas_pedidas"] = pedida
+            recargar()
+        return
+
+    with st.spinner("Armando archivo..."):
+        archivo = generar()
+
+    with archivo:
+        st.download_button(
+            etiqueta,
+            data=archivo,
+            file_name=nombre_archivo,
+            mime=MIME[formato],
+            key=f"descargar_{clave}",
+        )
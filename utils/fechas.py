@@ -0,0 +1,75 @@
+"""
+utils/fechas.py
+Formato canónico de fechas en la base:
+  - fechas:      'YYYY-MM-DD'
+  - timestamps:  'YYYY-MM-DD HH:MM:SS'
+Así los filtros por fecha son comparaciones de texto que usan índices.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+
+FORMATO_FECHA = "%Y-%m-%d"
+FORMATO_TS = "%Y-%m-%d %H:%M:%S"
+
+# Formatos que aparecieron en datos viejos / importaciones
+_FORMATOS_ENTRADA = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M",
+    "%d/%m/%Y",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d-%m-%Y",
+    "%Y/%m/%d",
+)
+
+
+def _local(dt: datetime) -> datetime:
+    """
+    La base guarda hora local sin zona: un datetime con zona se pasa a la
+    hora local antes de descartar tzinfo.
+    """
+    if dt.tzinfo is None:
+        return dt
+    return dt.astimezone().replace(tzinfo=None)
+
+
+def _parsear(valor) -> datetime | None:
+    if valor is None or valor == "":
+        return None
+    if isinstance(valor, datetime):
+        return _local(valor)
+    if isinstance(valor, date):
+        return datetime(valor.year, valor.month, valor.day)
+
+    s = str(valor).strip()
+    try:
+        return _local(datetime.fromisoformat(s))
+    except ValueError:
+        pass
+    for fmt in _FORMATOS_ENTRADA:
+        try:
+            return datetime.strptime(s, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Fecha no reconocida: {valor!r}")
+
+
+def a_fecha_iso(valor) -> str | None:
+    """
+    date / datetime / texto -> 'YYYY-MM-DD' (None queda None).
+    """
+    dt = _parsear(valor)
+    return dt.strftime(FORMATO_FECHA) if dt else None
+
+
+def a_ts_iso(valor) -> str | None:
+    """
+    date / datetime / texto -> 'YYYY-MM-DD HH:MM:SS' (None queda None).
+    """
+    dt = _parsear(valor)
+    return dt.strftime(FORMATO_TS) if dt else None
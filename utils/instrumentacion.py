@@ -0,0 +1,244 @@
+"""
+utils/instrumentacion.py
+Registro de consultas SQL por rerun.
+
+Mientras está activa en el thread actual (un rerun de Streamlit = un
+thread), cada sentencia ejecutada con una conexión de utils.db queda
+registrada con:
+  - SQL normalizado (literales -> ?)
+  - función de services/ o modules/ que la disparó
+  - tiempo de pared (execute + fetch)
+  - filas devueltas / afectadas
+
+Al terminar el rerun los registros se escriben en logs/consultas_sql.log
+(JSON por línea, con rotación). Desactivada, el único costo es leer un
+atributo thread-local al crear cada cursor.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+LOG_PATH = BASE_DIR / "logs" / "consultas_sql.log"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 5
+
+# Paquetes cuyas funciones se reportan como origen de la consulta
+_PAQUETES_LLAMADOR = ("services.", "modules.")
+
+_estado = threading.local()
+
+# thread -> registros abiertos, para volcar los reruns cortados por
+# st.stop() / st.rerun() cuyo thread ya terminó.
+_abiertos = {}
+_lock_abiertos = threading.Lock()
+
+
+# =================================================
+# ESTADO POR THREAD
+# =================================================
+def activa() -> bool:
+    return getattr(_estado, "registros", None) is not None
+
+
+def iniciar():
+    """
+    Empieza a registrar en el thread actual.
+    Los reruns que quedaron sin cerrar se vuelcan al log.
+    """
+    if activa():
+        terminar()
+
+    with _lock_abiertos:
+        huerfanos = [t for t in _abiertos if not t.is_alive()]
+        pendientes = [_abiertos.pop(t) for t in huerfanos]
+        _estado.registros = []
+        _abiertos[threading.current_thread()] = _estado.registros
+
+    for registros_rerun in pendientes:
+        if registros_rerun:
+            _escribir_log(registros_rerun)
+
+
+def terminar() -> list:
+    """
+    Deja de registrar, escribe el log y devuelve los registros del rerun.
+    """
+    registros_rerun = getattr(_estado, "registros", None) or []
+    _estado.registros = None
+    with _lock_abiertos:
+        _abiertos.pop(threading.current_thread(), None)
+    if registros_rerun:
+        _escribir_log(registros_rerun)
+    return registros_rerun
+
+
+def registros() -> list:
+    return list(getattr(_estado, "registros", None) or [])
+
+
+# =================================================
+# NORMALIZACIÓN Y ORIGEN
+# =================================================
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_LISTA = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RE_ESPACIOS = re.compile(r"\s+")
+
+
+def normalizar_sql(sql: str) -> str:
+    s = _RE_STRING.sub("?", sql)
+    s = _RE_NUMERO.sub("?", s)
+    s = _RE_LISTA.sub("(?, ...)", s)
+    return _RE_ESPACIOS.sub(" ", s).strip()
+
+
+def _llamador() -> str:
+    f = sys._getframe(2)
+    pagina = None
+    while f is not None:
+        modulo = f.f_globals.get("__name__", "")
+        if modulo.startswith(_PAQUETES_LLAMADOR):
+            return f"{modulo}.{f.f_code.co_name}"
+        if pagina is None and "/pages/" in f.f_code.co_filename.replace("\\", "/"):
+            pagina = f"{Path(f.f_code.co_filename).stem}:{f.f_lineno}"
+        f = f.f_back
+    return pagina or "?"
+
+
+# =================================================
+# CURSOR INSTRUMENTADO
+# =================================================
+class CursorInstrumentado(sqlite3.Cursor):
+    """
+    Cursor que agrega al registro del rerun cada sentencia que ejecuta.
+    Las filas y el tiempo de fetch se suman a la última sentencia.
+    """
+
+    _registro = None
+
+    def _medir(self, metodo, sql, parametros):
+        registro = {
+            "sql": normalizar_sql(sql),
+            "llamador": _llamador(),
+            "ms": 0.0,
+            "filas": 0,
+        }
+        t0 = time.perf_counter()
+        try:
+            resultado = metodo(sql, parametros)
+        finally:
+            registro["ms"] += (time.perf_counter() - t0) * 1000
+            lista = getattr(_estado, "registros", None)
+            if lista is not None:
+                lista.append(registro)
+        self._registro = registro
+        if self.description is None:
+            registro["filas"] = max(self.rowcount, 0)
+        return resultado
+
+    def execute(self, sql, parametros=()):
+        return self._medir(super().execute, sql, parametros)
+
+    def executemany(self, sql, parametros):
+        return self._medir(super().executemany, sql, parametros)
+
+    def _fetch(self, metodo, *args):
+        t0 = time.perf_counter()
+        filas = metodo(*args)
+        if self._registro is not None:
+            self._registro["ms"] += (time.perf_counter() - t0) * 1000
+            if isinstance(filas, list):
+                self._registro["filas"] += len(filas)
+            elif filas is not None:
+                self._registro["filas"] += 1
+        return filas
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        if size is None:
+            return self._fetch(super().fetchmany)
+        return self._fetch(super().fetchmany, size)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+    def __next__(self):
+        fila = self._fetch(super().fetchone)
+        if fila is None:
+            raise StopIteration
+        return fila
+
+
+# =================================================
+# RESUMEN
+# =================================================
+def resumen(registros_rerun: list, top: int = 10) -> list:
+    """
+    Agrupa por (SQL normalizado, llamador) y ordena por tiempo total.
+    """
+    grupos = defaultdict(lambda: {"veces": 0, "ms_total": 0.0, "ms_max": 0.0, "filas": 0})
+    for r in registros_rerun:
+        g = grupos[(r["sql"], r["llamador"])]
+        g["veces"] += 1
+        g["ms_total"] += r["ms"]
+        g["ms_max"] = max(g["ms_max"], r["ms"])
+        g["filas"] += r["filas"]
+
+    filas = [
+        {"llamador": llamador, "sql": sql, **datos}
+        for (sql, llamador), datos in grupos.items()
+    ]
+    filas.sort(key=lambda f: f["ms_total"], reverse=True)
+    return filas[:top]
+
+
+# =================================================
+# LOG ROTATIVO
+# =================================================
+_logger = None
+_lock_logger = threading.Lock()
+
+
+def _get_logger():
+    global _logger
+    if _logger is None:
+        with _lock_logger:
+            if _logger is None:
+                LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+                logger = logging.getLogger("bca.consultas_sql")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                handler = RotatingFileHandler(
+                    LOG_PATH,
+                    maxBytes=LOG_MAX_BYTES,
+                    backupCount=LOG_BACKUPS,
+                    encoding="utf-8",
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger.addHandler(handler)
+                _logger = logger
+    return _logger
+
+
+def _escribir_log(registros_rerun: list):
+    logger = _get_logger()
+    ts = time.strftime("%Y-%m-%d %H:%M:%S")
+    rerun = f"{threading.get_ident():x}-{time.monotonic_ns():x}"
+    for r in registros_rerun:
+        logger.info(json.dumps(
+            {"ts": ts, "rerun": rerun, **r, "ms": round(r["ms"], 3)},
+            ensure_ascii=False,
+        ))
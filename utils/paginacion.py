@@ -0,0 +1,48 @@
+# utils/paginacion.py
+#
+# Paginación por clave (keyset) para los listados largos.
+# En vez de OFFSET (que relee todas las filas anteriores) cada página
+# sigue desde la última clave vista: (fecha, id). El cursor viaja como un
+# token opaco (JSON en base64 url-safe) entre reruns.
+
+import base64
+import json
+
+TAMANO_PAGINA = 50
+TAMANO_MAXIMO = 200
+
+
+def codificar_cursor(*clave) -> str:
+    crudo = json.dumps(list(clave), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+
+def decodificar_cursor(token: str) -> list:
+    """
+    Token -> valores de la clave. ValueError si no es un cursor válido.
+    """
+    try:
+        crudo = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        clave = json.loads(crudo)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Cursor de paginación inválido: {token!r}") from e
+    if not isinstance(clave, list):
+        raise ValueError(f"Cursor de paginación inválido: {token!r}")
+    return clave
+
+
+def limitar_tamano(tamano) -> int:
+    return max(1, min(int(tamano or TAMANO_PAGINA), TAMANO_MAXIMO))
+
+
+def armar_pagina(filas: list, tamano: int, clave) -> dict:
+    """
+    `filas` trae tamano + 1 filas como máximo: la sobrante solo indica
+    que hay otra página. `clave(fila)` da los valores del cursor.
+    """
+    hay_mas = len(filas) > tamano
+    filas = filas[:tamano]
+    return {
+        "filas": filas,
+        "siguiente": codificar_cursor(*clave(filas[-1])) if hay_mas else None,
+    }
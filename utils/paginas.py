@@ -0,0 +1,36 @@
+# utils/paginas.py
+#
+# Paginación por cursor para las páginas (utils/paginacion.py): la pila
+# de tokens de las páginas visitadas queda en session_state, así
+# "Anterior" vuelve sin recalcular nada.
+
+import streamlit as st
+
+from utils.panel_consultas import recargar
+
+
+def cursor_actual(clave: str, filtros: tuple):
+    """
+    Token de la página que se está mirando. Si cambian los filtros se
+    vuelve a la primera.
+    """
+    estado = st.session_state.get(clave)
+    if not estado or estado["filtros"] != filtros:
+        estado = st.session_state[clave] = {"filtros": filtros, "pila": [None]}
+    return estado["pila"][-1]
+
+
+def navegacion(clave: str, siguiente):
+    """
+    Botones Anterior / Siguiente. siguiente: token de la próxima página
+    (None si es la última).
+    """
+    pila = st.session_state[clave]["pila"]
+    c_ant, c_pag, c_sig = st.columns([1, 2, 1])
+    if c_ant.button("⬅️ Anterior", key=f"{clave}_ant", disabled=len(pila) == 1):
+        pila.pop()
+        recargar()
+    c_pag.caption(f"Página {len(pila)}")
+    if c_sig.button("Siguiente ➡️", key=f"{clave}_sig", disabled=siguiente is None):
+        pila.append(siguiente)
+        recargar()
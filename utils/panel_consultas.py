@@ -0,0 +1,93 @@
+# utils/panel_consultas.py
+#
+# Panel de consultas SQL en el sidebar (solo administradores).
+# Uso en cada página, después del chequeo de login:
+#
+#   panel_consultas()          # arriba: activa el registro del rerun
+#   ...
+#   cerrar_panel_consultas()   # al final: muestra el top del rerun
+#
+# Entre medio, detener() / recargar() en lugar de st.stop() / st.rerun():
+# cortan el script, así que el cerrar_panel_consultas() del final no llega.
+
+import threading
+
+import streamlit as st
+
+from utils import instrumentacion
+
+ROLES_ADMIN = ("Administrador", "ADMIN")
+TOP_CONSULTAS = 10
+
+# Contenedor del sidebar reservado en este rerun (un rerun = un thread)
+_rerun = threading.local()
+
+
+def _es_admin() -> bool:
+    user = st.session_state.get("user") or {}
+    return user.get("rol") in ROLES_ADMIN
+
+
+def panel_consultas():
+    """
+    Toggle en el sidebar. Si está prendido, registra las consultas del rerun.
+    """
+    if not _es_admin():
+        return
+
+    activo = st.sidebar.toggle("🔎 Consultas SQL", key="panel_consultas_sql")
+    if not activo:
+        if instrumentacion.activa():
+            instrumentacion.terminar()
+        return
+
+    instrumentacion.iniciar()
+    _rerun.lugar = st.sidebar.container()
+
+
+def cerrar_panel_consultas():
+    """
+    Cierra el registro del rerun y muestra las consultas más lentas.
+    """
+    lugar = getattr(_rerun, "lugar", None)
+    _rerun.lugar = None
+    if lugar is None or not instrumentacion.activa():
+        return
+
+    registros = instrumentacion.terminar()
+    total_ms = sum(r["ms"] for r in registros)
+
+    with lugar:
+        st.caption(f"{len(registros)} consultas · {total_ms:.1f} ms")
+        st.dataframe(
+            [
+                {
+                    "ms": round(r["ms_total"], 2),
+                    "veces": r["veces"],
+                    "filas": r["filas"],
+                    "origen": r["llamador"],
+                    "sql": r["sql"],
+                }
+                for r in instrumentacion.resumen(registros, TOP_CONSULTAS)
+            ],
+            use_container_width=True,
+            hide_index=True,
+        )
+
+
+def detener():
+    """
+    st.stop() mostrando antes el panel del rerun.
+    """
+    cerrar_panel_consultas()
+    st.stop()
+
+
+def recargar():
+    """
+    st.rerun() cerrando antes el registro (el rerun nuevo abre el suyo).
+    """
+    _rerun.lugar = None
+    if instrumentacion.activa():
+        instrumentacion.terminar()
+    st.rerun()
@@ -1,238 +1,934 @@
-def init_db(conn):
-    cur = conn.cursor()
-    cur.execute("PRAGMA foreign_keys = ON;")
+# utils/schema.py
+#
+# Motor de migraciones versionado.
+# La versión aplicada se guarda en PRAGMA user_version: cada base
+# (nueva, vieja o con alguno de los esquemas históricos) se lleva una
+# sola vez al esquema canónico y después no se vuelve a inspeccionar.
+
+from utils.fechas import a_fecha_iso, a_ts_iso
+
+# =================================================
+# ESQUEMA CANÓNICO
+# =================================================
+# tabla -> ((columna, declaración), ...)
+TABLAS = {
+    "choferes": (
+        ("id_chofer", "TEXT PRIMARY KEY"),
+        ("nombre", "TEXT NOT NULL"),
+        ("id_tractor", "TEXT"),
+        ("activo", "INTEGER DEFAULT 1"),
+        ("transporte", "TEXT"),
+        ("tipo_flota", "TEXT DEFAULT 'PROPIA'"),
+    ),
+    "tractores": (
+        ("id_tractor", "TEXT PRIMARY KEY"),
+        ("patente", "TEXT NOT NULL"),
+        ("activo", "INTEGER DEFAULT 1"),
+        ("tipo_flota", "TEXT DEFAULT 'PROPIA'"),
+        ("estado", "TEXT DEFAULT 'OPERATIVO'"),
+    ),
+    "materiales": (
+        ("id_material", "TEXT PRIMARY KEY"),
+        ("material", "TEXT NOT NULL"),
+        ("activo", "INTEGER DEFAULT 1"),
+    ),
+    "clientes": (
+        ("id_cliente", "TEXT PRIMARY KEY"),
+        ("cliente", "TEXT NOT NULL"),
+        ("activo", "INTEGER DEFAULT 1"),
+    ),
+    "origenes": (
+        ("id_origen", "TEXT PRIMARY KEY"),
+        ("origen", "TEXT NOT NULL"),
+        ("activo", "INTEGER DEFAULT 1"),
+        ("created_at", "TEXT DEFAULT CURRENT_TIMESTAMP"),
+    ),
+    "destinos": (
+        ("id_destino", "TEXT PRIMARY KEY"),
+        ("destino", "TEXT NOT NULL"),
+        ("activo", "INTEGER DEFAULT 1"),
+        ("created_at", "TEXT DEFAULT CURRENT_TIMESTAMP"),
+    ),
+    "meta": (
+        ("key", "TEXT PRIMARY KEY"),
+        ("value", "TEXT"),
+    ),
+    "plantillas": (
+        ("id", "INTEGER PRIMARY KEY AUTOINCREMENT"),
+        ("nombre", "TEXT NOT NULL UNIQUE"),
+        ("id_material", "TEXT NOT NULL"),
+        ("id_cliente", "TEXT"),
+        ("id_origen", "TEXT"),
+        ("id_destino", "TEXT"),
+        ("observacion", "TEXT"),
+        ("activo", "INTEGER DEFAULT 1"),
+    ),
+    "programacion_semanal": (
+        ("id_programacion", "TEXT PRIMARY KEY"),
+        ("semana", "TEXT NOT NULL"),
+        ("estado", "TEXT NOT NULL"),
+        ("creado_por", "TEXT"),
+        ("creado_en", "TEXT DEFAULT CURRENT_TIMESTAMP"),
+        ("confirmada_por", "TEXT"),
+        ("confirmada_at", "TEXT"),
+    ),
+    "lineas_dia": (
+        ("id", "INTEGER PRIMARY KEY AUTOINCREMENT"),
+        ("fecha", "TEXT"),
+        ("id_chofer", "TEXT"),
+        ("id_tractor", "TEXT"),
+        ("id_material", "TEXT"),
+        ("origen_linea", "TEXT"),   # PROGRAMACION | FUERA_DE_PLAN
+        ("estado", "TEXT"),         # PENDIENTE | CONFIRMADO | CANCELADO | GENERADO
+        ("creado_por", "TEXT"),
+    ),
+    "viajes": (
+        ("id", "INTEGER PRIMARY KEY AUTOINCREMENT"),
+        ("linea_id", "INTEGER"),
+        ("fecha", "TEXT"),
+        ("id_chofer", "TEXT"),
+        ("id_tractor", "TEXT"),
+        ("id_material", "TEXT"),
+        ("id_cliente", "TEXT"),
+        ("id_origen", "TEXT"),
+        ("id_destino", "TEXT"),
+        ("origen_viaje", "TEXT"),   # PROGRAMACION | FUERA_DE_PLAN
+        ("estado", "TEXT"),
+        ("creado_por", "TEXT"),
+        ("id_plantilla", "INTEGER"),
+        ("id_viaje", "TEXT"),       # UUID del viaje
+    ),
+    "eventos_viaje": (
+        ("id_evento", "INTEGER PRIMARY KEY AUTOINCREMENT"),
+        ("viaje_id", "INTEGER NOT NULL"),
+        ("tipo", "TEXT NOT NULL"),
+        ("inicio_ts", "TIMESTAMP NOT NULL"),
+        ("fin_ts", "TIMESTAMP NOT NULL"),
+        ("observacion", "TEXT"),
+        ("creado_por", "TEXT"),
+        ("creado_en", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+    ),
+    "eventos_recursos": (
+        ("id", "INTEGER PRIMARY KEY AUTOINCREMENT"),
+        ("tipo", "TEXT"),           # MANTENIMIENTO_CORRECTIVO | ...
+        ("sub_tipo", "TEXT"),
+        ("id_chofer", "TEXT"),
+        ("id_tractor", "TEXT"),
+        ("fecha_inicio", "TEXT"),
+        ("fecha_fin", "TEXT"),
+        ("creado_por", "TEXT"),
+        ("observacion", "TEXT"),
+    ),
+    "eventos": (
+        ("id", "INTEGER PRIMARY KEY AUTOINCREMENT"),
+        ("tipo", "TEXT NOT NULL"),          # FRANCO | MANTENIMIENTO | TALLER | ...
+        ("recurso_tipo", "TEXT NOT NULL"),  # CHOFER | TRACTOR
+        ("recurso_id", "INTEGER NOT NULL"),
+        ("fecha_inicio", "TEXT NOT NULL"),
+        ("fecha_fin", "TEXT NOT NULL"),
+        ("observacion", "TEXT"),
+        ("creado_por", "TEXT"),
+    ),
+}
+
+# Nombres de los esquemas históricos (utils/schema.py y
+# services/db_init.py viejos) -> nombre canónico.
+RENOMBRES = {
+    "lineas_dia": {
+        "id_linea": "id",
+        "chofer_id": "id_chofer",
+        "tractor_id": "id_tractor",
+        "material_id": "id_material",
+    },
+    "viajes": {
+        "nro_viaje": "id",
+        "id_linea": "linea_id",
+        "chofer_id": "id_chofer",
+        "tractor_id": "id_tractor",
+        "material_id": "id_material",
+        "cliente_id": "id_cliente",
+        "origen_id": "id_origen",
+        "destino_id": "id_destino",
+    },
+    "eventos_viaje": {
+        "id_viaje": "viaje_id",
+    },
+    "eventos_recursos": {
+        "id_evento": "id",
+        "chofer_id": "id_chofer",
+        "tractor_id": "id_tractor",
+    },
+}
+
+# Columnas canónicas sin equivalente directo en el esquema viejo.
+EXPRESIONES = {
+    "eventos_viaje": {
+        "inicio_ts": "COALESCE(creado_en, CURRENT_TIMESTAMP)",
+        "fin_ts": (
+            "datetime(COALESCE(creado_en, CURRENT_TIMESTAMP), "
+            "'+' || COALESCE(duracion_min, 0) || ' minutes')"
+        ),
+    },
+}
+
+
+# =================================================
+# ÍNDICES ADMINISTRADOS
+# =================================================
+# nombre -> definición. Cubren los accesos calientes de services/ y
+# modules/; test_indices.py verifica con EXPLAIN QUERY PLAN que ninguna
+# de esas consultas recorra la tabla completa.
+# La migración 2 crea este diccionario en cada base nueva: no agregarle
+# índices; uno nuevo va explícito en su propia migración.
+INDICES = {
+    # lineas_dia: semana/día por origen y estado, pendientes por fecha
+    "idx_lineas_dia_fecha_origen": "lineas_dia(fecha, origen_linea, estado, id_chofer)",
+    "idx_lineas_dia_estado_fecha": "lineas_dia(estado, fecha, id)",
+    "idx_lineas_dia_chofer_fecha": "lineas_dia(id_chofer, fecha)",
+
+    # viajes: histórico por fecha, línea de origen, chofer y estado
+    "idx_viajes_fecha_id": "viajes(fecha, id)",
+    "idx_viajes_linea": "viajes(linea_id)",
+    "idx_viajes_chofer_fecha": "viajes(id_chofer, fecha)",
+    "idx_viajes_estado_fecha": "viajes(estado, fecha)",
+
+    # eventos (francos / taller): por recurso y por tipo + rango
+    "idx_eventos_recurso": "eventos(recurso_tipo, recurso_id, tipo, fecha_inicio, fecha_fin)",
+    "idx_eventos_tipo_fechas": "eventos(tipo, fecha_inicio, fecha_fin, recurso_tipo, recurso_id)",
+
+    # eventos_viaje: demoras de un viaje y vistas por tipo
+    "idx_eventos_viaje_viaje": "eventos_viaje(viaje_id, tipo, inicio_ts, fin_ts)",
+    "idx_eventos_viaje_tipo": "eventos_viaje(tipo, inicio_ts)",
+
+    # eventos_recursos: mantenimiento abierto por tractor
+    "idx_eventos_recursos_tipo": "eventos_recursos(tipo, fecha_fin, id_tractor)",
+    "idx_eventos_recursos_tractor": "eventos_recursos(id_tractor, tipo)",
+}
+
+
+# =================================================
+# FECHAS CANÓNICAS
+# =================================================
+# tabla -> {columna: "fecha" | "ts"}. Se guardan como texto ISO
+# ('YYYY-MM-DD' / 'YYYY-MM-DD HH:MM:SS', ver utils/fechas.py) para que
+# los filtros sean rangos simples sobre los índices, sin DATE(col).
+# Triggers rechazan cualquier escritura en otro formato.
+COLUMNAS_FECHA = {
+    "lineas_dia": {"fecha": "fecha"},
+    "viajes": {"fecha": "fecha"},
+    "eventos": {"fecha_inicio": "fecha", "fecha_fin": "fecha"},
+    "eventos_recursos": {"fecha_inicio": "fecha", "fecha_fin": "fecha"},
+    "eventos_viaje": {"inicio_ts": "ts", "fin_ts": "ts", "creado_en": "ts"},
+}
+
+# Función SQLite que devuelve el mismo texto solo si ya es canónico.
+_FUNCION_FECHA = {"fecha": "date", "ts": "datetime"}
+
+
+# =================================================
+# DISPONIBILIDAD DIARIA (MANTENIDA POR TRIGGERS)
+# =================================================
+# calendario: un día por fila, para expandir intervalos dentro de los
+# triggers (SQLite no admite WITH RECURSIVE en un trigger).
+# disponibilidad_diaria: una fila por recurso, día y evento que lo deja
+# NO_DISPONIBLE (los que no figuran están disponibles). Se mantiene desde
+# `eventos` y desde el taller de `eventos_recursos` con el mismo criterio
+# que services/intervalos.py; `tabla_evento` dice de cuál de las dos viene
+# `evento_id` (los ids de una y otra se repiten).
+CALENDARIO_DESDE = "2020-01-01"
+CALENDARIO_HASTA = "2045-12-31"
 
-    # =========================
-    # MAESTROS
-    # =========================
+TIPOS_TALLER = ("MANTENIMIENTO", "TALLER", "MANTENIMIENTO_CORRECTIVO")
+
+_TIPOS_TALLER_SQL = ", ".join(f"'{t}'" for t in TIPOS_TALLER)
+
+# Condición sobre una fila de eventos (alias {e}) que bloquea un recurso
+_CONDICION_BLOQUEO = (
+    "(({e}.tipo = 'FRANCO' AND {e}.recurso_tipo = 'CHOFER') OR "
+    f"({{e}}.tipo IN ({_TIPOS_TALLER_SQL}) AND {{e}}.recurso_tipo = 'TRACTOR'))"
+)
+
+_INSERTAR_BLOQUEO = """
+    INSERT OR IGNORE INTO disponibilidad_diaria
+        (fecha, recurso_tipo, recurso_id, tabla_evento, evento_id, estado, motivo)
+    SELECT
+        c.fecha, {e}.recurso_tipo, {e}.recurso_id, 'eventos', {e}.id, 'NO_DISPONIBLE',
+        CASE WHEN {e}.tipo = 'FRANCO' THEN 'FRANCO' ELSE 'TALLER' END
+    FROM calendario c
+    WHERE c.fecha BETWEEN {e}.fecha_inicio AND {e}.fecha_fin
+"""
+
+# Lo mismo para una fila de eventos_recursos (alias {e}): solo taller de
+# tractores; sin fecha_fin el mantenimiento sigue abierto y bloquea hasta
+# el final del calendario.
+_CONDICION_TALLER_RECURSOS = (
+    f"({{e}}.tipo IN ({_TIPOS_TALLER_SQL}) "
+    "AND {e}.id_tractor IS NOT NULL AND {e}.fecha_inicio IS NOT NULL)"
+)
+
+_INSERTAR_TALLER_RECURSOS = f"""
+    INSERT OR IGNORE INTO disponibilidad_diaria
+        (fecha, recurso_tipo, recurso_id, tabla_evento, evento_id, estado, motivo)
+    SELECT
+        c.fecha, 'TRACTOR', {{e}}.id_tractor, 'eventos_recursos', {{e}}.id,
+        'NO_DISPONIBLE', 'TALLER'
+    FROM calendario c
+    WHERE c.fecha BETWEEN {{e}}.fecha_inicio
+                      AND COALESCE({{e}}.fecha_fin, '{CALENDARIO_HASTA}')
+"""
+
+# (tabla, INSERT, condición) de cada fuente de bloqueos
+_FUENTES_BLOQUEO = (
+    ("eventos", _INSERTAR_BLOQUEO, _CONDICION_BLOQUEO),
+    ("eventos_recursos", _INSERTAR_TALLER_RECURSOS, _CONDICION_TALLER_RECURSOS),
+)
+
+
+def _crear_disponibilidad_diaria(cur):
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS choferes (
-        id_chofer TEXT PRIMARY KEY,
-        nombre TEXT NOT NULL,
-        transporte TEXT,
-        activo INTEGER NOT NULL DEFAULT 1
-    );
+        CREATE TABLE IF NOT EXISTS calendario (
+            fecha TEXT PRIMARY KEY
+        ) WITHOUT ROWID
     """)
+    cur.execute("""
+        WITH RECURSIVE dias(fecha) AS (
+            SELECT ?
+            UNION ALL
+            SELECT date(fecha, '+1 day') FROM dias WHERE fecha < ?
+        )
+        INSERT OR IGNORE INTO calendario (fecha) SELECT fecha FROM dias
+    """, (CALENDARIO_DESDE, CALENDARIO_HASTA))
 
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS tractores (
-        id_tractor TEXT PRIMARY KEY,
-        patente TEXT NOT NULL,
-        transporte TEXT,
-        activo INTEGER NOT NULL DEFAULT 1
-    );
+        CREATE TABLE IF NOT EXISTS disponibilidad_diaria (
+            fecha         TEXT NOT NULL,
+            recurso_tipo  TEXT NOT NULL,   -- CHOFER | TRACTOR
+            recurso_id    TEXT NOT NULL,
+            tabla_evento  TEXT NOT NULL,   -- eventos | eventos_recursos
+            evento_id     INTEGER NOT NULL,
+            estado        TEXT NOT NULL,   -- NO_DISPONIBLE
+            motivo        TEXT NOT NULL,   -- FRANCO | TALLER
+            PRIMARY KEY (fecha, recurso_tipo, recurso_id, tabla_evento, evento_id)
+        ) WITHOUT ROWID
     """)
-
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS materiales (
-        id_material TEXT PRIMARY KEY,
-        material TEXT NOT NULL UNIQUE,
-        activo INTEGER NOT NULL DEFAULT 1
-    );
+        CREATE INDEX IF NOT EXISTS idx_disponibilidad_diaria_evento
+        ON disponibilidad_diaria (tabla_evento, evento_id)
     """)
 
+    for tabla, insertar, condicion in _FUENTES_BLOQUEO:
+        borrar = (
+            "DELETE FROM disponibilidad_diaria "
+            f"WHERE tabla_evento = '{tabla}' AND evento_id = OLD.id;"
+        )
+        insertar_new = insertar.format(e="NEW").strip()
+        cuando_new = condicion.format(e="NEW")
+        cuando_old = condicion.format(e="OLD")
+        for nombre, cabecera, cuerpo in (
+            (
+                f"trg_{tabla}_disp_ins",
+                f"AFTER INSERT ON {tabla} WHEN {cuando_new}",
+                f"{insertar_new};",
+            ),
+            (
+                f"trg_{tabla}_disp_del",
+                f"AFTER DELETE ON {tabla} WHEN {cuando_old}",
+                borrar,
+            ),
+            (
+                # Cambio de fechas, tipo o recurso (o cierre del
+                # mantenimiento): se rehace el evento entero
+                f"trg_{tabla}_disp_upd",
+                f"AFTER UPDATE ON {tabla}",
+                f"{borrar}\n{insertar_new}\n AND {cuando_new};",
+            ),
+        ):
+            cur.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {nombre}
+                {cabecera}
+                BEGIN
+                    {cuerpo}
+                END
+            """)
+
+
+def reconstruir_disponibilidad_diaria(cur):
+    """
+    Vuelve a calcular disponibilidad_diaria completa desde `eventos` y
+    `eventos_recursos`.
+    """
+    cur.execute("DELETE FROM disponibilidad_diaria")
+    for tabla, insertar, condicion in _FUENTES_BLOQUEO:
+        cur.execute(
+            insertar.format(e="ev").replace(
+                "FROM calendario c",
+                f"FROM {tabla} ev JOIN calendario c",
+            ) + f" AND {condicion.format(e='ev')}"
+        )
+
+
+# =================================================
+# LÍNEAS DE PROGRAMACIÓN ÚNICAS
+# =================================================
+# Una sola línea PROGRAMACION por chofer y día: la garantiza el índice
+# único parcial aunque dos usuarios generen la misma semana a la vez.
+def _deduplicar_lineas_programacion(cur):
+    """
+    Deja una línea PROGRAMACION por (fecha, id_chofer): la que tiene
+    viajes, si no la CONFIRMADO, si no la más vieja. Las demás se borran;
+    si alguna ya tiene viajes no se borra, pasa a FUERA_DE_PLAN.
+
+    DESTRUCTIVO: las líneas borradas no se guardan en ningún lado (estado,
+    material y observaciones incluidos). Antes de migrar una base con
+    duplicados, hacer una copia del archivo.
+    """
+    cur.execute("""
+        CREATE TEMP TABLE _lineas_sobrantes AS
+        SELECT id, tiene_viajes
+        FROM (
+            SELECT
+                l.id,
+                EXISTS (SELECT 1 FROM viajes v WHERE v.linea_id = l.id) AS tiene_viajes,
+                ROW_NUMBER() OVER (
+                    PARTITION BY l.fecha, l.id_chofer
+                    ORDER BY
+                        EXISTS (SELECT 1 FROM viajes v WHERE v.linea_id = l.id) DESC,
+                        l.estado = 'CONFIRMADO' DESC,
+                        l.id
+                ) AS orden
+            FROM lineas_dia l
+            WHERE l.origen_linea = 'PROGRAMACION'
+        )
+        WHERE orden > 1
+    """)
+    cur.execute("""
+        DELETE FROM lineas_dia
+        WHERE id IN (SELECT id FROM _lineas_sobrantes WHERE NOT tiene_viajes)
+    """)
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS clientes (
-        id_cliente TEXT PRIMARY KEY,
-        cliente TEXT NOT NULL,
-        activo INTEGER NOT NULL DEFAULT 1
-    );
+        UPDATE lineas_dia
+        SET origen_linea = 'FUERA_DE_PLAN'
+        WHERE id IN (SELECT id FROM _lineas_sobrantes WHERE tiene_viajes)
     """)
+    cur.execute("DROP TABLE _lineas_sobrantes")
+
+
+# =================================================
+# VERSIONES DE DATOS (PARA CACHÉS)
+# =================================================
+# Un contador por tabla que suben los triggers en cada INSERT / UPDATE /
+# DELETE. Los cachés (exportaciones, vistas) guardan la versión con la
+# que armaron el resultado y lo descartan cuando cambia.
+TABLAS_VERSIONADAS = (
+    "choferes", "tractores", "materiales", "clientes", "origenes",
+    "destinos", "plantillas", "lineas_dia", "viajes", "eventos_viaje",
+    "eventos", "eventos_recursos",
+)
 
+
+def _crear_versiones_tabla(cur):
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS origenes (
-        id_origen TEXT PRIMARY KEY,
-        origen TEXT NOT NULL UNIQUE,
-        activo INTEGER NOT NULL DEFAULT 1
-    );
+        CREATE TABLE IF NOT EXISTS versiones_tabla (
+            tabla    TEXT PRIMARY KEY,
+            version  INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
     """)
+    for tabla in TABLAS_VERSIONADAS:
+        cur.execute(
+            "INSERT OR IGNORE INTO versiones_tabla (tabla, version) VALUES (?, 0)",
+            (tabla,),
+        )
+        for operacion in ("INSERT", "UPDATE", "DELETE"):
+            cur.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{tabla}_version_{operacion.lower()}
+                AFTER {operacion} ON {tabla}
+                BEGIN
+                    UPDATE versiones_tabla
+                    SET version = version + 1
+                    WHERE tabla = '{tabla}';
+                END
+            """)
+
+
+# Versión por semana (lunes ISO) de las tablas que muestra la agenda:
+# cada escritura en lineas_dia / viajes incrementa solo la semana de la
+# fila (vieja y nueva en un UPDATE que la mueve de fecha).
+TABLAS_VERSION_SEMANA = ("lineas_dia", "viajes")
+
 
+def _crear_versiones_semana(cur):
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS destinos (
-        id_destino TEXT PRIMARY KEY,
-        destino TEXT NOT NULL UNIQUE,
-        activo INTEGER NOT NULL DEFAULT 1
-    );
+        CREATE TABLE IF NOT EXISTS versiones_semana (
+            lunes    TEXT PRIMARY KEY,
+            version  INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
     """)
 
-    # =========================
-    # PLANTILLAS DE VIAJE
-    # =========================
+    def incrementar(fila):
+        return f"""
+            INSERT INTO versiones_semana (lunes, version)
+            SELECT date({fila}.fecha, '-6 days', 'weekday 1'), 1
+            WHERE date({fila}.fecha) IS NOT NULL
+            ON CONFLICT (lunes) DO UPDATE SET version = version + 1;
+        """
+
+    for tabla in TABLAS_VERSION_SEMANA:
+        for operacion, filas in (
+            ("INSERT", ("NEW",)),
+            ("UPDATE", ("OLD", "NEW")),
+            ("DELETE", ("OLD",)),
+        ):
+            cur.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{tabla}_semana_{operacion.lower()}
+                AFTER {operacion} ON {tabla}
+                BEGIN
+                    {"".join(incrementar(f) for f in filas)}
+                END
+            """)
+
+
+# =================================================
+# HORAS DE EVENTOS POR DÍA (CUBO)
+# =================================================
+# eventos_viaje agregados por (día de inicio, tipo, chofer, tractor,
+# cliente). Los KPIs y pivots suman sobre esta tabla en vez de recorrer
+# los eventos. Las dimensiones sin valor se guardan como '' (clave
+# primaria sin NULL): NULL y '' caen en la misma fila.
+#
+# Los triggers aplican deltas: cada evento suma (o resta) 1 y sus minutos
+# en su propia clave, y las filas que quedan en 0 eventos se borran. Si un
+# viaje cambia de chofer, tractor o cliente, o se borra, sus eventos se
+# restan de la clave vieja (y se suman a la nueva).
+_DIMENSIONES_VIAJE = (
+    "COALESCE({v}.id_chofer, ''), "
+    "COALESCE({v}.id_tractor, ''), "
+    "COALESCE({v}.id_cliente, '')"
+)
+
+_MINUTOS_EVENTO = "(JULIANDAY({e}.fin_ts) - JULIANDAY({e}.inicio_ts)) * 1440"
+
+_SUMAR_HORAS = """
+    INSERT INTO eventos_horas_dia
+        (fecha, tipo, id_chofer, id_tractor, id_cliente, eventos, minutos)
+    {select}
+    ON CONFLICT (fecha, tipo, id_chofer, id_tractor, id_cliente) DO UPDATE SET
+        eventos = eventos + excluded.eventos,
+        minutos = minutos + excluded.minutos
+"""
+
+
+def _delta_evento(e: str, signo: str) -> str:
+    """
+    Suma (signo '+') o resta ('-') el evento {e} (NEW / OLD) en su clave.
+    Un evento sin viaje no cuenta, igual que en la reconstrucción.
+    """
+    return _SUMAR_HORAS.format(select=f"""
+        SELECT
+            date({e}.inicio_ts), {e}.tipo, {_DIMENSIONES_VIAJE.format(v="v")},
+            {signo}1, {signo}{_MINUTOS_EVENTO.format(e=e)}
+        FROM viajes v
+        WHERE v.id = {e}.viaje_id
+          AND date({e}.inicio_ts) IS NOT NULL
+    """)
+
+
+def _delta_viaje(v: str, signo: str) -> str:
+    """
+    Suma o resta todos los eventos del viaje {v} con sus dimensiones.
+    """
+    return _SUMAR_HORAS.format(select=f"""
+        SELECT
+            date(e.inicio_ts), e.tipo, {_DIMENSIONES_VIAJE.format(v=v)},
+            {signo}COUNT(*), {signo}SUM({_MINUTOS_EVENTO.format(e="e")})
+        FROM eventos_viaje e
+        WHERE e.viaje_id = {v}.id
+          AND date(e.inicio_ts) IS NOT NULL
+        GROUP BY date(e.inicio_ts), e.tipo
+    """)
+
+
+def _crear_eventos_horas_dia(cur):
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS plantillas_viaje (
-        id_plantilla TEXT PRIMARY KEY,
-        nombre TEXT NOT NULL UNIQUE,
-        material_id TEXT NOT NULL,
-        cliente_id TEXT NOT NULL,
-        origen_id TEXT NOT NULL,
-        destino_id TEXT NOT NULL,
-        observacion TEXT,
-        activo INTEGER NOT NULL DEFAULT 1,
-        creado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-
-        FOREIGN KEY (material_id) REFERENCES materiales(id_material),
-        FOREIGN KEY (cliente_id) REFERENCES clientes(id_cliente),
-        FOREIGN KEY (origen_id) REFERENCES origenes(id_origen),
-        FOREIGN KEY (destino_id) REFERENCES destinos(id_destino)
-    );
-    """)
-
-    # =========================
-    # VIAJES
-    # =========================
+        CREATE TABLE IF NOT EXISTS eventos_horas_dia (
+            fecha       TEXT NOT NULL,
+            tipo        TEXT NOT NULL,
+            id_chofer   TEXT NOT NULL,
+            id_tractor  TEXT NOT NULL,
+            id_cliente  TEXT NOT NULL,
+            eventos     INTEGER NOT NULL,
+            minutos     REAL NOT NULL,
+            PRIMARY KEY (fecha, tipo, id_chofer, id_tractor, id_cliente)
+        ) WITHOUT ROWID
+    """)
+
+    vacias_evento = """
+        DELETE FROM eventos_horas_dia
+        WHERE fecha = date({e}.inicio_ts)
+          AND tipo = {e}.tipo
+          AND eventos <= 0
+    """
+    vacias_viaje = """
+        DELETE FROM eventos_horas_dia
+        WHERE fecha IN (
+                SELECT date(inicio_ts) FROM eventos_viaje WHERE viaje_id = {v}.id
+              )
+          AND eventos <= 0
+    """
+    for nombre, cabecera, pasos in (
+        ("trg_eventos_viaje_horas_ins", "AFTER INSERT ON eventos_viaje",
+         (_delta_evento("NEW", "+"),)),
+        ("trg_eventos_viaje_horas_del", "AFTER DELETE ON eventos_viaje",
+         (_delta_evento("OLD", "-"), vacias_evento.format(e="OLD"))),
+        ("trg_eventos_viaje_horas_upd", "AFTER UPDATE ON eventos_viaje",
+         (_delta_evento("OLD", "-"), _delta_evento("NEW", "+"),
+          vacias_evento.format(e="OLD"))),
+        ("trg_viajes_horas_upd",
+         "AFTER UPDATE OF id_chofer, id_tractor, id_cliente ON viajes "
+         "WHEN OLD.id_chofer IS NOT NEW.id_chofer "
+         "OR OLD.id_tractor IS NOT NEW.id_tractor "
+         "OR OLD.id_cliente IS NOT NEW.id_cliente",
+         (_delta_viaje("OLD", "-"), _delta_viaje("NEW", "+"),
+          vacias_viaje.format(v="OLD"))),
+        ("trg_viajes_horas_del", "AFTER DELETE ON viajes",
+         (_delta_viaje("OLD", "-"), vacias_viaje.format(v="OLD"))),
+    ):
+        cuerpo = ";\n".join(p.strip() for p in pasos)
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {nombre}
+            {cabecera}
+            BEGIN
+                {cuerpo};
+            END
+        """)
+
+
+def reconstruir_eventos_horas_dia(cur):
+    """
+    Vuelve a calcular eventos_horas_dia completa desde eventos_viaje.
+    """
+    cur.execute("DELETE FROM eventos_horas_dia")
+    cur.execute(f"""
+        INSERT INTO eventos_horas_dia
+            (fecha, tipo, id_chofer, id_tractor, id_cliente, eventos, minutos)
+        SELECT
+            date(e.inicio_ts), e.tipo, {_DIMENSIONES_VIAJE.format(v="v")},
+            COUNT(*), SUM({_MINUTOS_EVENTO.format(e="e")})
+        FROM eventos_viaje e
+        JOIN viajes v ON v.id = e.viaje_id
+        WHERE date(e.inicio_ts) IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5
+    """)
+
+
+# =================================================
+# DESCRIPTOR (CACHEADO)
+# =================================================
+_COLUMNAS = {
+    tabla: tuple(nombre for nombre, _ in columnas)
+    for tabla, columnas in TABLAS.items()
+}
+
+
+def columnas(tabla: str) -> tuple:
+    """
+    Columnas canónicas de una tabla. No consulta la base:
+    después de migrar(), el esquema real es el canónico.
+    """
+    return _COLUMNAS[tabla]
+
+
+def tiene_columna(tabla: str, columna: str) -> bool:
+    return columna in _COLUMNAS.get(tabla, ())
+
+
+# =================================================
+# HELPERS DE MIGRACIÓN
+# =================================================
+def _create_sql(tabla: str, nombre: str | None = None, extras=()) -> str:
+    defs = [f"{col} {decl}" for col, decl in TABLAS[tabla]]
+    defs.extend(f"{col} {tipo}".strip() for col, tipo in extras)
+    return f"CREATE TABLE {nombre or tabla} (\n    " + ",\n    ".join(defs) + "\n)"
+
+
+def _columnas_reales(cur, tabla: str) -> dict:
+    cur.execute(f"PRAGMA table_info({tabla})")
+    return {r[1]: r[2] for r in cur.fetchall()}
+
+
+def _se_puede_agregar(decl: str) -> bool:
+    d = decl.upper()
+    if "PRIMARY KEY" in d or "UNIQUE" in d:
+        return False
+    if "NOT NULL" in d and "DEFAULT" not in d:
+        return False
+    return True
+
+
+def _reconstruir(cur, tabla: str, reales: dict):
+    """
+    Reescribe la tabla con el esquema canónico copiando los datos.
+    Las columnas que el esquema canónico no conoce se conservan al final.
+    """
+    renombres = RENOMBRES.get(tabla, {})
+    expresiones = EXPRESIONES.get(tabla, {})
+    canonicas = dict(TABLAS[tabla])
+    origen_de = {nuevo: viejo for viejo, nuevo in renombres.items() if viejo in reales}
+
+    destino, origen = [], []
+    for col, decl in TABLAS[tabla]:
+        if col in reales:
+            fuente = col
+        elif col in origen_de:
+            fuente = origen_de[col]
+        elif col in expresiones:
+            destino.append(col)
+            origen.append(expresiones[col])
+            continue
+        else:
+            continue
+
+        if "INTEGER PRIMARY KEY" in decl.upper():
+            # PK histórica en TEXT: solo se conserva si es numérica.
+            fuente = f"CASE WHEN CAST({fuente} AS INTEGER) = {fuente} THEN {fuente} END"
+        destino.append(col)
+        origen.append(fuente)
+
+    extras = [
+        (col, tipo) for col, tipo in reales.items()
+        if col not in canonicas and col not in renombres
+    ]
+    destino.extend(col for col, _ in extras)
+    origen.extend(col for col, _ in extras)
+
+    tmp = f"_migrando_{tabla}"
+    cur.execute(f"DROP TABLE IF EXISTS {tmp}")
+    cur.execute(_create_sql(tabla, tmp, extras))
+    cur.execute(
+        f"INSERT INTO {tmp} ({', '.join(destino)}) "
+        f"SELECT {', '.join(origen)} FROM {tabla}"
+    )
+    cur.execute(f"DROP TABLE {tabla}")
+    cur.execute(f"ALTER TABLE {tmp} RENAME TO {tabla}")
+
+
+def _crear_indices(cur):
+    for nombre, definicion in INDICES.items():
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON {definicion}")
+
+
+def _normalizar_fechas(cur):
+    """
+    Reescribe en formato canónico las fechas que no lo están.
+    Falla si encuentra un valor que no se puede interpretar.
+    """
+    for tabla, cols in COLUMNAS_FECHA.items():
+        for col, tipo in cols.items():
+            funcion = _FUNCION_FECHA[tipo]
+            convertir = a_fecha_iso if tipo == "fecha" else a_ts_iso
+            cur.execute(
+                f"SELECT rowid, {col} FROM {tabla} "
+                f"WHERE {col} IS NOT NULL AND {funcion}({col}) IS NOT {col}"
+            )
+            cambios = []
+            for rowid, valor in cur.fetchall():
+                try:
+                    cambios.append((convertir(valor), rowid))
+                except ValueError:
+                    raise ValueError(
+                        f"{tabla}.{col} (rowid {rowid}): fecha no reconocida {valor!r}"
+                    ) from None
+            cur.executemany(
+                f"UPDATE {tabla} SET {col} = ? WHERE rowid = ?", cambios
+            )
+
+
+def _crear_triggers_fecha(cur):
+    for tabla, cols in COLUMNAS_FECHA.items():
+        for col, tipo in cols.items():
+            funcion = _FUNCION_FECHA[tipo]
+            for evento, sufijo in (("INSERT", "ins"), (f"UPDATE OF {col}", "upd")):
+                cur.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{tabla}_{col}_iso_{sufijo}
+                    BEFORE {evento} ON {tabla}
+                    WHEN NEW.{col} IS NOT NULL
+                     AND {funcion}(NEW.{col}) IS NOT NEW.{col}
+                    BEGIN
+                        SELECT RAISE(ABORT, '{tabla}.{col}: formato de fecha no canónico');
+                    END
+                """)
+
+
+# =================================================
+# MIGRACIONES
+# =================================================
+def _m001_esquema_canonico(cur):
+    """
+    Unifica los cuatro init_db históricos en el esquema canónico.
+    """
+    for tabla, definicion in TABLAS.items():
+        reales = _columnas_reales(cur, tabla)
+
+        if not reales:
+            cur.execute(_create_sql(tabla))
+            continue
+
+        pk = definicion[0][0]
+        viejas = set(RENOMBRES.get(tabla, {})) & set(reales)
+
+        if viejas or pk not in reales:
+            _reconstruir(cur, tabla, reales)
+            continue
+
+        for col, decl in definicion:
+            if col in reales:
+                continue
+            if not _se_puede_agregar(decl):
+                _reconstruir(cur, tabla, reales)
+                break
+            cur.execute(f"ALTER TABLE {tabla} ADD COLUMN {col} {decl}")
+
+
+def _m002_indices(cur):
+    _crear_indices(cur)
+
+
+def _m003_fechas_iso(cur):
+    _normalizar_fechas(cur)
+    _crear_triggers_fecha(cur)
+
+
+def _m004_disponibilidad_diaria(cur):
+    _crear_disponibilidad_diaria(cur)
+    reconstruir_disponibilidad_diaria(cur)
+
+
+def _m005_lineas_programacion_unicas(cur):
+    # Borra duplicados sin respaldo (ver _deduplicar_lineas_programacion)
+    _deduplicar_lineas_programacion(cur)
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS viajes (
-        id_viaje TEXT PRIMARY KEY,
-        nro_viaje INTEGER UNIQUE,
-        fecha TEXT NOT NULL,
-
-        chofer_id TEXT,
-        tractor_id TEXT,
-        cliente_id TEXT,
-        material_id TEXT,
-        origen_id TEXT,
-        destino_id TEXT,
-        id_plantilla TEXT,
-
-        estado TEXT NOT NULL DEFAULT 'CONFIRMADO',
-
-        FOREIGN KEY (chofer_id) REFERENCES choferes(id_chofer),
-        FOREIGN KEY (tractor_id) REFERENCES tractores(id_tractor),
-        FOREIGN KEY (cliente_id) REFERENCES clientes(id_cliente),
-        FOREIGN KEY (material_id) REFERENCES materiales(id_material),
-        FOREIGN KEY (origen_id) REFERENCES origenes(id_origen),
-        FOREIGN KEY (destino_id) REFERENCES destinos(id_destino),
-        FOREIGN KEY (id_plantilla) REFERENCES plantillas_viaje(id_plantilla)
-    );
-    """)
-
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_viajes_fecha ON viajes(fecha);")
-
-    # =========================
-    # EVENTOS DE VIAJE (DEMORAS)
-    # =========================
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_lineas_dia_programacion
+        ON lineas_dia (fecha, id_chofer)
+        WHERE origen_linea = 'PROGRAMACION'
+    """)
+
+
+def _m006_secuencias(cur):
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS eventos_viaje (
-    id_evento INTEGER PRIMARY KEY AUTOINCREMENT,
-    viaje_id TEXT NOT NULL,
-    tipo TEXT NOT NULL,
-    inicio_ts TEXT NOT NULL,
-    fin_ts TEXT NOT NULL,
-    observacion TEXT,
-    creado_por TEXT,
-    creado_en TEXT DEFAULT CURRENT_TIMESTAMP
-);
-
-    """)
-
-    # =========================
-    # EVENTOS DE RECURSOS (FRANCO / TALLER)
-    # =========================
+        CREATE TABLE IF NOT EXISTS secuencias (
+            nombre   TEXT PRIMARY KEY,
+            proximo  INTEGER NOT NULL
+        )
+    """)
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS eventos_recursos (
-        id_evento TEXT PRIMARY KEY,
-        tipo TEXT NOT NULL,
-        chofer_id TEXT,
-        tractor_id TEXT,
-        fecha_inicio DATE NOT NULL,
-        fecha_fin DATE NOT NULL,
-        observacion TEXT,
-        creado_por TEXT,
-        creado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-
-        FOREIGN KEY (chofer_id) REFERENCES choferes(id_chofer),
-        FOREIGN KEY (tractor_id) REFERENCES tractores(id_tractor)
-    );
-    """)
-
-    # =========================
-    # PROGRAMACIÓN
-    # =========================
+        INSERT OR IGNORE INTO secuencias (nombre, proximo)
+        SELECT 'viajes', COALESCE(MAX(id), 0) + 1 FROM viajes
+    """)
+    if "id_viaje" not in _columnas_reales(cur, "viajes"):
+        cur.execute("ALTER TABLE viajes ADD COLUMN id_viaje TEXT")
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS programacion_semanal (
-        id_programacion INTEGER PRIMARY KEY AUTOINCREMENT,
-        semana TEXT NOT NULL UNIQUE,
-        estado TEXT NOT NULL DEFAULT 'BORRADOR',
-        confirmada_por TEXT,
-        confirmada_at TEXT
-    );
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_viajes_id_viaje
+        ON viajes (id_viaje)
     """)
 
+
+def _m007_versiones_tabla(cur):
+    _crear_versiones_tabla(cur)
+
+
+def _m008_versiones_semana(cur):
+    _crear_versiones_semana(cur)
+
+
+def _m009_indice_eventos_viaje_inicio(cur):
+    # Vista global de eventos por rango de inicio (services/eventos_globales.py)
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS programacion_diaria (
-        id_linea INTEGER PRIMARY KEY AUTOINCREMENT,
-        id_programacion INTEGER NOT NULL,
-        fecha TEXT NOT NULL,
-        chofer_id TEXT NOT NULL,
-        material_id TEXT NOT NULL,
-        estado TEXT NOT NULL DEFAULT 'PROGRAMADO',
-
-        FOREIGN KEY (id_programacion) REFERENCES programacion_semanal(id_programacion),
-        FOREIGN KEY (chofer_id) REFERENCES choferes(id_chofer),
-        FOREIGN KEY (material_id) REFERENCES materiales(id_material)
-    );
-    """)
-
-    # =========================
-    # DÍA OPERATIVO
-    # =========================
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS lineas_dia (
-        id_linea INTEGER PRIMARY KEY AUTOINCREMENT,
-        fecha TEXT NOT NULL,
-        chofer_id TEXT,
-        tractor_id TEXT,
-        material_id TEXT,
-        estado TEXT NOT NULL DEFAULT 'PENDIENTE',
-        origen_linea TEXT NOT NULL DEFAULT 'FUERA_DE_PLAN',
-
-        FOREIGN KEY (chofer_id) REFERENCES choferes(id_chofer),
-        FOREIGN KEY (tractor_id) REFERENCES tractores(id_tractor),
-        FOREIGN KEY (material_id) REFERENCES materiales(id_material)
-    );
-    """)
-
-    conn.commit()
-def init_db(conn):
-    cur = conn.cursor()
+        CREATE INDEX IF NOT EXISTS idx_eventos_viaje_inicio
+        ON eventos_viaje (inicio_ts)
+    """)
 
-    # =========================
-    # TABLAS (las que ya tengas)
-    # =========================
-    # ... tus CREATE TABLE ...
 
-    # =========================
-    # MIGRACIONES OBLIGATORIAS
-    # =========================
+def _m010_eventos_horas_dia(cur):
+    _crear_eventos_horas_dia(cur)
+    reconstruir_eventos_horas_dia(cur)
 
-    # 1️⃣ estado en tractores
-    try:
-        cur.execute("""
-        ALTER TABLE tractores
-        ADD COLUMN estado TEXT DEFAULT 'OPERATIVO'
-        """)
-    except Exception:
-        pass
-
-    # 2️⃣ id_tractor en choferes
-    try:
-        cur.execute("""
-        ALTER TABLE choferes
-        ADD COLUMN id_tractor TEXT
-        """)
-    except Exception:
-        pass
-    # =========================
-    # MIGRACIÓN: creado_por en programacion_semanal
-    # =========================
-    try:
-        cur.execute("""
-        ALTER TABLE programacion_semanal
-        ADD COLUMN creado_por TEXT
-        """)
-    except Exception:
-        pass
-    
-    conn.commit()
-    
 
+# (versión, función) en orden. Nunca editar una migración ya publicada:
+# agregar una nueva al final.
+MIGRACIONES = [
+    (1, _m001_esquema_canonico),
+    (2, _m002_indices),
+    (3, _m003_fechas_iso),
+    (4, _m004_disponibilidad_diaria),
+    (5, _m005_lineas_programacion_unicas),
+    (6, _m006_secuencias),
+    (7, _m007_versiones_tabla),
+    (8, _m008_versiones_semana),
+    (9, _m009_indice_eventos_viaje_inicio),
+    (10, _m010_eventos_horas_dia),
+]
+
+VERSION_ACTUAL = MIGRACIONES[-1][0]
+
+
+def version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def versiones_datos(conn, tablas) -> tuple:
+    """
+    (tabla, versión) de cada tabla pedida, en orden: sirve de clave de caché.
+    """
+    tablas = tuple(sorted(set(tablas)))
+    marcas = ",".join("?" for _ in tablas)
+    filas = dict(conn.execute(
+        f"SELECT tabla, version FROM versiones_tabla WHERE tabla IN ({marcas})",
+        tablas,
+    ).fetchall())
+    return tuple((t, filas.get(t, 0)) for t in tablas)
+
+
+def version_semana(conn, lunes: str) -> int:
+    """
+    Versión de la semana que empieza el lunes `lunes` (ISO); 0 si nunca cambió.
+    """
+    fila = conn.execute(
+        "SELECT version FROM versiones_semana WHERE lunes = ?", (lunes,)
+    ).fetchone()
+    return fila[0] if fila else 0
+
+
+def migrar(conn) -> int:
+    """
+    Aplica las migraciones pendientes. Cada una corre en su propia
+    transacción junto con el cambio de user_version.
+    Devuelve la versión final.
+    """
+    if version(conn) >= VERSION_ACTUAL:
+        return version(conn)
+
+    if conn.in_transaction:
+        conn.commit()
+
+    cur = conn.cursor()
+    for numero, migracion in MIGRACIONES:
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            # Otro proceso pudo haber migrado mientras esperábamos el lock.
+            if version(conn) >= numero:
+                conn.rollback()
+                continue
+            migracion(cur)
+            cur.execute(f"PRAGMA user_version = {numero}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    return version(conn)
+
+
+def init_db(conn):
+    """
+    Compatibilidad con los scripts que llamaban init_db().
+    """
+    return migrar(conn)
@@ -0,0 +1,144 @@
+# utils/secuencias.py
+#
+# Números correlativos (nro de viaje) sin MAX(id)+1 dentro de la
+# transacción del despachante.
+#
+# La tabla `secuencias` guarda el próximo número libre. Cada proceso
+# reserva un bloque de TAMANO_BLOQUE números con una transacción cortita
+# en una conexión propia y después los entrega desde memoria: varios
+# despachantes generan viajes en paralelo sin pelearse por el lock.
+#
+# La reserva se confirma aparte a propósito: si la transacción del viaje
+# hace rollback el número se pierde (queda un hueco), pero nunca se
+# entrega dos veces.
+#
+# Al reservar también se mira el máximo real de la tabla (búsqueda por
+# clave primaria): si alguien insertó con id explícito (importaciones,
+# restore de un backup) la secuencia se pone al día sola.
+#
+# _lock solo protege los diccionarios en memoria: nunca se tiene mientras
+# se espera a SQLite. Mientras un thread reserva el bloque de una
+# secuencia, los demás que piden esa secuencia esperan su Event (y no el
+# lock de la base); uno que ya está dentro de una transacción no espera a
+# nadie: reserva un número en su propia transacción.
+
+import sqlite3
+import threading
+
+from utils.db import BUSY_TIMEOUT_MS
+
+TAMANO_BLOQUE = 20
+
+# nombre de secuencia -> (tabla, columna) que numera
+SECUENCIAS = {
+    "viajes": ("viajes", "id"),
+}
+
+_lock = threading.Lock()
+_bloques = {}       # (ruta, nombre) -> [siguiente, tope)
+_conexiones = {}    # (ruta, nombre) -> conexión propia para reservar
+_reservando = {}    # (ruta, nombre) -> Event de la reserva en curso
+
+
+def _conexion_reserva(conn, nombre: str):
+    """
+    Conexión en autocommit para la reserva, una por secuencia (dos
+    reservas en curso nunca comparten conexión). En bases :memory:
+    (tests) no hay otra conexión posible: se usa la misma.
+    """
+    ruta = getattr(conn, "ruta", None)
+    if not ruta or ruta == ":memory:":
+        return conn, (id(conn), nombre)
+    clave = (ruta, nombre)
+    aux = _conexiones.get(clave)
+    if aux is None:
+        aux = sqlite3.connect(
+            ruta,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        _conexiones[clave] = aux
+    return aux, clave
+
+
+def _reservar(aux, nombre: str, cantidad: int, propia: bool) -> int:
+    """
+    Reserva `cantidad` números y devuelve el primero. Con propia=True
+    la reserva es su propia transacción.
+    """
+    tabla, columna = SECUENCIAS[nombre]
+    if propia:
+        aux.execute("BEGIN IMMEDIATE")
+    try:
+        aux.execute(
+            "INSERT OR IGNORE INTO secuencias (nombre, proximo) VALUES (?, 1)",
+            (nombre,),
+        )
+        tope = aux.execute(f"""
+            UPDATE secuencias
+            SET proximo = MAX(
+                proximo,
+                (SELECT COALESCE(MAX({columna}), 0) + 1 FROM {tabla})
+            ) + ?
+            WHERE nombre = ?
+            RETURNING proximo
+        """, (cantidad, nombre)).fetchone()[0]
+        if propia:
+            aux.execute("COMMIT")
+    except BaseException:
+        if propia:
+            aux.execute("ROLLBACK")
+        raise
+    return tope - cantidad
+
+
+def siguiente(conn, nombre: str) -> int:
+    """
+    Próximo número de la secuencia `nombre` para la base de `conn`.
+    Conviene pedirlo antes de abrir la transacción de escritura: con
+    `conn` ya dentro de una, si el bloque está agotado se reserva un
+    único número en esa misma transacción (otra conexión quedaría
+    esperando el lock que tiene `conn`).
+    """
+    while True:
+        with _lock:
+            aux, clave = _conexion_reserva(conn, nombre)
+            bloque = _bloques.get(clave)
+            if bloque is not None and bloque[0] < bloque[1]:
+                numero = bloque[0]
+                bloque[0] += 1
+                return numero
+            de_a_uno = aux is not conn and conn.in_transaction
+            en_curso = None if de_a_uno else _reservando.get(clave)
+            if not de_a_uno and en_curso is None:
+                reserva = _reservando[clave] = threading.Event()
+
+        if de_a_uno:
+            return _reservar(conn, nombre, 1, propia=False)
+        if en_curso is not None:
+            # Otro thread está reservando: se espera su bloque
+            en_curso.wait()
+            continue
+
+        desde = None
+        try:
+            desde = _reservar(aux, nombre, TAMANO_BLOQUE, propia=aux is not conn)
+        finally:
+            # Si la reserva falló, los que esperaban reintentan solos
+            with _lock:
+                if desde is not None:
+                    _bloques[clave] = [desde, desde + TAMANO_BLOQUE]
+                del _reservando[clave]
+            reserva.set()
+
+
+def descartar_bloques():
+    """
+    Olvida los bloques reservados (los números sin usar quedan como hueco).
+    """
+    with _lock:
+        _bloques.clear()
+        for aux in _conexiones.values():
+            aux.close()
+        _conexiones.clear()
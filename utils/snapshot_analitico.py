@@ -0,0 +1,142 @@
+# utils/snapshot_analitico.py
+#
+# Copia analítica de solo lectura.
+# Un thread en segundo plano copia la base operativa a
+# data/programacion_bca_analytics.sqlite con la API de backup de SQLite
+# cada INTERVALO_S segundos.
+# Las páginas de análisis (desvíos, eventos global, heatmap, agenda) leen
+# de la copia: sus recorridas largas no compiten con los despachantes
+# que confirman viajes o cargan francos.
+#
+# La base operativa está en WAL: el backup es una transacción de lectura
+# que no frena a los que escriben. Se copia en un solo paso a propósito:
+# copiando por tramos, cada escritura de otra conexión reinicia el backup
+# desde la primera página y con carga alta nunca termina.
+# La copia también queda en WAL: mientras se refresca, los lectores siguen
+# viendo la versión anterior sin bloquearse.
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from utils.db import BASE_DIR, get_connection, get_db_path
+
+ANALYTICS_PATH = BASE_DIR / "data" / "programacion_bca_analytics.sqlite"
+
+INTERVALO_S = 300            # refresco cada 5 minutos
+PAGINAS_POR_PASO = -1        # todo en un paso (ver arriba)
+ANTIGUEDAD_MAXIMA_S = 3 * INTERVALO_S
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_lock_refresco = threading.Lock()
+_detener = threading.Event()
+_thread = None
+_ultimo_refresco = None
+
+
+# =================================================
+# REFRESCO
+# =================================================
+def refrescar(origen=None, destino=None) -> float:
+    """
+    Copia la base operativa sobre la analítica. Devuelve los segundos que tardó.
+    """
+    global _ultimo_refresco
+
+    origen = Path(origen or get_db_path())
+    destino = Path(destino or ANALYTICS_PATH)
+
+    with _lock_refresco:
+        t0 = time.monotonic()
+        src = sqlite3.connect(f"{origen.as_uri()}?mode=ro", uri=True)
+        dst = sqlite3.connect(destino)
+        try:
+            dst.execute("PRAGMA journal_mode = WAL")
+            src.backup(dst, pages=PAGINAS_POR_PASO)
+            dst.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('snapshot_en', ?)",
+                (time.strftime("%Y-%m-%d %H:%M:%S"),),
+            )
+            dst.commit()
+        finally:
+            src.close()
+            dst.close()
+
+        _ultimo_refresco = time.monotonic()
+        return _ultimo_refresco - t0
+
+
+def _bucle():
+    while not _detener.is_set():
+        try:
+            segundos = refrescar()
+            log.info("snapshot analítico actualizado en %.2f s", segundos)
+        except (sqlite3.Error, OSError):
+            log.exception("no se pudo actualizar el snapshot analítico")
+        _detener.wait(INTERVALO_S)
+
+
+# =================================================
+# THREAD EN SEGUNDO PLANO
+# =================================================
+def iniciar_snapshotter():
+    """
+    Arranca el thread de refresco (uno por proceso). Idempotente.
+    """
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    with _lock:
+        if _thread is not None and _thread.is_alive():
+            return
+        _detener.clear()
+        _thread = threading.Thread(
+            target=_bucle,
+            name="snapshot-analitico",
+            daemon=True,
+        )
+        _thread.start()
+
+
+def detener_snapshotter():
+    _detener.set()
+    if _thread is not None:
+        _thread.join()
+
+
+def snapshot_vigente() -> bool:
+    return (
+        _ultimo_refresco is not None
+        and time.monotonic() - _ultimo_refresco <= ANTIGUEDAD_MAXIMA_S
+        and ANALYTICS_PATH.exists()
+    )
+
+
+def fecha_snapshot(conn) -> str | None:
+    """
+    Momento de la copia que está leyendo `conn` (None si es la base operativa).
+    """
+    row = conn.execute("SELECT value FROM meta WHERE key = 'snapshot_en'").fetchone()
+    return row[0] if row else None
+
+
+# =================================================
+# API
+# =================================================
+def get_connection_analitica():
+    """
+    Conexión de solo lectura para reportes.
+    Lee la copia analítica; hasta que exista el primer snapshot (o si quedó
+    vieja) lee la base operativa en modo read-only.
+    """
+    iniciar_snapshotter()
+    if snapshot_vigente():
+        try:
+            return get_connection(solo_lectura=True, db_path=ANALYTICS_PATH)
+        except sqlite3.Error:
+            log.exception("copia analítica no disponible, se usa la base operativa")
+    return get_connection(solo_lectura=True)